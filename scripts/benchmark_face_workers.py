@@ -0,0 +1,57 @@
+import argparse
+import os
+import time
+import numpy as np
+from config import CAMERA_MAIN_RESOLUTION
+from face_workers import FaceWorkerPool
+from vision_processing import encode_faces_in_regions
+from benchmark_vision import synthetic_frame, load_frames
+
+def run(encode, frames):
+    """Returns seconds spent encoding every frame's person regions, and the regions and faces handled."""
+    regions = faces = 0
+    start = time.perf_counter()
+    for frame, boxes, _ in frames:
+        locations, _, assignment = encode(frame, boxes)
+        regions += len(assignment)
+        faces += len(locations)
+    return time.perf_counter() - start, regions, faces
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure face encoding throughput against the number of worker processes")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--persons", type=int, default=4, help="Person regions per synthetic frame")
+    parser.add_argument("--workers", default=None, help="Comma-separated worker counts (default: 1 up to the CPU count)")
+    parser.add_argument("--face-model", default="hog", help="hog, cnn or cascade")
+    parser.add_argument("--frames-dir", help="Use images from this directory (whole image as one region per person slot)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.frames_dir:
+        frames = [(frame, [(0, 0, frame.shape[1], frame.shape[0])], None)
+                  for frame, _, _ in load_frames(args.frames_dir, args.frames, CAMERA_MAIN_RESOLUTION)]
+    else:
+        frames = [synthetic_frame(rng, args.persons, args.persons, CAMERA_MAIN_RESOLUTION)[:2] + (None,) for _ in range(args.frames)]
+    counts = [int(n) for n in args.workers.split(",")] if args.workers else list(range(1, (os.cpu_count() or 1) + 1))
+
+    print(f"{len(frames)} frames at {CAMERA_MAIN_RESOLUTION[0]}x{CAMERA_MAIN_RESOLUTION[1]}, face model {args.face_model}")
+    baseline = None
+    for workers in counts:
+        if workers == 1:
+            seconds, regions, faces = run(lambda frame, boxes: encode_faces_in_regions(frame, boxes, args.face_model), frames)
+            label = "in-process"
+        else:
+            pool = FaceWorkerPool(workers, model=args.face_model).start()
+            try:
+                run(pool.encode_faces_in_regions, frames[:1])  # Warm up every worker's first call
+                seconds, regions, faces = run(pool.encode_faces_in_regions, frames)
+            finally:
+                pool.stop()
+            label = f"{workers} workers"
+        rate = regions / seconds
+        baseline = baseline or rate
+        print(f"  {label}: {rate:.1f} regions/s, {faces / seconds:.1f} faces/s, {rate / baseline:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import base64
+import io
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from PIL import Image
+from config import CAMERA_RESOLUTION, DETECTOR_BACKEND, FRAME_BUFFER_POOL_SIZE
+from detector import InputBuffers, make_input_blob, input_spec
+from sources import FrameBufferPool
+from vision_processing import clip_box, merge_overlapping_boxes
+from benchmark_vision import synthetic_frame, annotate, summarize
+
+LARGE_BLOCK_BYTES = 16 * 1024
+
+def legacy_frame(camera_array, boxes, face_locations, spec):
+    """The per-frame path before pooled buffers: every step allocates a frame-sized array.
+
+    Returns the arrays it made so they are still alive when allocations are counted.
+    """
+    frame = cv2.cvtColor(camera_array, cv2.COLOR_RGB2BGR)
+    resized = cv2.resize(frame, spec[0])
+    blob = cv2.dnn.blobFromImage(resized, spec[1], spec[0], spec[2])
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w = rgb.shape[:2]
+    regions = [np.ascontiguousarray(rgb[y0:y1, x0:x1])
+               for x0, y0, x1, y1 in merge_overlapping_boxes([clip_box(box, w, h) for box in boxes])]
+    annotate(frame, face_locations, [("Unknown", None)] * len(face_locations))
+    alert = None
+    if boxes:
+        x0, y0, x1, y1 = boxes[0]
+        buf = io.BytesIO()
+        Image.fromarray(rgb[y0:y1, x0:x1]).save(buf, format="JPEG", quality=85)
+        alert = base64.b64encode(buf.getvalue()).decode()
+    return [frame, resized, blob, rgb, regions, alert]
+
+def pooled_frame(camera_array, boxes, pool, buffers, spec):
+    """The current path: pooled capture copy, preallocated blob, region-only conversion, no annotation, cv2 JPEG."""
+    frame = pool.next(camera_array.shape)
+    np.copyto(frame, camera_array)
+    blob = make_input_blob(frame, *spec, buffers)
+    h, w = frame.shape[:2]
+    regions = [cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+               for x0, y0, x1, y1 in merge_overlapping_boxes([clip_box(box, w, h) for box in boxes])]
+    alert = None
+    if boxes:
+        x0, y0, x1, y1 = boxes[0]
+        ok, jpeg = cv2.imencode(".jpg", frame[y0:y1, x0:x1], [cv2.IMWRITE_JPEG_QUALITY, 85])
+        alert = base64.b64encode(jpeg.tobytes()).decode()
+    return [frame, blob, regions, alert]
+
+def count_allocations(run, repeats):
+    """Returns mean large blocks allocated, bytes allocated and peak bytes per frame, as seen by tracemalloc."""
+    blocks, allocated, peaks = [], [], []
+    tracemalloc.start()
+    for _ in range(repeats):
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        kept = run()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        after = tracemalloc.take_snapshot()
+        diff = [stat for stat in after.compare_to(before, "traceback") if stat.size_diff >= LARGE_BLOCK_BYTES]
+        blocks.append(sum(stat.count_diff for stat in diff))
+        allocated.append(sum(stat.size_diff for stat in diff))
+        del kept
+    tracemalloc.stop()
+    return {"large_blocks": float(np.mean(blocks)), "allocated_kb": float(np.mean(allocated)) / 1024,
+            "peak_kb": float(np.mean(peaks)) / 1024}
+
+def time_path(run, frames, warmup):
+    samples = []
+    for i in range(frames):
+        start = time.perf_counter()
+        run()
+        if i >= warmup:
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-frame allocations and latency of the legacy and pooled frame paths "
+                                                 "(headless; the DNN forward pass and face encoding are not run)")
+    parser.add_argument("--frames", type=int, default=200, help="Timed frames per path")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--alloc-frames", type=int, default=20, help="Frames traced for allocation counts")
+    parser.add_argument("--persons", type=int, default=2)
+    parser.add_argument("--detector", default=DETECTOR_BACKEND)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    bgr, boxes, face_locations = synthetic_frame(rng, args.persons, args.persons, CAMERA_RESOLUTION)
+    camera_array = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)  # What the camera delivered in the old RGB capture format
+    spec = input_spec(args.detector)
+    pool = FrameBufferPool(FRAME_BUFFER_POOL_SIZE)
+    buffers = InputBuffers(*spec)
+    paths = {
+        "legacy": lambda: legacy_frame(camera_array, boxes, face_locations, spec),
+        "pooled": lambda: pooled_frame(camera_array, boxes, pool, buffers, spec),
+    }
+    for run in paths.values():
+        for _ in range(FRAME_BUFFER_POOL_SIZE + 1):
+            run()  # Fill the pool so only steady-state frames are measured
+
+    print(f"Frame {CAMERA_RESOLUTION[0]}x{CAMERA_RESOLUTION[1]}, {args.persons} persons, detector input {spec[0]}")
+    results = {}
+    for name, run in paths.items():
+        stats = count_allocations(run, args.alloc_frames)
+        stats.update(time_path(run, args.frames, args.warmup))
+        results[name] = stats
+        print(f"  {name}: {stats['large_blocks']:.1f} buffers >= {LARGE_BLOCK_BYTES // 1024} KiB, "
+              f"{stats['allocated_kb']:.0f} KiB allocated, {stats['peak_kb']:.0f} KiB peak, "
+              f"p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms")
+    legacy, pooled = results["legacy"], results["pooled"]
+    print(f"  Allocated bytes -{(1 - pooled['allocated_kb'] / legacy['allocated_kb']) * 100:.0f}%, "
+          f"p50 latency -{(1 - pooled['p50_ms'] / legacy['p50_ms']) * 100:.0f}%")
+
+if __name__ == "__main__":
+    main()
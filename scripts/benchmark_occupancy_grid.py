@@ -0,0 +1,60 @@
+import argparse
+import time
+import numpy as np
+from occupancy_grid import OccupancyGrid
+from config import NAVIGATION_SECTORS, OBSTACLE_DISTANCE_THRESHOLD_CM, ROVER_WIDTH_M
+
+RPLIDAR_A1_SCAN_HZ = 10  # Upper end of the A1 rotation rate
+RPLIDAR_A1_SAMPLES_PER_S = 8000
+
+def synthetic_scan(rng, points, room=(4.0, 3.0), obstacles=5):
+    """Returns one scan of a rectangular room with a few round obstacles, plus range noise."""
+    angles = np.linspace(-np.pi, np.pi, points, endpoint=False)
+    cos, sin = np.cos(angles), np.sin(angles)
+    with np.errstate(divide='ignore'):
+        wall_x = np.where(cos != 0, room[0] / np.abs(cos), np.inf)
+        wall_y = np.where(sin != 0, room[1] / np.abs(sin), np.inf)
+    ranges = np.minimum(wall_x, wall_y)
+    for _ in range(obstacles):
+        center = rng.uniform(-2.5, 2.5, size=2)
+        radius = rng.uniform(0.1, 0.3)
+        # Ray/circle intersection along each beam
+        b = cos * center[0] + sin * center[1]
+        disc = b ** 2 - (center @ center - radius ** 2)
+        hit = (disc >= 0) & (b > 0)
+        ranges = np.where(hit, np.minimum(ranges, b - np.sqrt(np.where(hit, disc, 0))), ranges)
+    ranges = ranges + rng.normal(0, 0.01, size=points)
+    return np.column_stack((ranges * cos, ranges * sin))
+
+def benchmark(scans, points):
+    """Times grid updates and queries over synthetic scans."""
+    rng = np.random.default_rng(0)
+    data = [synthetic_scan(rng, points) for _ in range(scans)]
+    grid = OccupancyGrid()
+    update_times, query_times = [], []
+    for scan in data:
+        start = time.perf_counter()
+        grid.integrate(scan)
+        update_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        grid.corridor_clear(OBSTACLE_DISTANCE_THRESHOLD_CM / 100.0, ROVER_WIDTH_M)
+        grid.free_space_sector(NAVIGATION_SECTORS)
+        query_times.append(time.perf_counter() - start)
+    update_ms = np.array(update_times) * 1000.0
+    query_ms = np.array(query_times) * 1000.0
+    budget_ms = 1000.0 / RPLIDAR_A1_SCAN_HZ
+    print(f"Grid {grid.cells}x{grid.cells} cells at {grid.resolution * 100:.0f} cm, {scans} scans of {points} points")
+    print(f"Update: mean {update_ms.mean():.2f} ms, p95 {np.percentile(update_ms, 95):.2f} ms, max {update_ms.max():.2f} ms")
+    print(f"Queries: mean {query_ms.mean():.3f} ms, p95 {np.percentile(query_ms, 95):.3f} ms")
+    print(f"Sustainable rate: {1000.0 / update_ms.mean():.1f} scans/s ({points * 1000.0 / update_ms.mean():.0f} points/s); "
+          f"RPLIDAR A1 needs {RPLIDAR_A1_SCAN_HZ} scans/s ({budget_ms:.0f} ms per scan)")
+    return update_ms.mean() <= budget_ms
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the LIDAR occupancy grid on synthetic scans")
+    parser.add_argument("--scans", type=int, default=200)
+    parser.add_argument("--points", type=int, default=RPLIDAR_A1_SAMPLES_PER_S // RPLIDAR_A1_SCAN_HZ * 2,
+                        help="Points per scan (default: twice what an A1 delivers at 10 Hz)")
+    args = parser.parse_args()
+    if not benchmark(args.scans, args.points):
+        print("WARNING: grid updates are slower than the LIDAR scan rate.")
@@ -0,0 +1,225 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import time
+import cv2
+import numpy as np
+import face_recognition
+from config import CAMERA_RESOLUTION, DETECTOR_BACKEND, FACE_DETECTION_MODEL, ALERT_BYTE_BUDGET
+from detector import get_detector, missing_model_files, make_input_blob, decode_detections, input_spec
+from vision_processing import clip_box, locate_faces_in_regions
+from face_index import KnownFaceIndex, FACE_ENCODING_SIZE
+from alert_payload import crop_around_face, encode_jpeg_within_budget
+
+STAGES = ["blob", "dnn_forward", "face_location", "encoding", "matching", "annotation", "jpeg_encode", "total"]
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+DEFAULT_OUTPUT_DIR = "data/benchmarks"
+
+def synthetic_frame(rng, persons, faces, size=CAMERA_RESOLUTION):
+    """Draws a frame with person-shaped blocks and simple faces; returns it with ground-truth boxes and face locations."""
+    width, height = size
+    frame = rng.integers(40, 90, size=(height, width, 3), dtype=np.uint8)
+    boxes, face_locations = [], []
+    slot = width // max(1, persons)
+    for i in range(persons):
+        box_w = int(slot * 0.8)
+        box_h = int(height * rng.uniform(0.6, 0.9))
+        x0 = i * slot + (slot - box_w) // 2
+        y0 = height - box_h
+        box = (x0, y0, x0 + box_w, height)
+        cv2.rectangle(frame, box[:2], box[2:], tuple(int(c) for c in rng.integers(60, 200, 3)), cv2.FILLED)
+        boxes.append(box)
+        if i < faces:
+            side = max(24, min(box_w // 2, box_h // 4))
+            cx, top = x0 + box_w // 2, y0 + side // 4
+            cv2.ellipse(frame, (cx, top + side // 2), (side // 2, int(side * 0.6)), 0, 0, 360, (140, 170, 215), cv2.FILLED)
+            for dx in (-side // 5, side // 5):
+                cv2.circle(frame, (cx + dx, top + side * 2 // 5), max(2, side // 12), (40, 40, 40), cv2.FILLED)
+            cv2.ellipse(frame, (cx, top + side * 3 // 4), (side // 5, side // 12), 0, 0, 180, (60, 60, 120), 2)
+            face_locations.append((top, cx + side // 2, top + side, cx - side // 2))
+    return frame, boxes, face_locations
+
+def load_frames(directory, limit, size=CAMERA_RESOLUTION):
+    """Loads up to limit images from a directory, resized to the camera resolution."""
+    frames = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.lower().endswith(IMAGE_EXTENSIONS):
+            image = cv2.imread(os.path.join(directory, filename))
+            if image is not None:
+                frames.append((cv2.resize(image, size), None, None))
+        if len(frames) >= limit:
+            break
+    return frames
+
+def synthetic_roster(rng, size):
+    """A roster of random encodings with the spread of real face_recognition encodings."""
+    encodings = rng.normal(0, 0.1, size=(size, FACE_ENCODING_SIZE))
+    return KnownFaceIndex(encodings, [f"person{i}" for i in range(size)])
+
+def annotate(frame, face_locations, matches):
+    """Draws face boxes and labels the same way the rover loop does."""
+    for (top, right, bottom, left), (name, _) in zip(face_locations, matches):
+        color = (0, 0, 255) if name == "Unknown" else (255, 0, 0)
+        cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+        cv2.rectangle(frame, (left, bottom - 20), (right, bottom), color, cv2.FILLED)
+        cv2.putText(frame, name, (left, bottom - 5), cv2.FONT_HERSHEY_DUPLEX, 0.5, (255, 255, 255), 1)
+
+def run_frame(frame, truth_boxes, truth_faces, roster, detector, spec, face_model):
+    """Runs the vision path on one frame and returns the seconds spent per stage."""
+    timings = {}
+    h, w = frame.shape[:2]
+    start = time.perf_counter()
+    blob = make_input_blob(frame, *spec)
+    timings["blob"] = time.perf_counter() - start
+    boxes = []
+    if detector is not None:
+        stage = time.perf_counter()
+        boxes = decode_detections(detector.forward(blob), w, h)
+        timings["dnn_forward"] = time.perf_counter() - stage
+    # Synthetic people are not real detections; fall back to ground truth so later stages still run
+    if not boxes and truth_boxes is not None:
+        boxes = truth_boxes
+    boxes = [clip_box(box, w, h) for box in boxes]
+    stage = time.perf_counter()
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    face_locations = locate_faces_in_regions(rgb, boxes, face_model) if boxes else []
+    timings["face_location"] = time.perf_counter() - stage
+    if not face_locations and truth_faces:
+        face_locations = truth_faces
+    stage = time.perf_counter()
+    encodings = face_recognition.face_encodings(rgb, face_locations) if face_locations else []
+    timings["encoding"] = time.perf_counter() - stage
+    stage = time.perf_counter()
+    matches = roster.match(encodings)
+    timings["matching"] = time.perf_counter() - stage
+    unknown = [location for location, (name, _) in zip(face_locations, matches) if name == "Unknown"]
+    alert_crop = crop_around_face(frame, unknown[0]).copy() if unknown else None
+    stage = time.perf_counter()
+    annotate(frame, face_locations, matches)
+    timings["annotation"] = time.perf_counter() - stage
+    if alert_crop is not None:
+        stage = time.perf_counter()
+        encode_jpeg_within_budget(alert_crop, ALERT_BYTE_BUDGET)
+        timings["jpeg_encode"] = time.perf_counter() - stage
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+def summarize(samples):
+    """Returns count, mean and p50/p95/p99/max in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ms = np.array(samples) * 1000.0
+    return {
+        "count": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+def run_case(frames, roster, detector, spec, face_model, warmup):
+    """Benchmarks one corpus against one roster; the first warmup frames are not recorded."""
+    samples = {stage: [] for stage in STAGES}
+    for i, (frame, truth_boxes, truth_faces) in enumerate(frames):
+        timings = run_frame(frame.copy(), truth_boxes, truth_faces, roster, detector, spec, face_model)
+        if i < warmup:
+            continue
+        for stage, seconds in timings.items():
+            samples[stage].append(seconds)
+    return {stage: summarize(values) for stage, values in samples.items()}
+
+def parse_counts(text):
+    return [int(value) for value in text.split(",") if value != ""]
+
+def compare(results, baseline_path):
+    """Prints p50 changes per stage against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    def key(case):
+        return (case["persons"], case["faces"], case["roster"], case.get("source"))
+    previous = {key(case): case for case in baseline["cases"]}
+    print(f"\nComparison with {baseline_path} (p50, ms):")
+    for case in results["cases"]:
+        old = previous.get(key(case))
+        if old is None:
+            continue
+        changes = []
+        for stage in STAGES:
+            new_p50 = case["stages"][stage].get("p50_ms")
+            old_p50 = old["stages"].get(stage, {}).get("p50_ms")
+            if new_p50 is None or old_p50 is None:
+                continue
+            delta = (new_p50 - old_p50) / old_p50 * 100.0 if old_p50 else 0.0
+            changes.append(f"{stage} {old_p50:.2f}->{new_p50:.2f} ({delta:+.0f}%)")
+        print(f"  persons={case['persons']} faces={case['faces']} roster={case['roster']}: " + ", ".join(changes))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rover's vision path per stage (runs headless, no camera needed)")
+    parser.add_argument("--frames", type=int, default=30, help="Frames per case")
+    parser.add_argument("--warmup", type=int, default=3, help="Leading frames per case that are not recorded")
+    parser.add_argument("--persons", default="0,1,3", help="Comma-separated person counts per synthetic frame")
+    parser.add_argument("--faces", default="0,1,3", help="Comma-separated face counts per synthetic frame (at most one per person)")
+    parser.add_argument("--roster", default="10,1000,10000", help="Comma-separated roster sizes")
+    parser.add_argument("--frames-dir", help="Use images from this directory instead of synthetic frames")
+    parser.add_argument("--face-model", default=FACE_DETECTION_MODEL, help="hog, cnn or cascade")
+    parser.add_argument("--detector", default=DETECTOR_BACKEND, help="Registered person detector; skipped if its model files are missing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help=f"Results JSON (default: {DEFAULT_OUTPUT_DIR}/vision_<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    detector = None
+    if missing_model_files(args.detector):
+        print(f"Person detector '{args.detector}' model files missing; the dnn_forward stage is skipped.")
+    else:
+        detector = get_detector(args.detector)
+    spec = (detector.input_size, detector.scalefactor, detector.mean) if detector else input_spec(args.detector)
+
+    if args.frames_dir:
+        corpora = [("directory", None, None, load_frames(args.frames_dir, args.frames))]
+    else:
+        corpora = []
+        for persons, faces in itertools.product(parse_counts(args.persons), parse_counts(args.faces)):
+            if faces > persons:
+                continue
+            frames = [synthetic_frame(rng, persons, faces) for _ in range(args.frames)]
+            corpora.append(("synthetic", persons, faces, frames))
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "face_model": args.face_model,
+            "detector": args.detector if detector else None,
+            "frames_per_case": args.frames,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "cases": [],
+    }
+    for (source, persons, faces, frames), roster_size in itertools.product(corpora, parse_counts(args.roster)):
+        roster = synthetic_roster(rng, roster_size)
+        stages = run_case(frames, roster, detector, spec, args.face_model, args.warmup)
+        results["cases"].append({"source": source, "persons": persons, "faces": faces, "roster": roster_size, "stages": stages})
+        summary = ", ".join(f"{stage} {stats['p50_ms']:.2f}/{stats['p95_ms']:.2f}"
+                            for stage, stats in stages.items() if stats["count"])
+        print(f"[{source}] persons={persons} faces={faces} roster={roster_size} (p50/p95 ms): {summary}")
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"vision_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import json
+import struct
+import uuid
+import cv2
+from config import (
+    ALERT_BYTE_BUDGET, ALERT_THUMBNAIL_BYTE_BUDGET, ALERT_SEND_THUMBNAIL_FIRST,
+    ALERT_MIN_JPEG_QUALITY, ALERT_MAX_JPEG_QUALITY, ALERT_MIN_CROP_SIDE, ALERT_CROP_MARGIN
+)
+
+PAYLOAD_MAGIC = b"TRA1"
+PAYLOAD_CONTENT_TYPE = "application/octet-stream"
+_LENGTHS = struct.Struct("!II")
+
+def crop_around_face(frame, face_location, margin=ALERT_CROP_MARGIN):
+    """Returns a view of frame around a (top, right, bottom, left) face, padded by margin x face size."""
+    top, right, bottom, left = face_location
+    pad_y = int((bottom - top) * margin)
+    pad_x = int((right - left) * margin)
+    h, w = frame.shape[:2]
+    return frame[max(0, top - pad_y):min(h, bottom + pad_y), max(0, left - pad_x):min(w, right + pad_x)]
+
+def encode_jpeg_within_budget(image, byte_budget, min_quality=ALERT_MIN_JPEG_QUALITY,
+                              max_quality=ALERT_MAX_JPEG_QUALITY, min_side=ALERT_MIN_CROP_SIDE):
+    """Encodes a BGR image as the best-quality JPEG that fits in byte_budget.
+
+    Searches JPEG quality first and only downscales the crop when even min_quality
+    is too large. Returns (jpeg_bytes, quality, scale); if the image cannot fit at
+    min_side, the smallest encoding is returned even though it exceeds the budget.
+    """
+    h, w = image.shape[:2]
+    scale = 1.0
+    while True:
+        if scale < 1.0:
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            candidate = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        else:
+            candidate = image
+        best = None
+        lo, hi = min_quality, max_quality
+        while lo <= hi:
+            quality = (lo + hi) // 2
+            ok, buf = cv2.imencode(".jpg", candidate, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+            if len(buf) <= byte_budget:
+                best = (buf.tobytes(), quality)
+                lo = quality + 1
+            else:
+                hi = quality - 1
+                smallest = buf
+        if best is not None:
+            return best[0], best[1], scale
+        if min(h, w) * scale * 0.75 < min_side:
+            return smallest.tobytes(), min_quality, scale
+        scale *= 0.75
+
+def pack_alert(header, image_bytes=b""):
+    """Packs an alert as magic + two big-endian uint32 lengths + JSON header + raw JPEG bytes."""
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return PAYLOAD_MAGIC + _LENGTHS.pack(len(header_bytes), len(image_bytes)) + header_bytes + image_bytes
+
+def unpack_alert(data):
+    """Inverse of pack_alert. Returns (header, image_bytes)."""
+    if data[:4] != PAYLOAD_MAGIC:
+        raise ValueError("Not an alert payload")
+    header_len, image_len = _LENGTHS.unpack_from(data, 4)
+    start = 4 + _LENGTHS.size
+    header = json.loads(data[start:start + header_len].decode("utf-8"))
+    image_bytes = data[start + header_len:start + header_len + image_len]
+    if len(image_bytes) != image_len:
+        raise ValueError("Truncated alert payload")
+    return header, image_bytes
+
+class AlertPayloadEncoder:
+    """Builds binary alert payloads sized for the low-bandwidth RF link.
+
+    With send_thumbnail_first, encode() returns a small thumbnail payload to send now
+    and the full-crop payload to send only if the base station asks for it.
+    """
+    def __init__(self, byte_budget=ALERT_BYTE_BUDGET, thumbnail_budget=ALERT_THUMBNAIL_BYTE_BUDGET,
+                 send_thumbnail_first=ALERT_SEND_THUMBNAIL_FIRST):
+        self.byte_budget = byte_budget
+        self.thumbnail_budget = thumbnail_budget
+        self.send_thumbnail_first = send_thumbnail_first
+
+    def _payload(self, alert_id, kind, image, budget, message, timestamp, cluster_id=None):
+        header = {
+            "id": alert_id,
+            "kind": kind,
+            "message": message,
+            "timestamp": timestamp,
+            "quality": 100,  # Widest values, so the framing measured here bounds the final one
+            "scale": 0.001,
+        }
+        if cluster_id is not None:
+            header["cluster"] = cluster_id
+        # The budget covers the whole payload: magic, lengths and header come out of the JPEG's share
+        jpeg, quality, scale = encode_jpeg_within_budget(image, budget - len(pack_alert(header)))
+        header["quality"], header["scale"] = quality, round(scale, 3)
+        return pack_alert(header, jpeg)
+
+    def encode(self, image, message, timestamp, alert_id=None, cluster_id=None):
+        """Returns (alert_id, payload_to_send, deferred_full_payload_or_None).
+
+        cluster_id names the unknown individual the alert is for, so later sightings can refer to it.
+        """
+        alert_id = alert_id or uuid.uuid4().hex[:12]
+        full = self._payload(alert_id, "full", image, self.byte_budget, message, timestamp, cluster_id)
+        if not self.send_thumbnail_first:
+            return alert_id, full, None
+        thumbnail = self._payload(alert_id, "thumbnail", image, self.thumbnail_budget, message, timestamp, cluster_id)
+        return alert_id, thumbnail, full
+
+    def encode_sighting(self, cluster_id, count, message, timestamp):
+        """Returns a header-only payload reporting that an already alerted individual was seen again."""
+        header = {
+            "id": uuid.uuid4().hex[:12],
+            "kind": "sighting",
+            "cluster": cluster_id,
+            "count": count,
+            "message": message,
+            "timestamp": timestamp,
+        }
+        return pack_alert(header)
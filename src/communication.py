@@ -1,20 +1,239 @@
-import requests
+import os
+import queue
+import threading
 import time
-from config import ALERT_APP_URL
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
+from config import (
+    ALERT_APP_URL, ALERT_SPOOL_DIR, ALERT_SPOOL_MAX_FILES, ALERT_CONNECT_TIMEOUT_S,
+    ALERT_READ_TIMEOUT_S, ALERT_BACKOFF_INITIAL_S, ALERT_BACKOFF_MAX_S, ALERT_FULL_IMAGE_CACHE_SIZE
+)
+from alert_payload import AlertPayloadEncoder, unpack_alert, PAYLOAD_CONTENT_TYPE
+from metrics import get_metrics
+from rover_log import get_logger
+
+ALERT_MESSAGE = 'ALERT: Unknown person detected by rover unit'
+SIGHTING_MESSAGE = 'Unknown person seen again by rover unit'
+log = get_logger("communication")
+
+def create_session():
+    """Creates a requests session with a small keep-alive connection pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+_session = None
 
 def send_alert(image_base64):
-    """Sends an alert with image to the specified URL."""
+    """Sends an alert with image to the specified URL. Returns True on success."""
+    global _session
+    if _session is None:
+        _session = create_session()
     try:
         payload = {
-            'message': 'ALERT: Unknown person detected by rover unit',
+            'message': ALERT_MESSAGE,
             'timestamp': time.time(),
             'image_base64': image_base64
         }
-        headers = {'Content-Type': 'application/json'}
-        response = requests.post(ALERT_APP_URL, json=payload, headers=headers)
+        response = _session.post(ALERT_APP_URL, json=payload, timeout=(ALERT_CONNECT_TIMEOUT_S, ALERT_READ_TIMEOUT_S))
         response.raise_for_status()
         print("Alert sent successfully.")
+        return True
     except requests.RequestException as e:
         print(f"Network error sending alert: {e}")
     except Exception as e:
-        print(f"Error preparing or sending alert: {e}")
\ No newline at end of file
+        print(f"Error preparing or sending alert: {e}")
+    return False
+
+class AlertDispatcher:
+    """Delivers alerts from a background thread so the control loop never blocks on the network.
+
+    Alerts are queued in memory by submit() (repeat sightings by submit_sighting()), encoded and written to an on-disk spool
+    by the worker, and only removed from the spool once the server accepted them.
+    Failed sends are retried with exponential backoff, oldest first, so alerts
+    survive link outages (and restarts) and are delivered in order.
+
+    Payloads are binary (see alert_payload). When thumbnails are sent first, the
+    full crop is kept in memory and sent if the server answers with
+    {"request_full": true} or request_full() is called.
+    """
+    def __init__(self, url=ALERT_APP_URL, spool_dir=ALERT_SPOOL_DIR, session=None,
+                 timeout=(ALERT_CONNECT_TIMEOUT_S, ALERT_READ_TIMEOUT_S),
+                 backoff_initial=ALERT_BACKOFF_INITIAL_S, backoff_max=ALERT_BACKOFF_MAX_S,
+                 max_spooled=ALERT_SPOOL_MAX_FILES, encoder=None):
+        self.url = url
+        self.spool_dir = spool_dir
+        self.session = session if session is not None else create_session()
+        self.timeout = timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.max_spooled = max_spooled
+        self.encoder = encoder if encoder is not None else AlertPayloadEncoder()
+        self.sent = 0
+        self.bytes_sent = 0
+        self.failed_attempts = 0
+        self._full_payloads = OrderedDict()
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = None
+        metrics = get_metrics()
+        self._encode_seconds = metrics.histogram("rover_alert_encode_seconds", "Time to encode an alert payload")
+        self._send_seconds = metrics.histogram("rover_alert_send_seconds", "Time for one alert POST, including failures")
+        self._results = {result: metrics.counter("rover_alerts_total", "Alert delivery attempts by result", result=result)
+                         for result in ("sent", "failed", "rejected", "dropped")}
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._next_seq = self._last_spooled_seq() + 1
+
+    def start(self):
+        """Starts the background delivery thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stops the worker; anything not yet delivered stays in the spool for the next run."""
+        self._stop_event.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, image, timestamp=None, cluster_id=None):
+        """Queues an alert for a BGR image crop. Never blocks on encoding, disk or network I/O."""
+        self._queue.put(("alert", (image, cluster_id), timestamp if timestamp is not None else time.time()))
+
+    def submit_sighting(self, cluster_id, count, timestamp=None):
+        """Queues an image-free update that the unknown individual cluster_id was seen again (count sightings so far)."""
+        self._queue.put(("sighting", (cluster_id, count), timestamp if timestamp is not None else time.time()))
+
+    def request_full(self, alert_id):
+        """Queues the full-size crop of a previously sent thumbnail alert."""
+        self._queue.put(("full", alert_id, None))
+
+    def pending(self):
+        """Returns the number of alerts waiting in the spool."""
+        return len(self._spooled_files())
+
+    def _spooled_files(self):
+        return sorted(f for f in os.listdir(self.spool_dir) if f.endswith(".bin"))
+
+    def _last_spooled_seq(self):
+        files = self._spooled_files()
+        return int(files[-1].split(".")[0]) if files else 0
+
+    def _spool(self, payload):
+        path = os.path.join(self.spool_dir, f"{self._next_seq:012d}.bin")
+        self._next_seq += 1
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        files = self._spooled_files()
+        for stale in files[:max(0, len(files) - self.max_spooled)]:
+            log.warning("Alert spool full, dropping oldest alert %s", stale)
+            os.remove(os.path.join(self.spool_dir, stale))
+            self._results["dropped"].inc()
+
+    def _handle(self, item):
+        kind, value, timestamp = item
+        if kind == "full":
+            payload = self._full_payloads.pop(value, None)
+            if payload is None:
+                log.warning("Full image for alert %s is no longer available.", value)
+            else:
+                self._spool(payload)
+            return
+        if kind == "sighting":
+            cluster_id, count = value
+            self._spool(self.encoder.encode_sighting(cluster_id, count, SIGHTING_MESSAGE, timestamp))
+            return
+        image, cluster_id = value
+        try:
+            with self._encode_seconds.time():
+                alert_id, payload, full = self.encoder.encode(image, ALERT_MESSAGE, timestamp, cluster_id=cluster_id)
+        except Exception as e:
+            log.error("Error preparing alert: %s", e)
+            return
+        self._spool(payload)
+        if full is not None:
+            self._full_payloads[alert_id] = full
+            while len(self._full_payloads) > ALERT_FULL_IMAGE_CACHE_SIZE:
+                self._full_payloads.popitem(last=False)
+
+    def _drain_queue(self, wait=None):
+        """Moves queued alerts to the spool, waiting up to wait seconds for the first one."""
+        try:
+            item = self._queue.get(timeout=wait) if wait else self._queue.get_nowait()
+            while True:
+                if item is not None:
+                    self._handle(item)
+                item = self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _deliver(self, filename):
+        """Posts one spooled alert. Returns True if it can be removed from the spool."""
+        with open(os.path.join(self.spool_dir, filename), "rb") as f:
+            payload = f.read()
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, data=payload, headers={"Content-Type": PAYLOAD_CONTENT_TYPE},
+                                         timeout=self.timeout)
+            if 400 <= response.status_code < 500:
+                # The server rejected the alert itself; retrying will not help
+                log.warning("Alert %s rejected by server (%s). Dropping.", filename, response.status_code)
+                self._results["rejected"].inc()
+                return True
+            response.raise_for_status()
+        except requests.RequestException as e:
+            self.failed_attempts += 1
+            self._results["failed"].inc()
+            log.error("Network error sending alert: %s", e)
+            return False
+        finally:
+            self._send_seconds.observe(time.perf_counter() - start)
+        self.sent += 1
+        self._results["sent"].inc()
+        self.bytes_sent += len(payload)
+        log.info("Alert sent successfully.")
+        if self._server_wants_full_image(response):
+            header, _ = unpack_alert(payload)
+            self.request_full(header["id"])
+        return True
+
+    @staticmethod
+    def _server_wants_full_image(response):
+        try:
+            return bool(response.json().get("request_full"))
+        except (ValueError, AttributeError):
+            return False
+
+    def flush(self):
+        """Sends spooled alerts in order. Returns False if delivery failed and should be retried."""
+        for filename in self._spooled_files():
+            if self._stop_event.is_set():
+                return True
+            if not self._deliver(filename):
+                return False
+            os.remove(os.path.join(self.spool_dir, filename))
+        return True
+
+    def _run(self):
+        backoff = 0.0
+        next_retry = 0.0  # While backing off, no send is attempted before this time.monotonic() deadline
+        while not self._stop_event.is_set():
+            # Sleep until a new alert arrives or the retry deadline passes
+            self._drain_queue(wait=max(0.0, next_retry - time.monotonic()) if backoff else 1.0)
+            if self._stop_event.is_set():
+                break
+            if backoff and time.monotonic() < next_retry:
+                continue  # Alerts arriving during an outage are only spooled
+            if self.flush():
+                backoff = 0.0
+            else:
+                backoff = min(self.backoff_max, max(self.backoff_initial, backoff * 2))
+                next_retry = time.monotonic() + backoff
+        self._drain_queue()
@@ -12,13 +12,139 @@ ULTRASONIC_ECHO = 8
 MOTOR_SPEED = 0.5
 TURN_DURATION_S = 0.5
 OBSTACLE_DISTANCE_THRESHOLD_CM = 30
+MOTOR_PWM_FREQUENCY_HZ = 1000  # PWM frequency on the motor driver enable pins
+MOTOR_RAMP_S = 0.3  # Time to ramp up to driving speed
+MOTOR_RAMP_STEP_S = 0.02  # Duty-cycle update interval during a ramp
+ESCAPE_BACKUP_S = 0.5  # How long to reverse before turning away from an obstacle
+
+# Ultrasonic Ranging
+ULTRASONIC_SAMPLE_RATE_HZ = 15  # Background sampling rate; the HC-SR04 needs ~60 ms between pings
+ULTRASONIC_FILTER_WINDOW = 5  # Median filter length in samples
+ULTRASONIC_ECHO_TIMEOUT_S = 0.03  # Longer than the round trip at maximum range
+ULTRASONIC_MAX_RANGE_CM = 400
+ULTRASONIC_STALE_S = 0.5  # Readings older than this count as no reading (inf)
+
+# LIDAR Occupancy Grid
+GRID_SIZE_M = 8.0  # Side of the square rover-centred grid
+GRID_RESOLUTION_M = 0.05  # Cell size
+GRID_LOG_ODDS_HIT = 0.85  # Added to a cell that returned an echo
+GRID_LOG_ODDS_MISS = -0.4  # Added to cells a beam passed through
+GRID_LOG_ODDS_MIN = -2.0
+GRID_LOG_ODDS_MAX = 3.5
+GRID_OCCUPIED_THRESHOLD = 0.5  # Cells above this log-odds count as occupied
+GRID_DECAY = 0.9  # Per-scan pull towards unknown, so evidence fades as the rover moves
+LIDAR_MIN_RANGE_M = 0.15  # RPLIDAR A1 blind zone
+LIDAR_MAX_RANGE_M = 6.0
+ROVER_WIDTH_M = 0.3  # Corridor width checked ahead of the rover
+NAVIGATION_SECTORS = 12  # Free-space sectors around the rover (30 degrees each)
 
 # Camera and Vision Parameters
-CAMERA_RESOLUTION = (640, 480)
+CAMERA_RESOLUTION = (640, 480)  # Single-stream capture size
+CAMERA_DUAL_STREAM = True  # Detect on a small lores stream, crop faces from the high-res main stream
+CAMERA_MAIN_RESOLUTION = (1280, 960)  # High-res stream; faces are located and encoded here
+CAMERA_LORES_RESOLUTION = (320, 240)  # Detection stream; same aspect as main, 240 rows are upsampled to the 300x300 DNN input
 DNN_MODEL_PROTOTXT = "models/dnn_prototxt.txt"
 DNN_MODEL_CAFFEMODEL = "models/dnn_caffemodel.caffemodel"
-FACE_DETECTION_MODEL = "cnn"
+DNN_MODEL_ONNX = "models/dnn_model.onnx"  # Optional ONNX (e.g. int8-quantized) MobileNet-SSD
+DETECTOR_BACKEND = "caffe"  # Registered detector to load: "caffe" or "onnx"
+DNN_PREFERABLE_BACKEND = "opencv"  # See detector.DNN_BACKENDS
+DNN_PREFERABLE_TARGET = "cpu"  # See detector.DNN_TARGETS
+DNN_NUM_THREADS = 2  # OpenCV worker threads for inference; leaves cores free for face encoding (0 = OpenCV default)
+DNN_WARMUP_RUNS = 3  # Dummy inferences run at load time
+PERSON_CONFIDENCE_THRESHOLD = 0.5
+FACE_DETECTION_MODEL = "cascade"  # "hog", "cnn", or "cascade" (cheap detector first, CNN only on misses)
+FACE_CASCADE_FIRST_TIER = "hog"  # "hog" or "opencv_dnn" (needs FACE_DNN_* model files)
+FACE_CASCADE_MIN_CNN_HEIGHT_PX = 160  # Only escalate to the CNN for regions at least this tall
+FACE_CASCADE_CNN_UPSAMPLE = 1
+FACE_DNN_PROTOTXT = "models/face_deploy.prototxt"  # OpenCV res10 SSD face detector
+FACE_DNN_CAFFEMODEL = "models/face_res10_300x300_ssd.caffemodel"
+FACE_DNN_CONFIDENCE = 0.5
+FACE_MATCH_TOLERANCE = 0.6  # Max Euclidean distance for a known-face match (face_recognition default)
+FACE_FRAME_LEVEL_PASS = True  # Merge overlapping person boxes and encode all faces of a frame in one call
+FACE_WORKERS = 0  # Face encoding processes (0 = CPU cores minus DNN_NUM_THREADS, 1 = encode in the recognition thread)
+FACE_WORKER_SLOTS_PER_WORKER = 2  # Shared-memory region slots per worker; each holds a whole high-res frame
+FACE_WORKER_START_TIMEOUT_S = 60.0  # Workers load dlib's models at start; give up if they are not all ready by then
+FACE_WORKER_START_METHOD = "forkserver"  # Workers fork from a clean server process that has dlib's models loaded
+
+# Motion Gating
+MOTION_GATE_ENABLED = True  # Skip the person DNN on frames that did not change
+MOTION_THUMBNAIL_SIZE = (64, 48)  # Grayscale thumbnail compared against the background model
+MOTION_PIXEL_THRESHOLD = 18  # Gray-level difference for a thumbnail pixel to count as changed
+MOTION_CHANGED_FRACTION = 0.01  # Fraction of changed pixels that triggers detection
+MOTION_BACKGROUND_RATE = 0.05  # Running-average learning rate of the background model
+MOTION_MAX_SKIP_FRAMES = 30  # Force a full detection at least this often
+
+# Person Tracking
+TRACK_IOU_THRESHOLD = 0.3  # Min box overlap to associate a detection with an existing track
+TRACK_MAX_MISSES = 5  # Frames a track survives without a matching detection
+TRACK_REVERIFY_EVERY = 15  # Re-run face recognition for a track every N frames
+TRACK_REVERIFY_DISTANCE = 0.5  # Re-verify early when a known match is weaker than this
+TRACK_REVERIFY_IOU = 0.6  # Re-verify early when the box moved more than this overlap allows
 
 # Database and Alert Settings
 DATABASE_PATH = "data/database.sqlite"
-ALERT_APP_URL = "http://YOUR_ALERT_APP_IP:PORT/alert"
\ No newline at end of file
+ENCODING_CACHE_DIR = "data/encoding_cache"  # Memory-mapped copy of the roster, rebuilt when the database changes
+ROSTER_WATCH_ENABLED = True  # Pick up enrollment changes while the rover is running
+ROSTER_POLL_INTERVAL_S = 2.0
+ALERT_APP_URL = "http://YOUR_ALERT_APP_IP:PORT/alert"
+ALERT_SPOOL_DIR = "data/alert_spool"  # Undelivered alerts are kept here until the server accepts them
+ALERT_SPOOL_MAX_FILES = 500  # Oldest spooled alerts are dropped beyond this
+ALERT_CONNECT_TIMEOUT_S = 3.0
+ALERT_READ_TIMEOUT_S = 5.0
+ALERT_BACKOFF_INITIAL_S = 1.0  # First retry delay after a failed send; doubles up to the max
+ALERT_BACKOFF_MAX_S = 60.0
+ALERT_BYTE_BUDGET = 12000  # Max bytes per full alert payload sent over the RF link, header included
+ALERT_THUMBNAIL_BYTE_BUDGET = 2500  # Max bytes for the thumbnail payload sent ahead of the full crop, header included
+ALERT_SEND_THUMBNAIL_FIRST = True  # Send a thumbnail now, the full crop only when requested
+ALERT_FULL_IMAGE_CACHE_SIZE = 20  # Full crops kept in memory awaiting a request
+ALERT_MIN_JPEG_QUALITY = 30
+ALERT_MAX_JPEG_QUALITY = 90
+ALERT_MIN_CROP_SIDE = 48  # Crops are not downscaled below this many pixels per side
+ALERT_CROP_MARGIN = 0.5  # Context kept around the face in the alert crop, as a fraction of face size
+
+# Unknown Person Clustering
+UNKNOWN_CLUSTER_DISTANCE = 0.5  # Max distance to a cluster's centroid; below FACE_MATCH_TOLERANCE so two strangers are not merged
+UNKNOWN_CLUSTER_MAX = 50  # Least recently seen unknown individuals are forgotten beyond this
+UNKNOWN_CLUSTER_TTL_S = 600.0  # An individual unseen for this long alerts again as new
+UNKNOWN_CLUSTER_MAX_WEIGHT = 20  # Centroid is a running mean over at most this many recent sightings
+UNKNOWN_SIGHTING_REPORT_S = 30.0  # Min seconds between sighting updates for the same individual
+
+# Enrollment
+ENROLL_IMAGE_FOLDER = "data/faces"
+ENROLL_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+ENROLL_WORKERS = 0  # Encoding processes (0 = one per CPU core)
+ENROLL_MAX_IMAGE_SIDE = 1024  # Photos are downscaled to this before face detection
+ENROLL_CNN_UPSAMPLE = 0  # Upsampling for the CNN fallback when HOG finds no face
+
+# Recording and Replay
+RECORD_JPEG_QUALITY = 90  # Frames are stored as JPEG in recordings
+RECORD_QUEUE_SIZE = 64  # Chunks buffered for the writer thread; more are dropped rather than stalling the loop
+
+# Logging
+LOG_DIR = "data/logs"
+LOG_FILE = "rover.log"
+LOG_MAX_BYTES = 1_000_000  # rover.log is rotated at this size
+LOG_BACKUP_COUNT = 5  # Rotated files kept (rover.log.1 ... rover.log.5)
+LOG_QUEUE_SIZE = 1000  # Records waiting for the writer thread; more are dropped rather than blocking
+LOG_REPEAT_WINDOW_S = 5.0  # Repeats of the same message within this window are collapsed into a count
+LOG_CONSOLE_LEVEL = "INFO"
+LOG_FILE_LEVEL = "DEBUG"
+
+# Metrics
+METRICS_ENABLED = True  # Serve latency histograms and counters while the rover runs
+METRICS_HOST = "127.0.0.1"  # Local only; scrape over an SSH tunnel from off the rover
+METRICS_PORT = 9108  # Prometheus text format at http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_LOG_DIR = "data/logs"  # Periodic summaries are appended to metrics.jsonl here
+METRICS_SUMMARY_INTERVAL_S = 60.0
+METRICS_LATENCY_BUCKETS_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Startup
+STARTUP_BACKGROUND_VISION = True  # Start obstacle avoidance while the vision models load; False waits for them first
+
+# Runtime Pipeline
+PIPELINE_QUEUE_SIZE = 1  # Frames buffered between stages; older frames are dropped when full
+FRAME_BUFFER_POOL_SIZE = 3 * PIPELINE_QUEUE_SIZE + 5  # Capture buffers per stream; must exceed the 3 * queue + 4 frames alive at once
+FRAME_BUDGET_S = 0.1  # Target loop period (10 Hz); detection cadence adapts to fit it
+SCHEDULER_EWMA_ALPHA = 0.2  # Smoothing of measured stage latencies
+SCHEDULER_MAX_DETECT_EVERY = 10  # Run the person DNN at least every N frames
+SCHEDULER_MAX_VERIFY_EVERY = 30  # Allow face re-verification at least every N frames
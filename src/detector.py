@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from config import (
+    DNN_MODEL_PROTOTXT, DNN_MODEL_CAFFEMODEL, DNN_MODEL_ONNX, DETECTOR_BACKEND, DNN_PREFERABLE_BACKEND,
+    DNN_PREFERABLE_TARGET, DNN_NUM_THREADS, DNN_WARMUP_RUNS, PERSON_CONFIDENCE_THRESHOLD
+)
+
+DNN_BACKENDS = {
+    "default": cv2.dnn.DNN_BACKEND_DEFAULT,
+    "opencv": cv2.dnn.DNN_BACKEND_OPENCV,
+    "inference_engine": cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE,
+    "vulkan": cv2.dnn.DNN_BACKEND_VKCOM,
+    "cuda": cv2.dnn.DNN_BACKEND_CUDA,
+}
+DNN_TARGETS = {
+    "cpu": cv2.dnn.DNN_TARGET_CPU,
+    "opencl": cv2.dnn.DNN_TARGET_OPENCL,
+    "opencl_fp16": cv2.dnn.DNN_TARGET_OPENCL_FP16,
+    "vulkan": cv2.dnn.DNN_TARGET_VULKAN,
+    "cuda": cv2.dnn.DNN_TARGET_CUDA,
+    "cuda_fp16": cv2.dnn.DNN_TARGET_CUDA_FP16,
+}
+
+_BLOB_INTO_BUFFER = hasattr(cv2.dnn, "blobFromImageWithParams")  # OpenCV >= 4.8 can fill a preallocated blob
+
+_registry = {}
+_detectors = {}
+_detectors_lock = threading.Lock()
+
+def register_detector(name, model_files, input_size=(300, 300), scalefactor=1.0, mean=(104.0, 177.0, 123.0)):
+    """Registers a network loader under name. The loader returns a cv2.dnn.Net."""
+    def decorator(loader):
+        _registry[name] = {
+            "loader": loader,
+            "model_files": list(model_files),
+            "input_size": input_size,
+            "scalefactor": scalefactor,
+            "mean": mean,
+        }
+        return loader
+    return decorator
+
+@register_detector("caffe", [DNN_MODEL_PROTOTXT, DNN_MODEL_CAFFEMODEL])
+def _load_caffe():
+    return cv2.dnn.readNetFromCaffe(DNN_MODEL_PROTOTXT, DNN_MODEL_CAFFEMODEL)
+
+# ONNX export of MobileNet-SSD (e.g. int8-quantized), producing the same [1, 1, N, 7] detection output
+@register_detector("onnx", [DNN_MODEL_ONNX], scalefactor=1 / 127.5, mean=(127.5, 127.5, 127.5))
+def _load_onnx():
+    return cv2.dnn.readNetFromONNX(DNN_MODEL_ONNX)
+
+def available_detectors():
+    """Returns the names of all registered detector backends."""
+    return sorted(_registry)
+
+def missing_model_files(name=DETECTOR_BACKEND):
+    """Returns the model files a detector needs that are not on disk."""
+    if name not in _registry:
+        raise KeyError(f"Unknown detector backend '{name}'. Available: {available_detectors()}")
+    return [path for path in _registry[name]["model_files"] if not os.path.exists(path)]
+
+class PersonDetector:
+    """A loaded and warmed-up person detection network, safe to share between threads."""
+    def __init__(self, name, net, input_size, scalefactor, mean):
+        self.name = name
+        self.net = net
+        self.input_size = input_size
+        self.scalefactor = scalefactor
+        self.mean = mean
+        self.inference_ms = None
+        self._buffers = InputBuffers(input_size, scalefactor, mean)
+        self._lock = threading.RLock()
+
+    def forward(self, blob):
+        """Runs one inference on a prepared input blob."""
+        with self._lock:
+            self.net.setInput(blob)
+            return self.net.forward()
+
+    def warmup(self, runs=DNN_WARMUP_RUNS):
+        """Runs dummy inferences so the first real frame does not pay for lazy initialisation."""
+        blob = np.zeros((1, 3, self.input_size[1], self.input_size[0]), dtype=np.float32)
+        timings = []
+        for _ in range(max(1, runs)):
+            start = time.perf_counter()
+            self.forward(blob)
+            timings.append((time.perf_counter() - start) * 1000.0)
+        # The first run includes one-off setup; report the steady state when we have it
+        steady = timings[1:] or timings
+        self.inference_ms = float(np.median(steady))
+        return timings
+
+    def preprocess(self, frame):
+        """Resizes a BGR frame and packs it into the network's input blob, reusing the detector's buffers.
+
+        The returned blob is overwritten by the next call.
+        """
+        with self._lock:
+            return make_input_blob(frame, self.input_size, self.scalefactor, self.mean, self._buffers)
+
+    def detect(self, frame, confidence_threshold=PERSON_CONFIDENCE_THRESHOLD):
+        """Returns (startX, startY, endX, endY) pixel boxes for detections above the threshold."""
+        h, w = frame.shape[:2]
+        with self._lock:
+            detections = self.forward(self.preprocess(frame))
+        return decode_detections(detections, w, h, confidence_threshold)
+
+class InputBuffers:
+    """Preallocated resize and blob buffers for one network input spec."""
+    def __init__(self, input_size, scalefactor, mean):
+        width, height = input_size
+        self.resized = np.empty((height, width, 3), dtype=np.uint8)
+        self.blob = np.empty((1, 3, height, width), dtype=np.float32)
+        self.params = None
+        if _BLOB_INTO_BUFFER:
+            self.params = cv2.dnn.Image2BlobParams()
+            self.params.scalefactor = (scalefactor,) * 4
+            self.params.size = tuple(input_size)
+            self.params.mean = tuple(mean) + (0.0,) * (4 - len(mean))
+            self.params.swapRB = False
+            self.params.ddepth = cv2.CV_32F
+
+def make_input_blob(frame, input_size, scalefactor, mean, buffers=None):
+    """Resizes a BGR frame to input_size and converts it to a normalised NCHW blob.
+
+    With InputBuffers the resize and the blob are written into preallocated arrays
+    (the blob only on OpenCV >= 4.8; older builds still allocate it).
+    """
+    if buffers is None:
+        return cv2.dnn.blobFromImage(cv2.resize(frame, input_size), scalefactor, input_size, mean)
+    cv2.resize(frame, input_size, dst=buffers.resized)
+    if buffers.params is None:
+        return cv2.dnn.blobFromImage(buffers.resized, scalefactor, input_size, mean)
+    return cv2.dnn.blobFromImageWithParams(buffers.resized, buffers.blob, buffers.params)
+
+def decode_detections(detections, width, height, confidence_threshold=PERSON_CONFIDENCE_THRESHOLD):
+    """Converts SSD output [1, 1, N, 7] into pixel boxes for detections above the threshold."""
+    person_boxes = []
+    for i in range(detections.shape[2]):
+        confidence = detections[0, 0, i, 2]
+        if confidence > confidence_threshold:
+            box = detections[0, 0, i, 3:7] * np.array([width, height, width, height])
+            person_boxes.append(tuple(box.astype("int")))
+    return person_boxes
+
+def input_spec(name=DETECTOR_BACKEND):
+    """Returns (input_size, scalefactor, mean) of a registered detector without loading it."""
+    entry = _registry[name]
+    return entry["input_size"], entry["scalefactor"], entry["mean"]
+
+def load_detector(name, backend=DNN_PREFERABLE_BACKEND, target=DNN_PREFERABLE_TARGET, num_threads=DNN_NUM_THREADS, warmup_runs=DNN_WARMUP_RUNS):
+    """Loads, configures and warms up a registered detector. Returns None if it cannot be loaded."""
+    entry = _registry.get(name)
+    if entry is None:
+        print(f"ERROR: Unknown detector backend '{name}'. Available: {available_detectors()}")
+        return None
+    missing = missing_model_files(name)
+    if missing:
+        print("ERROR: Model files not found")
+        for path in missing:
+            print(f"Expected: {path}")
+        return None
+    try:
+        if num_threads:
+            cv2.setNumThreads(num_threads)
+        net = entry["loader"]()
+        net.setPreferableBackend(DNN_BACKENDS[backend])
+        net.setPreferableTarget(DNN_TARGETS[target])
+        detector = PersonDetector(name, net, entry["input_size"], entry["scalefactor"], entry["mean"])
+        timings = detector.warmup(warmup_runs)
+    except (cv2.error, KeyError) as e:
+        print(f"ERROR loading person detection model '{name}': {e}")
+        return None
+    print(f"Detector '{name}' ready (backend={backend}, target={target}, threads={cv2.getNumThreads()}): "
+          f"first inference {timings[0]:.1f} ms, steady state {detector.inference_ms:.1f} ms")
+    return detector
+
+def get_detector(name=DETECTOR_BACKEND):
+    """Returns the process-wide detector for name, loading and warming it up on first use."""
+    with _detectors_lock:
+        if name not in _detectors:
+            _detectors[name] = load_detector(name)
+        return _detectors[name]
@@ -0,0 +1,53 @@
+import json
+import os
+import numpy as np
+from config import ENCODING_CACHE_DIR
+
+CACHE_ENCODINGS_FILE = "encodings.npy"
+CACHE_IDS_FILE = "ids.npy"
+CACHE_NAMES_FILE = "names.json"
+CACHE_META_FILE = "meta.json"  # Written last; its watermark says which database state the cache holds
+
+def roster_watermark(db_conn):
+    """Returns (row count, max id) of registered_personnel, which changes on every insert or delete."""
+    count, max_id = db_conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM registered_personnel").fetchone()
+    return [int(count), int(max_id)]
+
+def load_encoding_cache(watermark, cache_dir=ENCODING_CACHE_DIR):
+    """Returns (encodings, names, ids) from the cache, or None if it is missing or stale.
+
+    The encodings are a read-only float32 memory map, so loading costs almost nothing
+    and the pages are shared by every process that maps the same file.
+    """
+    try:
+        with open(os.path.join(cache_dir, CACHE_META_FILE)) as f:
+            meta = json.load(f)
+        if meta.get("watermark") != list(watermark):
+            return None
+        encodings = np.load(os.path.join(cache_dir, CACHE_ENCODINGS_FILE), mmap_mode="r")
+        ids = np.load(os.path.join(cache_dir, CACHE_IDS_FILE))
+        with open(os.path.join(cache_dir, CACHE_NAMES_FILE)) as f:
+            names = json.load(f)
+    except (OSError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"WARNING: Ignoring unreadable encoding cache: {e}")
+        return None
+    if encodings.dtype != np.float32 or not (len(encodings) == len(ids) == len(names) == meta.get("rows")):
+        return None
+    return encodings, names, ids
+
+def _replace(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def write_encoding_cache(encodings, names, ids, watermark, cache_dir=ENCODING_CACHE_DIR):
+    """Writes the roster to the cache directory, each file replaced atomically and the metadata last."""
+    os.makedirs(cache_dir, exist_ok=True)
+    encodings = np.ascontiguousarray(encodings, dtype=np.float32)
+    _replace(os.path.join(cache_dir, CACHE_ENCODINGS_FILE), lambda f: np.save(f, encodings))
+    _replace(os.path.join(cache_dir, CACHE_IDS_FILE), lambda f: np.save(f, np.asarray(ids, dtype=np.int64)))
+    _replace(os.path.join(cache_dir, CACHE_NAMES_FILE), lambda f: f.write(json.dumps(list(names)).encode()))
+    meta = {"watermark": list(watermark), "rows": len(names)}
+    _replace(os.path.join(cache_dir, CACHE_META_FILE), lambda f: f.write(json.dumps(meta).encode()))
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import face_recognition
+from face_cascade import CascadeFaceLocator
+from config import (
+    DATABASE_PATH, ENROLL_IMAGE_FOLDER, ENROLL_IMAGE_EXTENSIONS, ENROLL_WORKERS,
+    ENROLL_MAX_IMAGE_SIDE, ENROLL_CNN_UPSAMPLE
+)
+
+def ensure_enrollment_schema(db_conn):
+    """Creates the enrollment tables if needed and adds the image_hash column to older databases."""
+    db_conn.execute("""
+        CREATE TABLE IF NOT EXISTS registered_personnel (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            face_encoding BLOB NOT NULL UNIQUE,
+            image_filename TEXT,
+            image_hash TEXT
+        )
+    """)
+    columns = {row[1] for row in db_conn.execute("PRAGMA table_info(registered_personnel)")}
+    if "image_hash" not in columns:
+        db_conn.execute("ALTER TABLE registered_personnel ADD COLUMN image_hash TEXT")
+    db_conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_personnel_image_hash ON registered_personnel (image_hash)")
+    # Photos whose encoding duplicates an enrolled row, recorded so unchanged ones are skipped next run
+    db_conn.execute("""
+        CREATE TABLE IF NOT EXISTS enrollment_duplicates (
+            image_hash TEXT PRIMARY KEY,
+            image_filename TEXT,
+            face_encoding BLOB NOT NULL
+        )
+    """)
+    db_conn.commit()
+
+def name_from_filename(filename):
+    """Derives the person's name from an image filename (letters of the part before the first underscore)."""
+    base_name = os.path.splitext(filename)[0]
+    return ''.join(filter(str.isalpha, base_name.split('_')[0]))
+
+def image_hash(image_path):
+    """Returns the SHA-256 hex digest of an image file's contents."""
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+_locator = None
+
+def _init_worker():
+    global _locator
+    _locator = CascadeFaceLocator(cnn_upsample=ENROLL_CNN_UPSAMPLE)
+
+def encode_enrollment_image(image_path, max_side=ENROLL_MAX_IMAGE_SIDE):
+    """Finds the largest face in an image and encodes it.
+
+    Returns (encoding bytes or None, error message or None, {"decode": s, "encode": s}).
+    Runs inside pool workers, so it never touches the database.
+    """
+    if _locator is None:
+        _init_worker()
+    timing = {}
+    try:
+        start = time.perf_counter()
+        image = face_recognition.load_image_file(image_path)
+        scale = max_side / max(image.shape[:2])
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        timing["decode"] = time.perf_counter() - start
+        start = time.perf_counter()
+        face_locations = _locator.locate(image)
+        if not face_locations:
+            timing["encode"] = time.perf_counter() - start
+            return None, "No face found", timing
+        def face_area(loc):
+            top, right, bottom, left = loc
+            return (bottom - top) * (right - left)
+        largest = max(face_locations, key=face_area)
+        encoding = face_recognition.face_encodings(image, [largest])[0]
+        timing["encode"] = time.perf_counter() - start
+        message = f"{len(face_locations)} faces found, using the largest" if len(face_locations) > 1 else None
+        return encoding.tobytes(), message, timing
+    except Exception as e:
+        return None, str(e), timing
+
+def find_pending_images(db_conn, image_folder):
+    """Returns (filename, name, hash) for images whose content is not enrolled yet, and the number skipped."""
+    enrolled = {row[0] for row in db_conn.execute(
+        "SELECT image_hash FROM registered_personnel WHERE image_hash IS NOT NULL "
+        "UNION SELECT image_hash FROM enrollment_duplicates"
+    )}
+    pending, skipped = [], 0
+    for filename in sorted(os.listdir(image_folder)):
+        if not filename.lower().endswith(ENROLL_IMAGE_EXTENSIONS):
+            continue
+        name = name_from_filename(filename)
+        if not name:
+            print(f"Could not extract a valid name from {filename}! Skipping.")
+            continue
+        content_hash = image_hash(os.path.join(image_folder, filename))
+        if content_hash in enrolled:
+            skipped += 1
+            continue
+        enrolled.add(content_hash)
+        pending.append((filename, name, content_hash))
+    return pending, skipped
+
+def run_enrollment(image_folder=ENROLL_IMAGE_FOLDER, db_path=DATABASE_PATH, workers=ENROLL_WORKERS,
+                   encoder=encode_enrollment_image):
+    """Enrolls every new or changed image in image_folder and returns a summary dict.
+
+    Images are decoded and encoded across a process pool (workers=1 runs inline), and
+    all inserts are written in one transaction. A photo that replaced an older file of
+    the same name supersedes that file's row.
+    """
+    start = time.perf_counter()
+    db_conn = sqlite3.connect(db_path)
+    try:
+        ensure_enrollment_schema(db_conn)
+        pending, skipped = find_pending_images(db_conn, image_folder)
+        print(f"{len(pending)} new or changed images to enroll, {skipped} already enrolled.")
+        results = []
+        workers = workers or os.cpu_count() or 1
+        paths = [os.path.join(image_folder, filename) for filename, _, _ in pending]
+        if workers == 1 or len(pending) <= 1:
+            outcomes = ((i, encoder(path)) for i, path in enumerate(paths))
+            results = _collect(pending, outcomes)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = {pool.submit(encoder, path): i for i, path in enumerate(paths)}
+                results = _collect(pending, ((futures[f], f.result()) for f in as_completed(futures)))
+        enrolled = 0
+        with db_conn:
+            for filename, name, content_hash, encoding in results:
+                if _store_encoding(db_conn, filename, name, content_hash, encoding):
+                    enrolled += 1
+                else:
+                    print(f"INFO: The face encoding from {filename} already exists. Skipping.")
+    finally:
+        db_conn.close()
+    elapsed = time.perf_counter() - start
+    summary = {
+        "pending": len(pending),
+        "skipped": skipped,
+        "enrolled": enrolled,
+        "failed": len(pending) - len(results),
+        "elapsed_s": elapsed,
+        "images_per_s": len(pending) / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"Enrollment finished: {enrolled} enrolled, {summary['failed']} failed, {skipped} unchanged "
+          f"in {elapsed:.1f} s ({summary['images_per_s']:.2f} images/s).")
+    return summary
+
+def _store_encoding(db_conn, filename, name, content_hash, encoding):
+    """Writes one encoded photo, superseding the file's older row; returns False if the encoding was a duplicate."""
+    db_conn.execute("DELETE FROM enrollment_duplicates WHERE image_filename = ?", (filename,))
+    cursor = db_conn.execute(
+        "INSERT OR IGNORE INTO registered_personnel (name, face_encoding, image_filename, image_hash) VALUES (?, ?, ?, ?)",
+        (name, encoding, filename, content_hash)
+    )
+    if cursor.rowcount:
+        _delete_superseded(db_conn, "image_filename = ? AND id != ?", (filename, cursor.lastrowid))
+        return True
+    # Same face as the file's own older row: just record the new content hash
+    cursor = db_conn.execute(
+        "UPDATE registered_personnel SET image_hash = ? WHERE image_filename = ? AND face_encoding = ?",
+        (content_hash, filename, encoding)
+    )
+    if cursor.rowcount:
+        _delete_superseded(db_conn, "image_filename = ? AND image_hash != ?", (filename, content_hash))
+        return False
+    _delete_superseded(db_conn, "image_filename = ?", (filename,))
+    db_conn.execute(
+        "INSERT OR REPLACE INTO enrollment_duplicates (image_hash, image_filename, face_encoding) VALUES (?, ?, ?)",
+        (content_hash, filename, encoding)
+    )
+    return False
+
+def _delete_superseded(db_conn, where, params):
+    # Photos that duplicated a deleted row are forgotten so the next run enrolls them in its place
+    db_conn.execute(
+        f"DELETE FROM enrollment_duplicates WHERE face_encoding IN (SELECT face_encoding FROM registered_personnel WHERE {where})",
+        params
+    )
+    db_conn.execute(f"DELETE FROM registered_personnel WHERE {where}", params)
+
+def _collect(pending, outcomes):
+    results = []
+    for i, (encoding, message, timing) in outcomes:
+        filename, name, content_hash = pending[i]
+        timing_text = f"decode {timing.get('decode', 0) * 1000:.0f} ms, encode {timing.get('encode', 0) * 1000:.0f} ms"
+        if encoding is None:
+            print(f"ERROR: {filename}: {message}. Skipping. ({timing_text})")
+            continue
+        if message:
+            print(f"WARNING: {filename}: {message}.")
+        print(f"Encoded {name} from {filename} ({timing_text})")
+        results.append((i, filename, name, content_hash, encoding))
+    # Insert in folder order regardless of which worker finished first
+    return [result[1:] for result in sorted(results)]
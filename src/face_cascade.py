@@ -0,0 +1,124 @@
+import os
+import threading
+import cv2
+import numpy as np
+from config import (
+    FACE_CASCADE_FIRST_TIER, FACE_CASCADE_MIN_CNN_HEIGHT_PX, FACE_CASCADE_CNN_UPSAMPLE,
+    FACE_DNN_PROTOTXT, FACE_DNN_CAFFEMODEL, FACE_DNN_CONFIDENCE
+)
+from startup import lazy_import
+
+face_recognition = lazy_import("face_recognition")
+
+def _centre_in(location, box):
+    top, right, bottom, left = location
+    cx, cy = (left + right) / 2, (top + bottom) / 2
+    return box[0] <= cx < box[2] and box[1] <= cy < box[3]
+
+class CascadeFaceLocator:
+    """Finds faces with a cheap detector first and escalates to dlib's CNN only when needed.
+
+    The first tier is dlib's HOG detector or OpenCV's SSD face detector, run once over
+    the whole image. The CNN then runs per person box the first tier found no face in,
+    on that box's crop only, and only if the box is tall enough to hold a face the CNN
+    could find. Calls and hits are counted per tier.
+    """
+    def __init__(self, first_tier=FACE_CASCADE_FIRST_TIER, min_cnn_height=FACE_CASCADE_MIN_CNN_HEIGHT_PX,
+                 cnn_upsample=FACE_CASCADE_CNN_UPSAMPLE, dnn_confidence=FACE_DNN_CONFIDENCE):
+        self.min_cnn_height = min_cnn_height
+        self.cnn_upsample = cnn_upsample
+        self.dnn_confidence = dnn_confidence
+        self.face_net = None
+        if first_tier == "opencv_dnn":
+            self.face_net = self._load_face_net()
+            if self.face_net is None:
+                print("WARNING: OpenCV face detector unavailable, using HOG as the first cascade tier.")
+                first_tier = "hog"
+        self.first_tier = first_tier
+        self.tiers = {first_tier: {"calls": 0, "hits": 0}, "cnn": {"calls": 0, "hits": 0}}
+        self.too_small = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load_face_net():
+        if not (os.path.exists(FACE_DNN_PROTOTXT) and os.path.exists(FACE_DNN_CAFFEMODEL)):
+            print(f"ERROR: Face detector files not found: {FACE_DNN_PROTOTXT}, {FACE_DNN_CAFFEMODEL}")
+            return None
+        try:
+            return cv2.dnn.readNetFromCaffe(FACE_DNN_PROTOTXT, FACE_DNN_CAFFEMODEL)
+        except cv2.error as e:
+            print(f"ERROR loading face detector: {e}")
+            return None
+
+    def _dnn_face_locations(self, rgb_image):
+        h, w = rgb_image.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.resize(rgb_image, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0), swapRB=True)
+        with self._lock:
+            self.face_net.setInput(blob)
+            detections = self.face_net.forward()
+        locations = []
+        for i in range(detections.shape[2]):
+            if detections[0, 0, i, 2] < self.dnn_confidence:
+                continue
+            left, top, right, bottom = (detections[0, 0, i, 3:7] * [w, h, w, h]).astype(int)
+            top, left = max(0, top), max(0, left)
+            bottom, right = min(h, bottom), min(w, right)
+            if bottom > top and right > left:
+                locations.append((int(top), int(right), int(bottom), int(left)))
+        return locations
+
+    def _record(self, tier, locations):
+        with self._lock:
+            self.tiers[tier]["calls"] += 1
+            if locations:
+                self.tiers[tier]["hits"] += 1
+
+    def locate(self, rgb_image, boxes=None):
+        """Returns (top, right, bottom, left) face locations in rgb_image.
+
+        boxes are the (startX, startY, endX, endY) person boxes inside rgb_image, in its
+        coordinates; by default the whole image is one person. Each box without a
+        first-tier face is escalated to the CNN on its own.
+        """
+        if self.face_net is not None:
+            locations = self._dnn_face_locations(rgb_image)
+        else:
+            locations = face_recognition.face_locations(rgb_image, model="hog")
+        self._record(self.first_tier, locations)
+        h, w = rgb_image.shape[:2]
+        if boxes is None:
+            boxes = [(0, 0, w, h)]
+        for startX, startY, endX, endY in boxes:
+            if any(_centre_in(location, (startX, startY, endX, endY)) for location in locations):
+                continue  # Found by the first tier, or by the CNN in an overlapping box
+            if endY - startY < self.min_cnn_height:
+                with self._lock:
+                    self.too_small += 1
+                continue
+            crop = rgb_image if (startX, startY, endX, endY) == (0, 0, w, h) else np.ascontiguousarray(rgb_image[startY:endY, startX:endX])
+            found = face_recognition.face_locations(crop, number_of_times_to_upsample=self.cnn_upsample, model="cnn")
+            self._record("cnn", found)
+            locations = locations + [(top + startY, right + startX, bottom + startY, left + startX)
+                                     for top, right, bottom, left in found]
+        return locations
+
+    def stats(self):
+        """Returns calls, hits and hit rate per tier, plus how many misses were too small for the CNN."""
+        with self._lock:
+            report = {}
+            for tier, counts in self.tiers.items():
+                calls = counts["calls"]
+                report[tier] = dict(counts, hit_rate=counts["hits"] / calls if calls else 0.0)
+            report["too_small_for_cnn"] = self.too_small
+            return report
+
+_cascade = None
+_cascade_lock = threading.Lock()
+
+def get_face_cascade():
+    """Returns the process-wide cascade locator, creating it on first use."""
+    global _cascade
+    with _cascade_lock:
+        if _cascade is None:
+            _cascade = CascadeFaceLocator()
+        return _cascade
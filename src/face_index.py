@@ -0,0 +1,120 @@
+import sqlite3
+import numpy as np
+from config import DATABASE_PATH, FACE_MATCH_TOLERANCE, ENCODING_CACHE_DIR
+from encoding_cache import roster_watermark, load_encoding_cache, write_encoding_cache
+
+FACE_ENCODING_SIZE = 128
+
+class KnownFaceIndex:
+    """Known face encodings held in one contiguous float32 matrix for batched nearest-match lookups."""
+    def __init__(self, encodings=None, names=None, ids=None, tolerance=FACE_MATCH_TOLERANCE):
+        names = list(names) if names is not None else []
+        if encodings is None or len(encodings) == 0:
+            matrix = np.empty((0, FACE_ENCODING_SIZE), dtype=np.float32)
+        else:
+            matrix = np.asarray(encodings, dtype=np.float32).reshape(-1, FACE_ENCODING_SIZE)
+        if len(names) != matrix.shape[0]:
+            raise ValueError(f"Got {matrix.shape[0]} encodings but {len(names)} names")
+        self.encodings = np.ascontiguousarray(matrix)
+        self.names = names
+        if ids is None:
+            ids = np.arange(len(names))
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.tolerance = tolerance
+        # Squared norms of the known rows, so distances reduce to one matrix product per frame
+        self._sq_norms = np.einsum("ij,ij->i", self.encodings, self.encodings)
+
+    @staticmethod
+    def _read_rows(conn):
+        rows = conn.execute("SELECT id, name, face_encoding FROM registered_personnel ORDER BY id").fetchall()
+        ids, names, blobs = [], [], []
+        for row_id, name, encoding_blob in rows:
+            if len(encoding_blob) != FACE_ENCODING_SIZE * 8:
+                print(f"Warning: Invalid encoding for {name}")
+                continue
+            ids.append(row_id)
+            names.append(name)
+            blobs.append(encoding_blob)
+        encodings = np.frombuffer(b"".join(blobs), dtype=np.float64).reshape(-1, FACE_ENCODING_SIZE)
+        return encodings, names, ids
+
+    @classmethod
+    def from_db(cls, db_path=DATABASE_PATH, tolerance=FACE_MATCH_TOLERANCE):
+        """Loads every row of registered_personnel into a new index."""
+        conn = sqlite3.connect(db_path)
+        try:
+            encodings, names, ids = cls._read_rows(conn)
+        finally:
+            conn.close()
+        return cls(encodings, names, ids, tolerance)
+
+    @classmethod
+    def from_cache(cls, db_path=DATABASE_PATH, cache_dir=ENCODING_CACHE_DIR, tolerance=FACE_MATCH_TOLERANCE):
+        """Loads the index from the memory-mapped encoding cache.
+
+        If the cache is missing or the database changed since it was written, the rows
+        are read from SQLite instead and the cache is regenerated.
+        """
+        conn = sqlite3.connect(db_path)
+        try:
+            # Read the watermark and the rows from one snapshot of the database
+            conn.execute("BEGIN")
+            watermark = roster_watermark(conn)
+            cached = load_encoding_cache(watermark, cache_dir)
+            if cached is not None:
+                return cls(*cached, tolerance=tolerance)
+            encodings, names, ids = cls._read_rows(conn)
+        finally:
+            conn.close()
+        index = cls(encodings, names, ids, tolerance)
+        try:
+            write_encoding_cache(index.encodings, names, ids, watermark, cache_dir)
+        except OSError as e:
+            print(f"WARNING: Could not write encoding cache: {e}")
+        return index
+
+    def with_changes(self, added_encodings=(), added_names=(), added_ids=(), removed_ids=()):
+        """Returns a new index with rows removed and appended, leaving this one untouched.
+
+        Existing rows keep their float32 encodings and precomputed norms, so only the
+        changed rows are converted. Readers of this index are never affected.
+        """
+        keep = ~np.isin(self.ids, np.asarray(list(removed_ids), dtype=np.int64))
+        added = KnownFaceIndex(added_encodings, added_names, added_ids, self.tolerance)
+        index = KnownFaceIndex.__new__(KnownFaceIndex)
+        index.encodings = np.ascontiguousarray(np.concatenate((self.encodings[keep], added.encodings)))
+        index.names = [name for name, kept in zip(self.names, keep) if kept] + added.names
+        index.ids = np.concatenate((self.ids[keep], added.ids))
+        index.tolerance = self.tolerance
+        index._sq_norms = np.concatenate((self._sq_norms[keep], added._sq_norms))
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    def distances(self, face_encodings):
+        """Returns the (faces x known) matrix of Euclidean distances."""
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, FACE_ENCODING_SIZE)
+        sq_queries = np.einsum("ij,ij->i", queries, queries)
+        sq_dist = sq_queries[:, None] + self._sq_norms[None, :] - 2.0 * (queries @ self.encodings.T)
+        np.maximum(sq_dist, 0.0, out=sq_dist)
+        return np.sqrt(sq_dist)
+
+    def match(self, face_encodings):
+        """Matches all faces of a frame at once.
+
+        Returns one (name, distance) pair per face: the closest known identity, or
+        "Unknown" when the roster is empty or the closest match is beyond tolerance.
+        """
+        if len(face_encodings) == 0:
+            return []
+        if len(self) == 0:
+            return [("Unknown", float("inf")) for _ in range(len(face_encodings))]
+        dist = self.distances(face_encodings)
+        best = np.argmin(dist, axis=1)
+        best_dist = dist[np.arange(len(best)), best]
+        results = []
+        for index, distance in zip(best, best_dist):
+            name = self.names[index] if distance <= self.tolerance else "Unknown"
+            results.append((name, float(distance)))
+        return results
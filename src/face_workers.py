@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from config import (
+    FACE_WORKERS, FACE_WORKER_SLOTS_PER_WORKER, FACE_WORKER_START_METHOD, FACE_DETECTION_MODEL,
+    CAMERA_RESOLUTION, CAMERA_MAIN_RESOLUTION, DNN_NUM_THREADS, FACE_WORKER_START_TIMEOUT_S
+)
+from vision_processing import clip_box, merge_overlapping_boxes, boxes_in_region, assign_faces_to_boxes, encode_region, face_recognition
+from face_cascade import get_face_cascade
+from rover_log import get_logger
+
+log = get_logger("face_workers")
+
+# Largest region a slot holds: a whole frame of either camera stream
+DEFAULT_SLOT_SHAPE = (max(CAMERA_RESOLUTION[1], CAMERA_MAIN_RESOLUTION[1]), max(CAMERA_RESOLUTION[0], CAMERA_MAIN_RESOLUTION[0]), 3)
+
+_shm = None
+_model = None
+
+def default_face_workers():
+    """Cores left once the person detector's inference threads have theirs, at least one."""
+    return max(1, (os.cpu_count() or 1) - DNN_NUM_THREADS)
+
+def _init_worker(shm_name, model, ready):
+    """Attaches to the shared region buffer, loads dlib's models once for the worker's lifetime, then reports ready."""
+    global _shm, _model
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _model = model
+    face_recognition.load()
+    if model == "cascade":
+        get_face_cascade()
+    ready.wait()
+
+def _noop():
+    return None
+
+def _encode_slot(offset, shape, boxes=None):
+    """Encodes the RGB region the parent wrote at offset in the shared buffer."""
+    region = np.ndarray(shape, dtype=np.uint8, buffer=_shm.buf, offset=offset)
+    locations, encodings = encode_region(region, _model, boxes)
+    return locations, [np.asarray(encoding) for encoding in encodings]
+
+class FaceWorkerPool:
+    """Locates and encodes faces in person regions on long-lived worker processes, one per core.
+
+    dlib's face encoding is single-threaded and holds the GIL, so the recognition thread
+    alone uses one core. Here each region is converted to RGB straight into a slot of one
+    shared-memory buffer and a worker is sent only the slot's offset and shape; no pixels
+    are pickled. Results (locations and 128-d encodings) are small and come back pickled.
+    Workers load dlib's models once at start and keep them. Regions larger than a slot,
+    and all regions after a worker crash, are encoded in the calling thread instead.
+    """
+    def __init__(self, workers=FACE_WORKERS, model=FACE_DETECTION_MODEL, slot_shape=DEFAULT_SLOT_SHAPE,
+                 slots_per_worker=FACE_WORKER_SLOTS_PER_WORKER, start_method=FACE_WORKER_START_METHOD):
+        self.workers = workers or default_face_workers()
+        self.model = model
+        self.slot_bytes = int(np.prod(slot_shape))
+        self.slots = self.workers * slots_per_worker
+        self.start_method = start_method
+        self.regions = 0
+        self.inline = 0
+        self.faces = 0
+        self.broken = False
+        self._shm = None
+        self._pool = None
+        self._free = queue.Queue()
+
+    def start(self, timeout=FACE_WORKER_START_TIMEOUT_S):
+        """Creates the shared buffer and starts the workers; returns once every worker has its models loaded."""
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slots)
+        for slot in range(self.slots):
+            self._free.put(slot)
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver":
+            # The server imports face_recognition once; workers fork from it and share dlib's model memory
+            context.set_forkserver_preload(["face_workers", "face_recognition"])
+        # Every worker's initializer waits here, so none can take a second task before all are up
+        ready = context.Barrier(self.workers + 1)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                         initializer=_init_worker, initargs=(self._shm.name, self.model, ready))
+        started = [self._pool.submit(_noop) for _ in range(self.workers)]  # One task per worker makes the pool spawn them all
+        try:
+            ready.wait(timeout)
+        except threading.BrokenBarrierError:
+            self.stop()
+            raise RuntimeError(f"Face workers did not start within {timeout} s")
+        for future in started:
+            future.result()
+        log.info("Face worker pool started: %d workers, %d shared slots of %d KiB", self.workers, self.slots, self.slot_bytes // 1024)
+        return self
+
+    def stop(self):
+        """Stops the workers and frees the shared buffer."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _submit(self, crop, boxes=None):
+        slot = self._free.get()  # Waits for a worker to finish with a slot when all are in use
+        offset = slot * self.slot_bytes
+        view = np.ndarray(crop.shape, dtype=np.uint8, buffer=self._shm.buf, offset=offset)
+        cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=view)
+        del view  # The buffer cannot be closed while views on it exist
+        try:
+            future = self._pool.submit(_encode_slot, offset, crop.shape, boxes)
+        except BrokenProcessPool:
+            self._free.put(slot)
+            raise
+        future.add_done_callback(lambda _, slot=slot: self._free.put(slot))
+        return future
+
+    def _encode_inline(self, crop, boxes=None):
+        self.inline += 1
+        return encode_region(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB), self.model, boxes)
+
+    def encode_regions(self, bgr_image, regions, region_boxes=None):
+        """Locates and encodes the faces in each (startX, startY, endX, endY) region of a BGR image in parallel.
+
+        region_boxes optionally gives, per region, the region-relative person boxes it was
+        merged from (see vision_processing.encode_region). Returns one (locations, encodings)
+        pair per region, with locations in image coordinates.
+        """
+        crops = [bgr_image[startY:endY, startX:endX] for startX, startY, endX, endY in regions]
+        region_boxes = region_boxes or [None] * len(crops)
+        jobs = [None] * len(crops)
+        for i, crop in enumerate(crops):
+            if crop.size and crop.nbytes <= self.slot_bytes and not self.broken:
+                try:
+                    jobs[i] = self._submit(crop, region_boxes[i])
+                except BrokenProcessPool:
+                    self._mark_broken()
+        results = []
+        for (startX, startY, _, _), crop, job, boxes in zip(regions, crops, jobs, region_boxes):
+            if not crop.size:
+                results.append(([], []))
+                continue
+            locations, encodings = None, None
+            if job is not None:
+                try:
+                    locations, encodings = job.result()
+                except BrokenProcessPool:
+                    self._mark_broken()
+            if locations is None:
+                locations, encodings = self._encode_inline(crop, boxes)
+            self.regions += 1
+            self.faces += len(locations)
+            results.append(([(top + startY, right + startX, bottom + startY, left + startX)
+                             for top, right, bottom, left in locations], encodings))
+        return results
+
+    def _mark_broken(self):
+        if not self.broken:
+            self.broken = True
+            log.error("Face worker pool broke (a worker died); encoding faces in-process from now on")
+
+    def encode_faces_in_regions(self, bgr_image, boxes):
+        """Drop-in for vision_processing.encode_faces_in_regions that spreads the merged regions across the workers."""
+        h, w = bgr_image.shape[:2]
+        boxes = [clip_box(box, w, h) for box in boxes]
+        regions = merge_overlapping_boxes(boxes)
+        locations, encodings = [], []
+        for region_locations, region_encodings in self.encode_regions(bgr_image, regions, [boxes_in_region(boxes, region) for region in regions]):
+            locations.extend(region_locations)
+            encodings.extend(region_encodings)
+        return locations, encodings, assign_faces_to_boxes(locations, boxes)
+
+    def stats(self):
+        """Returns the worker count, regions and faces encoded, and regions that fell back to in-process encoding."""
+        return {"workers": self.workers, "regions": self.regions, "faces": self.faces, "inline": self.inline}
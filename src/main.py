@@ -1,17 +1,46 @@
 import asyncio
 import platform
+import random
 import time
 import sys
 import os
 import sqlite3
 import argparse
-import base64
-import io
-import numpy as np
-import cv2
-import face_recognition
-import requests
-from PIL import Image
+import itertools
+from startup import StartupClock, BackgroundLoader, lazy_import
+
+STARTUP = StartupClock()  # Time-to-first-motion and time-to-first-detection are measured from here
+
+from config import (
+    PIPELINE_QUEUE_SIZE, FACE_DETECTION_MODEL, FACE_FRAME_LEVEL_PASS, MOTION_GATE_ENABLED,
+    MOTOR_RAMP_S, ESCAPE_BACKUP_S, ROSTER_WATCH_ENABLED, METRICS_ENABLED,
+    CAMERA_DUAL_STREAM, CAMERA_MAIN_RESOLUTION, CAMERA_LORES_RESOLUTION, STARTUP_BACKGROUND_VISION, FACE_WORKERS,
+    FRAME_BUFFER_POOL_SIZE
+)
+from pipeline import RoverPipeline, FramePacket, FrameStats, max_frames_in_flight
+from scheduler import CadenceScheduler, DETECT, TRACK
+from ranging import get_ranger, stop_ranger
+from motion_controller import MotionController, close_motor_backend
+from metrics import get_metrics, MetricsServer, MetricsSummaryWriter
+from rover_log import get_logger, setup_logging, stop_logging
+
+# Imported on first use: OpenCV, numpy, dlib (face_recognition) and requests take seconds to load on
+# a Pi, and GPIO and obstacle avoidance need none of them
+cv2 = lazy_import("cv2")
+face_recognition = lazy_import("face_recognition")
+vision_processing = lazy_import("vision_processing")
+face_cascade = lazy_import("face_cascade")
+face_workers = lazy_import("face_workers")
+face_index = lazy_import("face_index")
+tracker = lazy_import("tracker")
+detector = lazy_import("detector")
+motion_gate = lazy_import("motion_gate")
+alert_payload = lazy_import("alert_payload")
+communication = lazy_import("communication")
+enrollment = lazy_import("enrollment")
+roster_watcher = lazy_import("roster_watcher")
+unknown_clusters = lazy_import("unknown_clusters")
+sources = lazy_import("sources")
 
 try:
     import RPi.GPIO as GPIO
@@ -21,13 +50,6 @@ except (ImportError, RuntimeError):
     print("Motor and Sensor functions will be simulated.")
     gpio_available = False
 
-try:
-    from picamera2 import Picamera2
-    picamera_available = True
-except ImportError:
-    print("WARNING: Picamera2 library not found. Camera functions will be simulated.")
-    picamera_available = False
-
 # Constants
 MOTOR_LEFT_FORWARD = 17
 MOTOR_LEFT_BACKWARD = 27
@@ -41,17 +63,43 @@ MOTOR_SPEED = 0.5
 TURN_DURATION_S = 0.5
 OBSTACLE_DISTANCE_THRESHOLD_CM = 30
 CAMERA_RESOLUTION = (640, 480)
-DNN_MODEL_PROTOTXT = "models/dnn_prototxt.txt"
-DNN_MODEL_CAFFEMODEL = "models/dnn_caffemodel.caffemodel"
 DATABASE_PATH = "data/database.sqlite"
 ALERT_APP_URL = "http://YOUR_ALERT_APP_IP:PORT/alert"
-FACE_DETECTION_MODEL = "cnn"
 
 # Global Variables
-person_net = None
+person_detector = None
+last_person_boxes = []
 picam2 = None
-KNOWN_FACE_ENCODINGS = []
-KNOWN_FACE_NAMES = []
+FRAME_SOURCE = None
+DISTANCE_SOURCE = None  # Replaces the ultrasonic ranger during replay
+RECORDER = None
+KNOWN_FACES = None  # KnownFaceIndex, loaded in the background by start_vision_loading()
+PERSON_TRACKER = None  # Created with MOTION_GATE and UNKNOWN_CLUSTERS by create_vision_state()
+UNKNOWN_CLUSTERS = None
+MOTION_GATE = None
+VISION_LOADER = None
+FACE_WORKER_POOL = None  # FaceWorkerPool when faces are encoded on worker processes
+SCHEDULER = CadenceScheduler()
+ROSTER_WATCHER = None
+ANNOTATE_FRAMES = False  # Boxes and names are only drawn while something displays the frames
+MOTION = MotionController()
+log = get_logger("main")
+METRICS = get_metrics()
+STAGE_SECONDS = {stage: METRICS.histogram("rover_stage_seconds", "Rover loop stage latency", stage=stage)
+                 for stage in ("capture", "detect", "verify", "other", "navigate")}
+FRAME_LATENCY_SECONDS = METRICS.histogram("rover_frame_latency_seconds", "Capture to fully processed frame")
+LOOP_SECONDS = METRICS.histogram("rover_loop_seconds", "Rover loop iteration, excluding the frame-budget sleep")
+FRAMES_PROCESSED = METRICS.counter("rover_frames_total", "Frames fully processed")
+GATED_DETECTIONS = METRICS.counter("rover_detections_gated_total", "Detection frames whose person DNN the motion gate skipped")
+
+def load_picamera():
+    """Imports Picamera2 when the camera is first set up; returns the class, or None if the library is missing."""
+    try:
+        from picamera2 import Picamera2
+    except ImportError:
+        print("WARNING: Picamera2 library not found. Camera functions will be simulated.")
+        return None
+    return Picamera2
 
 def setup_gpio():
     """Sets up GPIO pins for motors and sensors."""
@@ -77,264 +125,413 @@ def setup_gpio():
 
 def cleanup_gpio():
     """Cleans up GPIO settings."""
+    stop_ranger()
+    # The motion thread runs with the simulated backend too
+    stop_motors()
+    MOTION.close()
     if not gpio_available:
         print("SIMULATION: Skipping GPIO cleanup.")
         return
     print("Cleaning up GPIO...")
     try:
-        stop_motors()
+        close_motor_backend()
         GPIO.cleanup()
         print("GPIO cleanup finished.")
     except Exception as e:
         print(f"Error during GPIO cleanup: {e}")
 
-def set_motor_speeds(left_speed, right_speed):
-    """Sets motor speeds. Positive for forward, negative for backward."""
-    if not gpio_available:
-        print(f"SIMULATION: Setting motor speeds: left={left_speed}, right={right_speed}")
-        return
-    GPIO.output(MOTOR_LEFT_FORWARD, left_speed > 0)
-    GPIO.output(MOTOR_LEFT_BACKWARD, left_speed < 0)
-    GPIO.output(MOTOR_LEFT_ENABLE, abs(left_speed) > 0)
-    GPIO.output(MOTOR_RIGHT_FORWARD, right_speed > 0)
-    GPIO.output(MOTOR_RIGHT_BACKWARD, right_speed < 0)
-    GPIO.output(MOTOR_RIGHT_ENABLE, abs(right_speed) > 0)
-
 def move_forward():
-    """Moves the rover forward."""
-    print("Moving forward")
-    set_motor_speeds(MOTOR_SPEED, MOTOR_SPEED)
+    """Ramps up to forward speed and holds it until another command; returns a MotionHandle."""
+    log.info("Moving forward")
+    return MOTION.drive(MOTOR_SPEED, MOTOR_SPEED, ramp_s=MOTOR_RAMP_S)
 
 def move_backward():
-    """Moves the rover backward."""
-    print("Moving backward")
-    set_motor_speeds(-MOTOR_SPEED, -MOTOR_SPEED)
+    """Ramps up to reverse speed and holds it until another command; returns a MotionHandle."""
+    log.info("Moving backward")
+    return MOTION.drive(-MOTOR_SPEED, -MOTOR_SPEED, ramp_s=MOTOR_RAMP_S)
 
 def turn_left():
-    """Turns the rover left."""
-    print("Turning left")
-    set_motor_speeds(-MOTOR_SPEED, MOTOR_SPEED)
-    time.sleep(TURN_DURATION_S)
-    stop_motors()
+    """Turns the rover left for TURN_DURATION_S without blocking; returns a MotionHandle."""
+    log.info("Turning left")
+    return MOTION.drive(-MOTOR_SPEED, MOTOR_SPEED, TURN_DURATION_S)
 
 def turn_right():
-    """Turns the rover right."""
-    print("Turning right")
-    set_motor_speeds(MOTOR_SPEED, -MOTOR_SPEED)
-    time.sleep(TURN_DURATION_S)
-    stop_motors()
+    """Turns the rover right for TURN_DURATION_S without blocking; returns a MotionHandle."""
+    log.info("Turning right")
+    return MOTION.drive(MOTOR_SPEED, -MOTOR_SPEED, TURN_DURATION_S)
+
+def escape_obstacle():
+    """Stops, reverses, then turns away in a random direction; returns a MotionHandle."""
+    turn = (-MOTOR_SPEED, MOTOR_SPEED) if random.random() < 0.5 else (MOTOR_SPEED, -MOTOR_SPEED)
+    return MOTION.sequence([
+        (-MOTOR_SPEED, -MOTOR_SPEED, ESCAPE_BACKUP_S),
+        (0.0, 0.0, 0.0),
+        (turn[0], turn[1], TURN_DURATION_S),
+    ], name="escape")
 
 def stop_motors():
-    """Stops all motors."""
-    print("Stopping motors")
-    set_motor_speeds(0, 0)
+    """Stops all motors immediately, preempting any maneuver."""
+    log.info("Stopping motors")
+    MOTION.stop()
 
 def get_distance_cm():
-    """Measures distance using ultrasonic sensor."""
-    if not gpio_available:
-        print("SIMULATION: Returning random distance for testing.")
-        return np.random.uniform(10, 100)
-    try:
-        GPIO.output(ULTRASONIC_TRIG, True)
-        time.sleep(0.00001)
-        GPIO.output(ULTRASONIC_TRIG, False)
-        start_time = time.time()
-        while GPIO.input(ULTRASONIC_ECHO) == 0:
-            start_time = time.time()
-        while GPIO.input(ULTRASONIC_ECHO) == 1:
-            end_time = time.time()
-        duration = end_time - start_time
-        distance = (duration * 34300) / 2  # Speed of sound in cm/s
-        return distance
-    except Exception as e:
-        print(f"Error measuring distance: {e}")
-        return float('inf')
+    """Returns the latest filtered distance from the ultrasonic ranger, or from the replayed recording."""
+    distance = DISTANCE_SOURCE.distance_cm() if DISTANCE_SOURCE is not None else get_ranger().distance_cm()
+    if RECORDER is not None:
+        RECORDER.record_distance(distance, time.monotonic())
+    return distance
 
 def check_obstacle():
     """Checks for obstacles within threshold distance."""
     distance = get_distance_cm()
     if distance < OBSTACLE_DISTANCE_THRESHOLD_CM:
-        print(f"Obstacle DETECTED at {distance:.1f} cm")
+        log.warning("Obstacle DETECTED at %.1f cm", distance)
         return True
     return False
 
 def load_dnn_model():
     """Loads the DNN model for person detection."""
-    global person_net
-    try:
-        if os.path.exists(DNN_MODEL_PROTOTXT) and os.path.exists(DNN_MODEL_CAFFEMODEL):
-            person_net = cv2.dnn.readNetFromCaffe(DNN_MODEL_PROTOTXT, DNN_MODEL_CAFFEMODEL)
-        else:
-            print("ERROR: Model files not found")
-            print(f"Expected: {DNN_MODEL_PROTOTXT}")
-            print(f"Expected: {DNN_MODEL_CAFFEMODEL}")
-            person_net = None
-    except cv2.error as e:
-        print(f"ERROR loading person detection model: {e}")
-        person_net = None
+    global person_detector
+    person_detector = detector.get_detector()
 
 def load_known_faces_from_db():
     """Loads known face encodings and names from SQLite database."""
-    global KNOWN_FACE_ENCODINGS, KNOWN_FACE_NAMES
-    KNOWN_FACE_ENCODINGS = []
-    KNOWN_FACE_NAMES = []
+    global KNOWN_FACES
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, face_encoding FROM registered_personnel")
-        rows = cursor.fetchall()
-        for row in rows:
-            name, encoding_blob = row
-            encoding = np.frombuffer(encoding_blob, dtype=np.float64)
-            if encoding.shape == (128,):
-                KNOWN_FACE_NAMES.append(name)
-                KNOWN_FACE_ENCODINGS.append(encoding)
-            else:
-                print(f"Warning: Invalid encoding for {name}")
-        conn.close()
+        start = time.perf_counter()
+        KNOWN_FACES = face_index.KnownFaceIndex.from_cache(DATABASE_PATH)
+        print(f"Loaded {len(KNOWN_FACES)} known faces in {(time.perf_counter() - start) * 1000:.1f} ms.")
     except sqlite3.Error as e:
         print(f"Database error: {e}")
+        KNOWN_FACES = face_index.KnownFaceIndex()
 
-def setup_database_for_enrollment():
-    """Creates the database table if it doesn't exist."""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS registered_personnel (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                face_encoding BLOB NOT NULL UNIQUE,
-                image_filename TEXT
-            )
-        """)
-        conn.commit()
-        print(f"Database {DATABASE_PATH} checked/created")
-        return conn
-    except sqlite3.Error as e:
-        print(f"Database setup error: {e}")
+def set_known_faces(index):
+    """Swaps in an updated roster; frames already in progress keep the index they started with."""
+    global KNOWN_FACES
+    KNOWN_FACES = index
+
+def start_roster_watcher():
+    """Starts watching the database for enrollment changes while the rover runs."""
+    global ROSTER_WATCHER
+    if not ROSTER_WATCH_ENABLED or not os.path.exists(DATABASE_PATH):
+        return
+    ROSTER_WATCHER = roster_watcher.RosterWatcher(KNOWN_FACES, set_known_faces, DATABASE_PATH)
+    ROSTER_WATCHER.start()
+
+def run_enrollment_process():
+    """Enrolls new or changed faces from the enrollment folder into the database."""
+    enrollment.run_enrollment(db_path=DATABASE_PATH)
+
+def load_face_models():
+    """Imports face_recognition, which loads dlib's models, and builds the face cascade if it is used."""
+    face_recognition.load()
+    if FACE_DETECTION_MODEL == "cascade":
+        face_cascade.get_face_cascade()
+
+def load_roster():
+    """Loads the known faces, then starts watching the database for enrollment changes."""
+    load_known_faces_from_db()
+    start_roster_watcher()
+
+def start_alert_dispatcher():
+    """Starts the background alert dispatcher and returns it."""
+    dispatcher = communication.AlertDispatcher(url=ALERT_APP_URL)
+    dispatcher.start()
+    return dispatcher
+
+def start_face_workers(workers=FACE_WORKERS):
+    """Starts the face encoding worker processes; with a single worker faces are encoded in-process instead."""
+    global FACE_WORKER_POOL
+    if (workers or face_workers.default_face_workers()) == 1:
         return None
-    finally:
-        if conn:
-            conn.close()
+    FACE_WORKER_POOL = face_workers.FaceWorkerPool(workers).start()
+    print(f"Encoding faces on {FACE_WORKER_POOL.workers} worker processes.")
+    return FACE_WORKER_POOL
 
-def enroll_single_face(db_conn, image_path, name):
-    """Enrolls a single face into the database."""
-    try:
-        image = face_recognition.load_image_file(image_path)
-        face_locations = face_recognition.face_locations(image, number_of_times_to_upsample=1, model='cnn')
-        if not face_locations:
-            print(f"ERROR: No face found in {os.path.basename(image_path)}. Skipping.")
-            return False
-        if len(face_locations) > 1:
-            print(f"WARNING: Multiple faces ({len(face_locations)}) found in {os.path.basename(image_path)}. Using the largest one.")
-            def face_area(loc):
-                top, right, bottom, left = loc
-                return (bottom - top) * (right - left)
-            face_locations = [max(face_locations, key=face_area)]
-        face_encoding = face_recognition.face_encodings(image, face_locations)[0]
-        encoding_blob = face_encoding.tobytes()
-        cursor = db_conn.cursor()
-        cursor.execute(
-            "INSERT INTO registered_personnel (name, face_encoding, image_filename) VALUES (?, ?, ?)",
-            (name, encoding_blob, os.path.basename(image_path))
-        )
-        db_conn.commit()
-        print(f"Successfully enrolled {name} from {os.path.basename(image_path)}")
-        return True
-    except sqlite3.IntegrityError:
-        print(f"INFO: This exact face encoding might already exist for {name} or another person. Skipping.")
-        return False
-    except FileNotFoundError:
-        print(f"ERROR: Image file not found: {image_path}")
-        return False
-    except Exception as e:
-        print(f"ERROR processing image {os.path.basename(image_path)}: {e}")
+def start_vision_loading(workers=FACE_WORKERS):
+    """Loads the person detector, face models, roster, alert link and face workers concurrently on background threads."""
+    global VISION_LOADER
+    VISION_LOADER = BackgroundLoader({
+        "person_detector": load_dnn_model,
+        "face_models": load_face_models,
+        "roster": load_roster,
+        "alerts": start_alert_dispatcher,
+        "face_workers": lambda: start_face_workers(workers),
+    }).start()
+    return VISION_LOADER
+
+def create_vision_state():
+    """Creates the person tracker, motion gate and unknown-person clusters."""
+    global PERSON_TRACKER, MOTION_GATE, UNKNOWN_CLUSTERS
+    PERSON_TRACKER = tracker.PersonTracker()
+    MOTION_GATE = motion_gate.MotionGate()
+    UNKNOWN_CLUSTERS = unknown_clusters.UnknownClusterStore()
+
+def join_vision(loader):
+    """Checks the finished background loads; returns True if the vision path can run."""
+    global KNOWN_FACES
+    for name, error in loader.errors.items():
+        log.error("Startup task %s failed: %s", name, error)
+    if KNOWN_FACES is None:
+        KNOWN_FACES = face_index.KnownFaceIndex()
+    timings = ", ".join(f"{name} {seconds:.2f} s" for name, seconds in sorted(loader.seconds.items()))
+    if person_detector is None or "face_models" in loader.errors:
+        print(f"Vision unavailable ({timings}); continuing with obstacle avoidance only.")
         return False
+    report_startup("vision_ready")
+    print(f"Vision ready ({timings}).")
+    return True
+
+def detect_persons(frame):
+    """Runs the person detection DNN on a frame; returns person boxes in pixel coordinates and whether the DNN ran.
+
+    When motion gating is enabled and the scene has not changed since the last
+    detection (and the rover is not moving), the previous boxes are reused instead.
+    """
+    global last_person_boxes
+    if MOTION_GATE_ENABLED:
+        MOTION_GATE.set_ego_motion(MOTION.moving)
+        if not MOTION_GATE.should_detect(frame):
+            return last_person_boxes, False
+    last_person_boxes = person_detector.detect(frame)
+    return last_person_boxes, True
+
+def set_annotation(enabled):
+    """Turns drawing face boxes and names into frames on or off; enable it while a display or stream consumes frames."""
+    global ANNOTATE_FRAMES
+    ANNOTATE_FRAMES = enabled
+
+def report_startup(milestone):
+    """Logs and records how long after startup a milestone was reached, the first time only."""
+    if STARTUP.elapsed(milestone) is not None:
+        return
+    elapsed = STARTUP.mark(milestone)
+    if elapsed is not None:
+        METRICS.histogram("rover_startup_seconds", "Seconds from startup to each milestone", milestone=milestone).observe(elapsed)
+        log.info("Startup: %s after %.2f s", milestone.replace("_", " "), elapsed)
 
-def process_frame_for_persons_and_faces(frame):
-    """Processes a frame for person and face detection."""
+def record_stage(stage, seconds):
+    """Feeds one stage latency to the cadence scheduler and the metrics registry."""
+    SCHEDULER.record(stage, seconds)
+    STAGE_SECONDS[stage].observe(seconds)
+
+def select_person_boxes(frame, action):
+    """Runs person detection on DETECT frames; other frames reuse the last boxes."""
+    if action != DETECT:
+        return last_person_boxes
+    start = time.monotonic()
+    person_boxes, dnn_ran = detect_persons(frame)
+    if dnn_ran:
+        record_stage("detect", time.monotonic() - start)
+    else:
+        # A gated skip costs almost nothing; feeding it to the scheduler would hide the DNN's real cost
+        GATED_DETECTIONS.inc()
+    if FRAME_SOURCE is not None:
+        # The high-res stream is only copied while someone is in view
+        FRAME_SOURCE.want_hires(bool(person_boxes))
+    report_startup("first_detection")
+    return person_boxes
+
+def identify_faces(rgb_roi, known_faces):
+    """Locates and identifies faces in an RGB ROI, returning (location, name, distance) tuples and their encodings."""
+    face_locations = vision_processing.locate_faces(rgb_roi, FACE_DETECTION_MODEL)
+    if not face_locations:
+        return [], []
+    face_encodings = face_recognition.face_encodings(rgb_roi, face_locations)
+    matches = known_faces.match(face_encodings)
+    return [(location, name, distance) for location, (name, distance) in zip(face_locations, matches)], face_encodings
+
+def cluster_unknown_faces(track, faces, encodings, sightings):
+    """Assigns the track's unknown faces to unknown-person clusters, appending (track, face index, Sighting) to sightings."""
+    for i, ((_, name, _), encoding) in enumerate(zip(faces, encodings)):
+        if name == "Unknown":
+            sightings.append((track, i, UNKNOWN_CLUSTERS.observe(encoding)))
+
+def verify_tracks(image, tracks, known_faces, scale=(1.0, 1.0)):
+    """Re-runs face recognition for the given tracks and caches the result on each of them.
+
+    image is a BGR frame, possibly the high-res camera stream, which is scale times
+    the size of the frame the track boxes refer to. Only the pixels inside the boxes
+    are converted and searched; cached faces are stored in track-box coordinates.
+    In frame-level mode, overlapping person boxes are merged so each pixel is searched
+    for faces once. Unknown faces are assigned to unknown-person clusters; returns
+    their (track, face index, Sighting) triples.
+    """
+    frame_index = PERSON_TRACKER.frame_index
+    sightings = []
+    sx, sy = scale
+    h, w = image.shape[:2]
+    boxes = [vision_processing.clip_box(vision_processing.scale_box(track.box, sx, sy), w, h) for track in tracks]
+    if not FACE_FRAME_LEVEL_PASS and FACE_WORKER_POOL is not None:
+        # One region per track, encoded in parallel on the workers
+        for track, (startX, startY, _, _), (locations, encodings) in zip(tracks, boxes, FACE_WORKER_POOL.encode_regions(image, boxes)):
+            faces = []
+            for (top, right, bottom, left), (name, distance) in zip(locations, known_faces.match(encodings)):
+                location = (top - startY, right - startX, bottom - startY, left - startX)
+                faces.append((vision_processing.scale_location(location, 1.0 / sx, 1.0 / sy), name, distance))
+            track.set_faces(faces, frame_index)
+            cluster_unknown_faces(track, faces, encodings, sightings)
+        return sightings
+    if not FACE_FRAME_LEVEL_PASS:
+        for track, (startX, startY, endX, endY) in zip(tracks, boxes):
+            rgb_roi = cv2.cvtColor(image[startY:endY, startX:endX], cv2.COLOR_BGR2RGB)
+            identified, encodings = identify_faces(rgb_roi, known_faces)
+            faces = [(vision_processing.scale_location(location, 1.0 / sx, 1.0 / sy), name, distance)
+                     for location, name, distance in identified]
+            track.set_faces(faces, frame_index)
+            cluster_unknown_faces(track, faces, encodings, sightings)
+        return sightings
+    encode = FACE_WORKER_POOL.encode_faces_in_regions if FACE_WORKER_POOL is not None else vision_processing.encode_faces_in_regions
+    face_locations, face_encodings, assignment = encode(image, boxes)
+    matches = known_faces.match(face_encodings)
+    for track, face_indices in zip(tracks, assignment):
+        startX, startY = track.box[0], track.box[1]
+        faces = []
+        for i in face_indices:
+            top, right, bottom, left = vision_processing.scale_location(face_locations[i], 1.0 / sx, 1.0 / sy)
+            name, distance = matches[i]
+            faces.append(((top - startY, right - startX, bottom - startY, left - startX), name, distance))
+        track.set_faces(faces, frame_index)
+        cluster_unknown_faces(track, faces, [face_encodings[i] for i in face_indices], sightings)
+    return sightings
+
+def recognize_faces(frame, person_boxes, allow_verification=True, hires=None):
+    """Detects and identifies faces inside person boxes, annotating the frame in place.
+
+    Person boxes are tracked across frames; a track's faces are only re-encoded when
+    its cached identity is stale or uncertain, otherwise the cached result is reused.
+    With allow_verification=False (scheduler TRACK frames) only cached identities are used.
+    With a high-res frame from the camera's main stream, faces are located and the
+    alert is cropped there instead of in the detection frame.
+
+    Returns the frame, whether an unknown face is in view, and the (Sighting, crop)
+    pairs to report: a crop for an unknown individual's first sighting, None for a
+    repeat sighting of one already alerted.
+    """
+    start = time.monotonic()
+    h, w = frame.shape[:2]
+    person_boxes = [vision_processing.clip_box(box, w, h) for box in person_boxes]
+    tracks = [track for track in PERSON_TRACKER.update(person_boxes)
+              if track.box[2] > track.box[0] and track.box[3] > track.box[1]]
+    pending = []
+    sightings = []
+    verify_time = 0.0
+    if allow_verification:
+        pending = [track for track in tracks if track.needs_verification(PERSON_TRACKER.frame_index)]
+    PERSON_TRACKER.verifications += len(pending)
+    PERSON_TRACKER.cache_hits += len(tracks) - len(pending)
+    if hires is None:
+        hires = frame
+    scale = (hires.shape[1] / w, hires.shape[0] / h)
+    if pending:
+        verify_start = time.monotonic()
+        # One roster snapshot per frame; the roster watcher may swap KNOWN_FACES at any time
+        sightings = verify_tracks(hires, pending, KNOWN_FACES, scale)
+        verify_time = time.monotonic() - verify_start
+        STAGE_SECONDS["verify"].observe(verify_time)
+        # Only frames that encoded faces feed the scheduler; empty ones would hide the real encode cost
+        SCHEDULER.record("verify", verify_time)
+    # Crop alert images before annotations are drawn; they are copied because capture buffers are reused
+    alerts = []
+    for track, i, sighting in sightings:
+        if not sighting.report:
+            continue
+        image = None
+        if sighting.new:
+            location = vision_processing.scale_location(track.absolute_faces()[i][0], *scale)
+            image = alert_payload.crop_around_face(hires, location).copy()
+        alerts.append((sighting, image))
+    unknown_found = any(name == "Unknown" for track in tracks for _, name, _ in track.faces)
+    for track in (tracks if ANNOTATE_FRAMES else []):
+        for (top_abs, right_abs, bottom_abs, left_abs), name, _ in track.absolute_faces():
+            color = (0, 0, 255) if name == "Unknown" else (255, 0, 0)
+            cv2.rectangle(frame, (left_abs, top_abs), (right_abs, bottom_abs), color, 2)
+            cv2.rectangle(frame, (left_abs, bottom_abs - 20), (right_abs, bottom_abs), color, cv2.FILLED)
+            cv2.putText(frame, name, (left_abs, bottom_abs - 5), cv2.FONT_HERSHEY_DUPLEX, 0.5, (255, 255, 255), 1)
+    record_stage("other", time.monotonic() - start - verify_time)
+    return frame, unknown_found, alerts
+
+def process_frame_for_persons_and_faces(frame, hires=None, hires_skipped=False):
+    """Processes a frame for person and face detection; hires is the optional high-res stream for face crops.
+
+    With hires_skipped (the camera did not copy the high-res stream), persons are
+    tracked but faces are only verified from the next frame on.
+    """
     h, w = frame.shape[:2]
     if h == 0 or w == 0:
-        print("Warning: Received empty frame")
-        return frame, False, None
+        log.warning("Received empty frame")
+        return frame, False, []
     try:
-        blob = cv2.dnn.blobFromImage(cv2.resize(frame, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
-        person_net.setInput(blob)
-        detections = person_net.forward()
-        unknown_detected_in_frame = False
-        alert_image = None
-        for i in range(detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
-            if confidence > 0.5:
-                box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-                startX, startY, endX, endY = box.astype("int")
-                person_roi = frame[startY:endY, startX:endX]
-                if person_roi.size == 0:
-                    continue
-                rgb_roi = cv2.cvtColor(person_roi, cv2.COLOR_BGR2RGB)
-                face_locations = face_recognition.face_locations(rgb_roi, model=FACE_DETECTION_MODEL)
-                if face_locations:
-                    face_encodings = face_recognition.face_encodings(rgb_roi, face_locations)
-                    face_names_in_roi = []
-                    roi_contains_unknown = False
-                    for face_encoding in face_encodings:
-                        matches = face_recognition.compare_faces(KNOWN_FACE_ENCODINGS, face_encoding)
-                        name = "Unknown"
-                        if True in matches:
-                            first_match_index = matches.index(True)
-                            name = KNOWN_FACE_NAMES[first_match_index]
-                        else:
-                            roi_contains_unknown = True
-                            unknown_detected_in_frame = True
-                        face_names_in_roi.append(name)
-                    for (top, right, bottom, left), name in zip(face_locations, face_names_in_roi):
-                        top_abs, right_abs, bottom_abs, left_abs = top + startY, right + startX, bottom + startY, left + startX
-                        color = (0, 0, 255) if name == "Unknown" else (255, 0, 0)
-                        cv2.rectangle(frame, (left_abs, top_abs), (right_abs, bottom_abs), color, 2)
-                        cv2.rectangle(frame, (left_abs, bottom_abs - 20), (right_abs, bottom_abs), color, cv2.FILLED)
-                        cv2.putText(frame, name, (left_abs, bottom_abs - 5), cv2.FONT_HERSHEY_DUPLEX, 0.5, (255, 255, 255), 1)
-                    if roi_contains_unknown and alert_image is None:
-                        pil_img = Image.fromarray(rgb_roi)
-                        buf = io.BytesIO()
-                        pil_img.save(buf, format="JPEG", quality=85)
-                        alert_image = base64.b64encode(buf.getvalue()).decode()
-        return frame, unknown_detected_in_frame, alert_image
+        action = SCHEDULER.next_action()
+        person_boxes = select_person_boxes(frame, action)
+        return recognize_faces(frame, person_boxes, allow_verification=action != TRACK and not hires_skipped, hires=hires)
     except Exception as e:
-        print(f"Error processing frame: {e}")
-        return frame, False, None
+        log.error("Error processing frame: %s", e)
+        return frame, False, []
 
-def send_alert(image_base64):
-    """Sends an alert with image to the specified URL."""
-    try:
-        payload = {
-            'message': 'ALERT: Unknown person detected by rover unit',
-            'timestamp': time.time(),
-            'image_base64': image_base64
-        }
-        headers = {'Content-Type': 'application/json'}
-        response = requests.post(ALERT_APP_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        print("Alert sent successfully.")
-    except requests.RequestException as e:
-        print(f"Network error sending alert: {e}")
-    except Exception as e:
-        print(f"Error preparing or sending alert: {e}")
+async def initialize_rover(replay_path=None, realtime=True, record_path=None, workers=FACE_WORKERS):
+    """Initializes rover systems.
 
-async def initialize_rover():
-    """Initializes rover systems."""
+    With replay_path, frames and ultrasonic readings come from a recording instead of
+    the camera and ranger, so the loop runs off the Pi. With record_path, the frames
+    and readings the loop consumes are written to a recording.
+
+    GPIO, the ranger and the camera come up here; the person detector, face models and
+    roster load concurrently in the background (see start_vision_loading()) and the
+    loop starts vision once they are ready. With STARTUP_BACKGROUND_VISION disabled
+    this waits for them instead.
+    """
     print("Initializing Rover Systems...")
     setup_gpio()
-    load_dnn_model()
-    load_known_faces_from_db()
-    global picam2
-    if picamera_available:
+    if replay_path is None:
+        get_ranger()
+    start_vision_loading(workers)
+    if not initialize_frame_source(replay_path, realtime, record_path):
+        return False
+    create_vision_state()
+    if not STARTUP_BACKGROUND_VISION:
+        print("Waiting for the vision models...")
+        VISION_LOADER.wait()
+    return True
+
+def initialize_frame_source(replay_path=None, realtime=True, record_path=None):
+    """Opens the camera or the replayed recording, and the recorder if requested."""
+    global picam2, FRAME_SOURCE, DISTANCE_SOURCE, RECORDER
+    if record_path:
+        os.makedirs(os.path.dirname(record_path) or ".", exist_ok=True)
+        RECORDER = sources.Recorder(record_path)
+        RECORDER.start()
+        print(f"Recording frames and sensor readings to {record_path}")
+    if replay_path is not None:
         try:
+            FRAME_SOURCE = sources.ReplaySource(replay_path, realtime=realtime)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Failed to open recording: {e}")
+            return False
+        DISTANCE_SOURCE = FRAME_SOURCE
+        print(f"Replaying {replay_path} ({'real time' if realtime else 'as fast as possible'}).")
+        return True
+    Picamera2 = load_picamera()
+    if Picamera2 is not None:
+        try:
+            if FRAME_BUFFER_POOL_SIZE <= max_frames_in_flight(PIPELINE_QUEUE_SIZE):
+                # A smaller pool would overwrite frames still queued in the pipeline
+                raise ValueError(f"FRAME_BUFFER_POOL_SIZE must exceed {max_frames_in_flight(PIPELINE_QUEUE_SIZE)} "
+                                 f"frames in flight with PIPELINE_QUEUE_SIZE = {PIPELINE_QUEUE_SIZE}")
             picam2 = Picamera2()
-            cam_config = picam2.create_still_configuration(main={"size": CAMERA_RESOLUTION})
+            if CAMERA_DUAL_STREAM:
+                cam_config = picam2.create_video_configuration(
+                    main={"size": CAMERA_MAIN_RESOLUTION, "format": "RGB888"},
+                    lores={"size": CAMERA_LORES_RESOLUTION, "format": "YUV420"})
+            else:
+                cam_config = picam2.create_still_configuration(main={"size": CAMERA_RESOLUTION, "format": "RGB888"})
             picam2.configure(cam_config)
             picam2.start()
-            print("Camera initialized successfully.")
+            FRAME_SOURCE = sources.CameraSource(picam2, dual_stream=CAMERA_DUAL_STREAM)
+            if CAMERA_DUAL_STREAM:
+                print(f"Camera initialized: detection stream {CAMERA_LORES_RESOLUTION}, face stream {CAMERA_MAIN_RESOLUTION}.")
+            else:
+                print("Camera initialized successfully.")
             return True
         except Exception as e:
             print(f"ERROR: Failed to initialize camera: {e}")
@@ -344,41 +541,186 @@ async def initialize_rover():
         print("Camera disabled (picamera2 library not found).")
         return False
 
-async def run_rover_loop():
-    """Main operational loop for the rover."""
-    if not await initialize_rover():
+def capture_frame():
+    """Reads the next Capture (BGR frame, timestamp, optional high-res frame), or None once a replay is exhausted."""
+    capture = FRAME_SOURCE.read()
+    if capture is not None and RECORDER is not None:
+        RECORDER.record_frame(capture.frame, capture.timestamp)
+    return capture
+
+def navigate():
+    """Runs one obstacle-avoidance step; maneuvers run on the motion controller without blocking."""
+    if MOTION.busy():
+        return
+    if check_obstacle():
+        log.info("Obstacle detected! Maneuvering...")
+        escape_obstacle()
+        report_startup("first_motion")
+    elif MOTION.target != (MOTOR_SPEED, MOTOR_SPEED):
+        move_forward()
+        report_startup("first_motion")
+
+def create_vision_pipeline():
+    """Builds the capture -> detect -> recognize pipeline used by the rover loop."""
+    frame_ids = itertools.count()
+
+    def capture():
+        capture_time = time.monotonic()
+        capture = capture_frame()
+        if capture is None:
+            time.sleep(0.05)
+            return None
+        packet = FramePacket(next(frame_ids), capture.frame, capture_time)
+        packet.hires, packet.hires_skipped = capture.hires, capture.hires_skipped
+        record_stage("capture", time.monotonic() - capture_time)
+        return packet
+
+    def detect(packet):
+        h, w = packet.frame.shape[:2]
+        if h == 0 or w == 0:
+            log.warning("Received empty frame")
+            return None
+        packet.action = SCHEDULER.next_action()
+        packet.person_boxes = select_person_boxes(packet.frame, packet.action)
+        return packet
+
+    def recognize(packet):
+        packet.frame, packet.unknown_detected, packet.alerts = recognize_faces(
+            packet.frame, packet.person_boxes, allow_verification=packet.action != TRACK and not packet.hires_skipped,
+            hires=packet.hires)
+        packet.hires = None
+        return packet
+
+    return RoverPipeline(capture, detect, recognize, queue_size=PIPELINE_QUEUE_SIZE)
+
+def dispatch_alerts(dispatcher, alerts):
+    """Sends one image alert per new unknown individual and an image-free update for each repeat sighting."""
+    for sighting, image in alerts:
+        if image is not None:
+            dispatcher.submit(image, cluster_id=sighting.cluster_id)
+        else:
+            dispatcher.submit_sighting(sighting.cluster_id, sighting.count)
+
+def start_metrics():
+    """Starts the local metrics endpoint and the periodic summary log; returns both (None if disabled)."""
+    if not METRICS_ENABLED:
+        return None, None
+    server = MetricsServer(METRICS)
+    try:
+        server.start()
+        print(f"Metrics available at http://{server.host}:{server.port}/metrics")
+    except OSError as e:
+        print(f"WARNING: Metrics endpoint unavailable: {e}")
+        server = None
+    writer = MetricsSummaryWriter(METRICS)
+    writer.start()
+    return server, writer
+
+def report_frame_stats(mode, summary, dropped=None):
+    """Prints end-to-end latency and throughput for the vision loop."""
+    print(f"[{mode}] frames={summary['frames']} fps={summary['fps']:.2f} "
+          f"latency p50={summary['latency_p50_ms']:.1f} ms p95={summary['latency_p95_ms']:.1f} ms "
+          f"max={summary['latency_max_ms']:.1f} ms")
+    if dropped is not None:
+        print(f"[{mode}] stale frames dropped: {dropped}")
+    tracking = PERSON_TRACKER.stats()
+    print(f"[{mode}] face verifications={tracking['verifications']} "
+          f"reused identities={tracking['cache_hits']} ({tracking['cache_hit_rate']:.0%})")
+    if MOTION_GATE_ENABLED:
+        gate = MOTION_GATE.stats()
+        print(f"[{mode}] person DNN skipped on {gate['skipped']}/{gate['evaluated']} static frames ({gate['skip_rate']:.0%})")
+    if FACE_DETECTION_MODEL == "cascade":
+        cascade = face_cascade.get_face_cascade().stats()
+        tiers = ", ".join(f"{tier} {counts['hits']}/{counts['calls']} ({counts['hit_rate']:.0%})"
+                          for tier, counts in cascade.items() if tier != "too_small_for_cnn")
+        print(f"[{mode}] face cascade hits: {tiers}; {cascade['too_small_for_cnn']} misses too small for CNN")
+    cadence = SCHEDULER.stats()
+    print(f"[{mode}] cadence: detect every {cadence['detect_every']} frames, verify every {cadence['verify_every']} "
+          f"(est. {cadence['estimated_frame_ms']:.1f} ms of {cadence['frame_budget_ms']:.0f} ms budget), actions={cadence['actions']}")
+
+def report_startup_times():
+    """Prints how long after startup the rover first moved, vision became ready, and persons were first detected."""
+    times = ", ".join(f"{milestone.replace('_', ' ')} {STARTUP.elapsed(milestone):.2f} s"
+                      if STARTUP.elapsed(milestone) is not None else f"{milestone.replace('_', ' ')} not reached"
+                      for milestone in ("first_motion", "vision_ready", "first_detection"))
+    print(f"Startup: {times}")
+
+async def run_rover_loop(pipelined=True, parked=False, record_path=None, replay_path=None, realtime=True,
+                         workers=FACE_WORKERS):
+    """Main operational loop for the rover.
+
+    With pipelined=True, capture, person detection and face recognition run on their
+    own threads and this loop only navigates and acts on finished frames. With
+    pipelined=False, every step runs one after another on this thread. A parked
+    rover keeps its motors stopped and only watches. A replay ends the loop when the
+    recording is exhausted; with realtime=False the loop does not wait out its frame budget.
+    Until the background model loads finish, the loop only navigates. workers sets
+    the number of face encoding processes (0 = cores left after the DNN threads, 1 = none).
+    """
+    rover_logging = setup_logging()
+    print(f"Logging to {rover_logging.path}")
+    if not await initialize_rover(replay_path, realtime, record_path, workers):
         print("Rover initialization failed. Exiting.")
+        stop_logging()
         return
     print("Starting Rover Surveillance Loop (Press Ctrl+C to stop)...")
-    last_alert_sent_time = 0
     display_window_available = os.environ.get("DISPLAY") is not None
+    set_annotation(display_window_available)
+    pipeline = None
+    serial_stats = FrameStats()
+    SCHEDULER.pipelined = pipelined
+    alert_dispatcher = None
+    vision_ready = None  # None while the models load, then whether vision could start
+    metrics_server, metrics_writer = start_metrics()
     try:
+        if parked:
+            stop_motors()
         while True:
-            if check_obstacle():
-                stop_motors()
-                print("Obstacle detected! Maneuvering...")
-                move_backward()
-                time.sleep(0.5)
-                stop_motors()
-                if np.random.rand() < 0.5:
-                    turn_left()
-                else:
-                    turn_right()
-            else:
-                move_forward()
-            try:
-                frame = picam2.capture_array("main")
-                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            except Exception as e:
-                print(f"Error capturing frame: {e}")
-                time.sleep(0.5)
+            loop_start = time.monotonic()
+            if not parked:
+                with STAGE_SECONDS["navigate"].time():
+                    navigate()
+            if vision_ready is None and VISION_LOADER.ready():
+                vision_ready = join_vision(VISION_LOADER)
+                alert_dispatcher = VISION_LOADER.results.get("alerts")
+                if vision_ready and pipelined:
+                    pipeline = create_vision_pipeline()
+                    pipeline.start()
+                if not vision_ready and replay_path is not None:
+                    break
+            if not vision_ready:
+                # Obstacle avoidance runs on its own until vision joins
+                await asyncio.sleep(SCHEDULER.remaining(time.monotonic() - loop_start))
                 continue
-            processed_frame, unknown_found, alert_img = process_frame_for_persons_and_faces(frame_bgr)
-            if unknown_found and (time.time() - last_alert_sent_time) > 10:
-                if alert_img:
-                    send_alert(alert_img)
-                    last_alert_sent_time = time.time()
-                    time.sleep(5)
+            if pipeline is not None:
+                packet = pipeline.get_result()
+                if packet is None:
+                    if FRAME_SOURCE.finished():
+                        print("Replay finished.")
+                        break
+                    await asyncio.sleep(SCHEDULER.remaining(time.monotonic() - loop_start))
+                    continue
+                processed_frame, unknown_found, alerts = packet.frame, packet.unknown_detected, packet.alerts
+                FRAME_LATENCY_SECONDS.observe(time.monotonic() - packet.capture_time)
+            else:
+                capture_time = time.monotonic()
+                try:
+                    capture = capture_frame()
+                    record_stage("capture", time.monotonic() - capture_time)
+                except Exception as e:
+                    log.error("Error capturing frame: %s", e)
+                    await asyncio.sleep(0.5)
+                    continue
+                if capture is None:
+                    print("Replay finished.")
+                    break
+                processed_frame, unknown_found, alerts = process_frame_for_persons_and_faces(
+                    capture.frame, capture.hires, capture.hires_skipped)
+                serial_stats.record(capture_time)
+                FRAME_LATENCY_SECONDS.observe(time.monotonic() - capture_time)
+            FRAMES_PROCESSED.inc()
+            if alert_dispatcher is not None:
+                dispatch_alerts(alert_dispatcher, alerts)
             if display_window_available:
                 try:
                     cv2.imshow("Rover View", processed_frame)
@@ -390,42 +732,93 @@ async def run_rover_loop():
                     if "display" in str(e).lower():
                         print("Display window closed or unavailable. Disabling imshow.")
                         display_window_available = False
+                        set_annotation(False)
                     else:
-                        print(f"cv2.imshow error: {e}")
-            await asyncio.sleep(0.05)
+                        log.error("cv2.imshow error: %s", e)
+            loop_time = time.monotonic() - loop_start
+            LOOP_SECONDS.observe(loop_time)
+            await asyncio.sleep(SCHEDULER.remaining(loop_time) if realtime else 0)
     except KeyboardInterrupt:
         print("Ctrl+C detected. Initiating shutdown...")
     finally:
         print("Initiating shutdown sequence...")
-        if picam2:
-            print("Stopping camera...")
-            picam2.stop()
+        if pipeline is not None:
+            print("Stopping vision pipeline...")
+            pipeline.stop()
+            report_frame_stats("pipelined", pipeline.stats.summary(), pipeline.dropped_frames())
+        elif vision_ready:
+            report_frame_stats("serial", serial_stats.summary())
+        report_startup_times()
+        if ROSTER_WATCHER is not None:
+            ROSTER_WATCHER.stop()
+        if FACE_WORKER_POOL is not None:
+            FACE_WORKER_POOL.stop()
+            workers = FACE_WORKER_POOL.stats()
+            print(f"Face workers: {workers['faces']} faces in {workers['regions']} regions on {workers['workers']} processes, "
+                  f"{workers['inline']} regions encoded in-process.")
+        if metrics_server is not None:
+            metrics_server.stop()
+        if metrics_writer is not None:
+            metrics_writer.stop()
+            print(f"Metrics summary written to {metrics_writer.path}")
+        if alert_dispatcher is None:
+            alert_dispatcher = VISION_LOADER.results.get("alerts")  # Vision may have finished loading after the loop ended
+        if alert_dispatcher is not None:
+            print("Stopping alert dispatcher...")
+            alert_dispatcher.stop()
+            print(f"Alerts sent: {alert_dispatcher.sent} ({alert_dispatcher.bytes_sent} bytes over the link)")
+            if UNKNOWN_CLUSTERS is not None:
+                clusters = UNKNOWN_CLUSTERS.stats()
+                print(f"Unknown individuals: {clusters['created']} from {clusters['sightings']} sightings "
+                      f"({clusters['expired']} expired, {clusters['evicted']} evicted).")
+            if alert_dispatcher.pending():
+                print(f"{alert_dispatcher.pending()} undelivered alerts kept in the spool for the next run.")
+        if FRAME_SOURCE is not None:
+            print("Stopping frame source...")
+            FRAME_SOURCE.stop()
+        if RECORDER is not None:
+            RECORDER.stop()
+            recorded = RECORDER.stats()
+            print(f"Recording closed: {recorded['written']} chunks, {recorded['bytes']} bytes, {recorded['dropped']} dropped.")
         if display_window_available:
             print("Closing OpenCV windows...")
             cv2.destroyAllWindows()
         cleanup_gpio()
+        logged = rover_logging.stats()
+        print(f"Log messages collapsed as repeats: {logged['suppressed']}, dropped: {logged['dropped']}")
+        stop_logging()
         print("Rover shutdown complete.")
 
-async def main():
+async def main(pipelined=True, parked=False, record_path=None, replay_path=None, realtime=True, workers=FACE_WORKERS):
     """Main entry point for Pyodide compatibility."""
-    await run_rover_loop()
+    await run_rover_loop(pipelined=pipelined, parked=parked, record_path=record_path,
+                         replay_path=replay_path, realtime=realtime, workers=workers)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Autonomous Defense Surveillance Rover")
     parser.add_argument("--enroll", action="store_true", help="Run the face enrollment process instead of the main rover loop")
+    parser.add_argument("--park", action="store_true", help="Keep the rover stationary and only watch (perimeter mode)")
+    parser.add_argument("--serial", action="store_true", help="Run capture, detection and recognition serially on one thread (baseline for FPS/latency comparison)")
+    parser.add_argument("--record", metavar="PATH", help="Record camera frames and ultrasonic readings to PATH while running")
+    parser.add_argument("--replay", metavar="PATH", help="Feed a recording into the loop instead of the camera and ultrasonic sensor")
+    parser.add_argument("--fast", action="store_true", help="With --replay, run as fast as possible instead of at recorded speed (use with --serial to process every frame)")
+    parser.add_argument("--face-workers", type=int, default=FACE_WORKERS, metavar="N", help="Face encoding processes (0 = CPU cores minus DNN_NUM_THREADS, 1 = encode in the main process)")
     args = parser.parse_args()
     if args.enroll:
         run_enrollment_process()
     else:
-        if not os.path.exists(DNN_MODEL_PROTOTXT) or not os.path.exists(DNN_MODEL_CAFFEMODEL):
+        missing = detector.missing_model_files()
+        if missing:
             print("ERROR: Person detection model files are missing.")
-            print(f"Ensure {DNN_MODEL_PROTOTXT} and {DNN_MODEL_CAFFEMODEL} exist.")
+            print(f"Ensure {', '.join(missing)} exist.")
             sys.exit(1)
         if ALERT_APP_URL == "http://YOUR_ALERT_APP_IP:PORT/alert":
             print("WARNING: The ALERT_APP_URL is set to its default value.")
             print("Alerts will not be sent until this is configured correctly.")
             time.sleep(3)
         if platform.system() == "Emscripten":
-            asyncio.ensure_future(main())
+            asyncio.ensure_future(main(pipelined=not args.serial, parked=args.park, record_path=args.record,
+                                       replay_path=args.replay, realtime=not args.fast, workers=args.face_workers))
         else:
-            asyncio.run(main())
\ No newline at end of file
+            asyncio.run(main(pipelined=not args.serial, parked=args.park, record_path=args.record,
+                             replay_path=args.replay, realtime=not args.fast, workers=args.face_workers))
\ No newline at end of file
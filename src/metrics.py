@@ -0,0 +1,250 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import (
+    METRICS_LATENCY_BUCKETS_S, METRICS_HOST, METRICS_PORT, METRICS_LOG_DIR, METRICS_SUMMARY_INTERVAL_S
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class Histogram:
+    """Fixed-bucket histogram of one labelled series; observe() is a bisect and a few adds."""
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS_S):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot counts values above every bucket
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+            if value > self.max:
+                self.max = value
+
+    @contextmanager
+    def time(self):
+        """Observes the seconds spent in the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        """Estimates a quantile by interpolating within its bucket; 0.0 when empty."""
+        with self._lock:
+            counts, total, maximum = list(self.counts), self.count, self.max
+        if not total:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = min(self.buckets[i], maximum) if i < len(self.buckets) else maximum
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return maximum
+
+class Counter:
+    """Monotonic counter of one labelled series."""
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+class MetricsRegistry:
+    """Holds every histogram and counter by name and labels.
+
+    Hot paths should fetch their series once (histogram()/counter() are get-or-create)
+    and keep the returned object, so recording costs no lookup.
+    """
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._descriptions = {}
+        self._lock = threading.Lock()
+
+    def _get(self, series, factory, name, description, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if description:
+                self._descriptions.setdefault(name, description)
+            metric = series.get(key)
+            if metric is None:
+                metric = series[key] = factory()
+            return metric
+
+    def histogram(self, name, description="", buckets=METRICS_LATENCY_BUCKETS_S, **labels):
+        return self._get(self._histograms, lambda: Histogram(buckets), name, description, labels)
+
+    def counter(self, name, description="", **labels):
+        return self._get(self._counters, Counter, name, description, labels)
+
+    def observe(self, name, value, **labels):
+        self.histogram(name, **labels).observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        self.counter(name, **labels).inc(amount)
+
+    def _grouped(self, series):
+        with self._lock:
+            items = sorted(series.items())
+        groups = {}
+        for (name, labels), metric in items:
+            groups.setdefault(name, []).append((labels, metric))
+        return groups
+
+    def render_prometheus(self):
+        """Returns all series in the Prometheus text exposition format."""
+        lines = []
+        for name, series in self._grouped(self._histograms).items():
+            lines.append(f"# HELP {name} {self._descriptions.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in series:
+                with histogram._lock:
+                    counts, total, seconds = list(histogram.counts), histogram.count, histogram.sum
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_label_text(labels, [('le', _format_bound(bound))])} {cumulative}")
+                lines.append(f"{name}_bucket{_label_text(labels, [('le', '+Inf')])} {total}")
+                lines.append(f"{name}_sum{_label_text(labels)} {seconds}")
+                lines.append(f"{name}_count{_label_text(labels)} {total}")
+        for name, series in self._grouped(self._counters).items():
+            lines.append(f"# HELP {name} {self._descriptions.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, counter in series:
+                lines.append(f"{name}{_label_text(labels)} {counter.value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Returns count, mean and p50/p95/p99/max (ms) per histogram series, and every counter value."""
+        histograms = {}
+        for name, series in self._grouped(self._histograms).items():
+            for labels, histogram in series:
+                if not histogram.count:
+                    continue
+                histograms[name + _label_text(labels)] = {
+                    "count": histogram.count,
+                    "mean_ms": histogram.sum / histogram.count * 1000.0,
+                    "p50_ms": histogram.quantile(0.5) * 1000.0,
+                    "p95_ms": histogram.quantile(0.95) * 1000.0,
+                    "p99_ms": histogram.quantile(0.99) * 1000.0,
+                    "max_ms": histogram.max * 1000.0,
+                }
+        counters = {name + _label_text(labels): counter.value
+                    for name, series in self._grouped(self._counters).items() for labels, counter in series}
+        return {"histograms": histograms, "counters": counters}
+
+class MetricsServer:
+    """Serves the registry at /metrics over HTTP from a daemon thread."""
+    def __init__(self, registry, host=METRICS_HOST, port=METRICS_PORT):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Binds the port and starts serving; raises OSError if the port is unavailable."""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(1.0)
+        self._server = None
+        self._thread = None
+
+class MetricsSummaryWriter:
+    """Appends a JSON snapshot of the registry to a log file periodically and once more on stop."""
+    def __init__(self, registry, log_dir=METRICS_LOG_DIR, interval_s=METRICS_SUMMARY_INTERVAL_S):
+        self.registry = registry
+        self.path = os.path.join(log_dir, "metrics.jsonl")
+        self.interval_s = interval_s
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-summary", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stops the writer and writes a final summary."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self.write_summary()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_s):
+            self.write_summary()
+
+    def write_summary(self):
+        summary = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        summary.update(self.registry.snapshot())
+        try:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(summary) + "\n")
+        except OSError as e:
+            print(f"Error writing metrics summary: {e}")
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Returns the process-wide metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
@@ -0,0 +1,227 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import deque
+try:
+    import RPi.GPIO as GPIO
+    gpio_available = True
+except (ImportError, RuntimeError):
+    gpio_available = False
+
+from config import (
+    MOTOR_LEFT_FORWARD, MOTOR_LEFT_BACKWARD, MOTOR_RIGHT_FORWARD, MOTOR_RIGHT_BACKWARD,
+    MOTOR_LEFT_ENABLE, MOTOR_RIGHT_ENABLE, MOTOR_PWM_FREQUENCY_HZ, MOTOR_RAMP_STEP_S
+)
+
+class GPIOMotorBackend:
+    """Drives the motor driver: direction pins plus a PWM duty cycle on each enable pin."""
+    def __init__(self, frequency_hz=MOTOR_PWM_FREQUENCY_HZ):
+        self.left_pwm = GPIO.PWM(MOTOR_LEFT_ENABLE, frequency_hz)
+        self.right_pwm = GPIO.PWM(MOTOR_RIGHT_ENABLE, frequency_hz)
+        self.left_pwm.start(0)
+        self.right_pwm.start(0)
+
+    def apply(self, left_speed, right_speed):
+        """Sets both sides; speeds run from -1 (full reverse) to 1 (full forward)."""
+        GPIO.output(MOTOR_LEFT_FORWARD, left_speed > 0)
+        GPIO.output(MOTOR_LEFT_BACKWARD, left_speed < 0)
+        GPIO.output(MOTOR_RIGHT_FORWARD, right_speed > 0)
+        GPIO.output(MOTOR_RIGHT_BACKWARD, right_speed < 0)
+        self.left_pwm.ChangeDutyCycle(min(100.0, abs(left_speed) * 100.0))
+        self.right_pwm.ChangeDutyCycle(min(100.0, abs(right_speed) * 100.0))
+
+    def close(self):
+        self.left_pwm.stop()
+        self.right_pwm.stop()
+
+class SimulatedMotorBackend:
+    """Records speed changes as (seconds since creation, left, right) instead of driving pins."""
+    def __init__(self, max_entries=10000):
+        self.start_time = time.monotonic()
+        self.timeline = deque(maxlen=max_entries)
+
+    def apply(self, left_speed, right_speed):
+        self.timeline.append((time.monotonic() - self.start_time, left_speed, right_speed))
+
+    def close(self):
+        pass
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_motor_backend():
+    """Returns the process-wide motor backend, creating it on first use (after GPIO setup)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = GPIOMotorBackend() if gpio_available else SimulatedMotorBackend()
+        return _backend
+
+def close_motor_backend():
+    """Stops PWM output; call before GPIO.cleanup()."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
+
+class MotionHandle:
+    """Awaitable result of a motion command: True if it ran to completion, False if it was preempted."""
+    def __init__(self, name, future):
+        self.name = name
+        self.future = future
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """Blocks until the command finishes, for callers outside the event loop."""
+        return self.future.result(timeout)
+
+    def __await__(self):
+        # Shielded, so cancelling the awaiting caller does not cancel the maneuver
+        return asyncio.shield(asyncio.wrap_future(self.future)).__await__()
+
+class MotionController:
+    """Runs timed motor commands, maneuver sequences and speed ramps on a dedicated motion thread.
+
+    Each command is a list of steps (left, right, duration_s, ramp_s). The thread times
+    them against time.monotonic() deadlines, so a turn lasts TURN_DURATION_S even while
+    the event loop is busy with a slow frame. A new command preempts the one in progress,
+    and stop() takes effect immediately. Commands can be issued from any thread.
+    """
+    def __init__(self, backend=None, ramp_step_s=MOTOR_RAMP_STEP_S):
+        self._backend = backend
+        self.ramp_step_s = ramp_step_s
+        self.left = 0.0
+        self.right = 0.0
+        self.target = None  # Speeds held by an open-ended drive()
+        self.commands = 0
+        self.preemptions = 0
+        self._handle = None
+        self._pending = None  # (generation, steps, stop_after, future) waiting for the motion thread
+        self._generation = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = get_motor_backend()
+        return self._backend
+
+    @property
+    def moving(self):
+        return self.left != 0 or self.right != 0
+
+    def busy(self):
+        """True while a timed command or sequence is still running."""
+        return self.target is None and self._handle is not None and not self._handle.done()
+
+    def _set(self, left, right):
+        self.left, self.right = left, right
+        self.backend.apply(left, right)
+
+    def _preempt(self):
+        # Called with _cond held; a superseded command notices the new generation and resolves to False
+        self._generation += 1
+        if self._handle is not None and not self._handle.done():
+            self.preemptions += 1
+        self._handle = None
+        self._pending = None
+        self.target = None
+        self._cond.notify_all()
+
+    def _wait_until(self, deadline, generation):
+        """Waits with _cond held until deadline; returns False if the command was preempted meanwhile."""
+        while self._generation == generation and not self._closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            self._cond.wait(remaining)
+        return False
+
+    def _execute(self, generation, steps, stop_after):
+        start = time.monotonic()
+        for left, right, duration_s, ramp_s in steps:
+            ramp_steps = int(ramp_s / self.ramp_step_s) if ramp_s > 0 else 0
+            start_left, start_right = self.left, self.right
+            for i in range(1, ramp_steps):
+                if not self._wait_until(start + ramp_s * i / ramp_steps, generation):
+                    return False
+                fraction = i / ramp_steps
+                self._set(start_left + (left - start_left) * fraction, start_right + (right - start_right) * fraction)
+            if ramp_steps:
+                start += ramp_s
+                if not self._wait_until(start, generation):
+                    return False
+            self._set(left, right)
+            if duration_s:
+                # Deadlines chain from the previous step's, so late wakeups do not accumulate
+                start += duration_s
+                if not self._wait_until(start, generation):
+                    return False
+        if stop_after:
+            self._set(0.0, 0.0)
+        return True
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                if self._pending is None:
+                    self._cond.wait()
+                    continue
+                generation, steps, stop_after, future = self._pending
+                self._pending = None
+                future.set_result(self._execute(generation, steps, stop_after))
+
+    def sequence(self, steps, stop_after=True, name="sequence"):
+        """Runs [(left, right, duration_s[, ramp_s]), ...] in order, then stops; returns a MotionHandle."""
+        steps = [(step[0], step[1], step[2], step[3] if len(step) > 3 else 0.0) for step in steps]
+        future = concurrent.futures.Future()
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="motion", daemon=True)
+                self._thread.start()
+            previous = self._pending
+            self._preempt()
+            if previous is not None:
+                previous[3].set_result(False)
+            self._pending = (self._generation, steps, stop_after, future)
+            self._handle = MotionHandle(name, future)
+            self.commands += 1
+            return self._handle
+
+    def drive(self, left, right, duration_s=None, ramp_s=0.0):
+        """Drives at the given speeds, for duration_s then stopping, or until preempted if duration_s is None."""
+        if duration_s is None and self.target == (left, right) and self._handle is not None:
+            return self._handle
+        handle = self.sequence([(left, right, duration_s, ramp_s)], stop_after=duration_s is not None, name="drive")
+        if duration_s is None:
+            self.target = (left, right)
+        return handle
+
+    def stop(self):
+        """Preempts any command and stops the motors immediately."""
+        with self._cond:
+            previous = self._pending
+            self._preempt()
+            if previous is not None:
+                previous[3].set_result(False)
+            self._set(0.0, 0.0)
+
+    def close(self):
+        """Stops the motors and ends the motion thread."""
+        self.stop()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def stats(self):
+        """Returns command and preemption counts and the current speeds."""
+        return {"commands": self.commands, "preemptions": self.preemptions, "left": self.left, "right": self.right}
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+from config import (
+    MOTION_THUMBNAIL_SIZE, MOTION_PIXEL_THRESHOLD, MOTION_CHANGED_FRACTION,
+    MOTION_BACKGROUND_RATE, MOTION_MAX_SKIP_FRAMES
+)
+
+class MotionGate:
+    """Cheap change detector that decides whether a frame is worth running the person DNN on.
+
+    Frames are reduced to small grayscale thumbnails and compared against a running
+    background model. While the rover itself is moving (ego-motion) every frame
+    passes, and the background is re-learned once it stops. A full detection is
+    still forced every max_skip_frames so nothing is missed indefinitely.
+    """
+    def __init__(self, thumbnail_size=MOTION_THUMBNAIL_SIZE, pixel_threshold=MOTION_PIXEL_THRESHOLD,
+                 changed_fraction=MOTION_CHANGED_FRACTION, background_rate=MOTION_BACKGROUND_RATE,
+                 max_skip_frames=MOTION_MAX_SKIP_FRAMES):
+        self.thumbnail_size = thumbnail_size
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.background_rate = background_rate
+        self.max_skip_frames = max_skip_frames
+        self.background = None
+        self.ego_motion = False
+        self.last_change = 0.0
+        self.frames_since_detection = 0
+        self.evaluated = 0
+        self.skipped = 0
+
+    def set_ego_motion(self, moving):
+        """Tells the gate whether the rover is currently driving or turning."""
+        if self.ego_motion and not moving:
+            # The view changed while driving; learn a fresh background from the next frame
+            self.background = None
+        self.ego_motion = moving
+
+    def _thumbnail(self, frame):
+        small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.float32)
+
+    def should_detect(self, frame):
+        """Returns True if the DNN should run on this frame, False if the last result can be reused."""
+        self.evaluated += 1
+        thumbnail = self._thumbnail(frame)
+        if self.ego_motion or self.background is None:
+            # The whole view shifts while driving; re-seed the background once stopped
+            self.background = thumbnail
+            self.last_change = 1.0
+            self.frames_since_detection = 0
+            return True
+        diff = cv2.absdiff(thumbnail, self.background)
+        self.last_change = float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+        cv2.accumulateWeighted(thumbnail, self.background, self.background_rate)
+        if self.last_change >= self.changed_fraction or self.frames_since_detection >= self.max_skip_frames:
+            self.frames_since_detection = 0
+            return True
+        self.frames_since_detection += 1
+        self.skipped += 1
+        return False
+
+    def stats(self):
+        """Returns how many frames were evaluated and how many skipped the DNN."""
+        return {
+            "evaluated": self.evaluated,
+            "skipped": self.skipped,
+            "skip_rate": self.skipped / self.evaluated if self.evaluated else 0.0,
+            "last_change": self.last_change,
+        }
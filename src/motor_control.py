@@ -1,5 +1,4 @@
 import time
-import numpy as np
 try:
     import RPi.GPIO as GPIO
     gpio_available = True
@@ -14,6 +13,11 @@ from config import (
     ULTRASONIC_TRIG, ULTRASONIC_ECHO, MOTOR_SPEED, TURN_DURATION_S,
     OBSTACLE_DISTANCE_THRESHOLD_CM
 )
+from ranging import get_ranger, stop_ranger
+from motion_controller import get_motor_backend, close_motor_backend
+from rover_log import get_logger
+
+log = get_logger("motor_control")
 
 def setup_gpio():
     """Sets up GPIO pins for motors and sensors."""
@@ -39,83 +43,66 @@ def setup_gpio():
 
 def cleanup_gpio():
     """Cleans up GPIO settings."""
+    stop_ranger()
     if not gpio_available:
         print("SIMULATION: Skipping GPIO cleanup.")
         return
     print("Cleaning up GPIO...")
     try:
         stop_motors()
+        close_motor_backend()
         GPIO.cleanup()
         print("GPIO cleanup finished.")
     except Exception as e:
         print(f"Error during GPIO cleanup: {e}")
 
 def set_motor_speeds(left_speed, right_speed):
-    """Sets motor speeds. Positive for forward, negative for backward."""
+    """Sets motor speeds as PWM duty cycles. Positive for forward, negative for backward."""
     if not gpio_available:
-        print(f"SIMULATION: Setting motor speeds: left={left_speed}, right={right_speed}")
-        return
-    GPIO.output(MOTOR_LEFT_FORWARD, left_speed > 0)
-    GPIO.output(MOTOR_LEFT_BACKWARD, left_speed < 0)
-    GPIO.output(MOTOR_LEFT_ENABLE, abs(left_speed) > 0)
-    GPIO.output(MOTOR_RIGHT_FORWARD, right_speed > 0)
-    GPIO.output(MOTOR_RIGHT_BACKWARD, right_speed < 0)
-    GPIO.output(MOTOR_RIGHT_ENABLE, abs(right_speed) > 0)
+        log.debug("SIMULATION: Setting motor speeds: left=%s, right=%s", left_speed, right_speed)
+    get_motor_backend().apply(left_speed, right_speed)
 
 def move_forward():
     """Moves the rover forward."""
-    print("Moving forward")
+    log.info("Moving forward")
     set_motor_speeds(MOTOR_SPEED, MOTOR_SPEED)
 
 def move_backward():
     """Moves the rover backward."""
-    print("Moving backward")
+    log.info("Moving backward")
     set_motor_speeds(-MOTOR_SPEED, -MOTOR_SPEED)
 
 def turn_left():
     """Turns the rover left."""
-    print("Turning left")
+    log.info("Turning left")
     set_motor_speeds(-MOTOR_SPEED, MOTOR_SPEED)
     time.sleep(TURN_DURATION_S)
     stop_motors()
 
 def turn_right():
     """Turns the rover right."""
-    print("Turning right")
+    log.info("Turning right")
     set_motor_speeds(MOTOR_SPEED, -MOTOR_SPEED)
     time.sleep(TURN_DURATION_S)
     stop_motors()
 
 def stop_motors():
     """Stops all motors."""
-    print("Stopping motors")
+    log.info("Stopping motors")
     set_motor_speeds(0, 0)
 
 def get_distance_cm():
-    """Measures distance using ultrasonic sensor."""
-    if not gpio_available:
-        print("SIMULATION: Returning random distance for testing.")
-        return np.random.uniform(10, 100)
-    try:
-        GPIO.output(ULTRASONIC_TRIG, True)
-        time.sleep(0.00001)
-        GPIO.output(ULTRASONIC_TRIG, False)
-        start_time = time.time()
-        while GPIO.input(ULTRASONIC_ECHO) == 0:
-            start_time = time.time()
-        while GPIO.input(ULTRASONIC_ECHO) == 1:
-            end_time = time.time()
-        duration = end_time - start_time
-        distance = (duration * 34300) / 2  # Speed of sound in cm/s
-        return distance
-    except Exception as e:
-        print(f"Error measuring distance: {e}")
-        return float('inf')
+    """Returns the latest filtered distance from the background ultrasonic ranger."""
+    return get_ranger().distance_cm()
+
+def get_distance_reading():
+    """Returns the latest filtered Reading(distance_cm, timestamp) from the ranger."""
+    return get_ranger().latest()
 
 def check_obstacle():
     """Checks for obstacles within threshold distance."""
     distance = get_distance_cm()
     if distance < OBSTACLE_DISTANCE_THRESHOLD_CM:
-        print(f"Obstacle DETECTED at {distance:.1f} cm")
+        log.warning("Obstacle DETECTED at %.1f cm", distance)
         return True
     return False
\ No newline at end of file
@@ -0,0 +1,116 @@
+import numpy as np
+from config import (
+    GRID_SIZE_M, GRID_RESOLUTION_M, GRID_LOG_ODDS_HIT, GRID_LOG_ODDS_MISS, GRID_LOG_ODDS_MIN,
+    GRID_LOG_ODDS_MAX, GRID_OCCUPIED_THRESHOLD, GRID_DECAY, LIDAR_MIN_RANGE_M, LIDAR_MAX_RANGE_M
+)
+
+class OccupancyGrid:
+    """Fixed-size, rover-centred log-odds occupancy grid updated incrementally from LIDAR scans.
+
+    Points are (x, y) in metres in the rover frame: x forward, y to the left. Each
+    scan raises the log-odds of the cells that returned an echo and lowers the cells
+    its beams passed through, all with vectorized numpy operations. Queries only look
+    at grid cells, so their cost does not depend on how many points were integrated.
+    """
+    def __init__(self, size_m=GRID_SIZE_M, resolution_m=GRID_RESOLUTION_M, hit=GRID_LOG_ODDS_HIT,
+                 miss=GRID_LOG_ODDS_MISS, min_log_odds=GRID_LOG_ODDS_MIN, max_log_odds=GRID_LOG_ODDS_MAX,
+                 occupied_threshold=GRID_OCCUPIED_THRESHOLD, decay=GRID_DECAY,
+                 min_range=LIDAR_MIN_RANGE_M, max_range=LIDAR_MAX_RANGE_M):
+        self.resolution = resolution_m
+        self.cells = int(round(size_m / resolution_m))
+        self.half_size = self.cells * resolution_m / 2
+        self.hit = hit
+        self.miss = miss
+        self.min_log_odds = min_log_odds
+        self.max_log_odds = max_log_odds
+        self.occupied_threshold = occupied_threshold
+        self.decay = decay
+        self.min_range = min_range
+        self.max_range = max_range
+        self.scans = 0
+        self.log_odds = np.zeros((self.cells, self.cells), dtype=np.float32)
+        self._flat = self.log_odds.reshape(-1)
+        # Beam sample distances, shared by every ray of every scan
+        self._steps = np.arange(0.0, max_range, resolution_m, dtype=np.float32)
+        centers = (np.arange(self.cells, dtype=np.float32) + 0.5) * resolution_m - self.half_size
+        xs, ys = np.meshgrid(centers, centers)
+        self._cell_range = np.hypot(xs, ys).reshape(-1)
+        self._cell_angle = np.degrees(np.arctan2(ys, xs)).reshape(-1)
+        self._sector_tables = {}
+
+    def clear(self):
+        """Forgets everything, marking every cell unknown."""
+        self.log_odds.fill(0.0)
+        self.scans = 0
+
+    def _cell_index(self, x, y):
+        col = np.floor((x + self.half_size) / self.resolution).astype(np.int64)
+        row = np.floor((y + self.half_size) / self.resolution).astype(np.int64)
+        inside = (col >= 0) & (col < self.cells) & (row >= 0) & (row < self.cells)
+        return row[inside] * self.cells + col[inside]
+
+    def integrate(self, points):
+        """Updates the grid from one scan of (x, y[, z]) points in the rover frame."""
+        points = np.asarray(points, dtype=np.float32)
+        if points.size == 0:
+            points = np.empty((0, 2), dtype=np.float32)
+        xy = points[:, :2]
+        xy = xy[np.isfinite(xy).all(axis=1)]
+        ranges = np.hypot(xy[:, 0], xy[:, 1])
+        keep = (ranges >= self.min_range) & (ranges <= self.max_range)
+        xy, ranges = xy[keep], ranges[keep]
+        if self.decay < 1.0:
+            self.log_odds *= self.decay
+        if len(ranges):
+            # Sample each beam once per cell up to just short of its echo
+            free = self._steps[None, :] < (ranges[:, None] - self.resolution)
+            fractions = self._steps[None, :] / ranges[:, None]
+            free_index = self._cell_index((xy[:, 0:1] * fractions)[free], (xy[:, 1:2] * fractions)[free])
+            hit_index = self._cell_index(xy[:, 0], xy[:, 1])
+            size = self._flat.size
+            hit_cells = np.bincount(hit_index, minlength=size) > 0
+            free_cells = (np.bincount(free_index, minlength=size) > 0) & ~hit_cells
+            self._flat[free_cells] += self.miss
+            self._flat[hit_cells] += self.hit
+            np.clip(self.log_odds, self.min_log_odds, self.max_log_odds, out=self.log_odds)
+        self.scans += 1
+
+    def occupied(self):
+        """Returns a boolean mask of occupied cells (rows are y, columns are x)."""
+        return self.log_odds > self.occupied_threshold
+
+    def corridor_clear(self, distance_m, width_m):
+        """True if no occupied cell lies in the width_m wide corridor up to distance_m ahead."""
+        col0 = int(self.cells // 2)
+        col1 = min(self.cells, int(np.ceil((distance_m + self.half_size) / self.resolution)))
+        row0 = max(0, int(np.floor((self.half_size - width_m / 2) / self.resolution)))
+        row1 = min(self.cells, int(np.ceil((self.half_size + width_m / 2) / self.resolution)))
+        return not np.any(self.log_odds[row0:row1, col0:col1] > self.occupied_threshold)
+
+    def _sector_table(self, sectors):
+        table = self._sector_tables.get(sectors)
+        if table is None:
+            width = 360.0 / sectors
+            # Sector 0 is centred straight ahead
+            table = (np.floor(((self._cell_angle + width / 2) % 360.0) / width).astype(np.int64)) % sectors
+            self._sector_tables[sectors] = table
+        return table
+
+    def sector_clearance(self, sectors):
+        """Distance in metres to the nearest occupied cell in each sector (inf if none).
+
+        Sector i is centred on heading i * 360 / sectors degrees, counter-clockwise from straight ahead.
+        """
+        mask = self._flat > self.occupied_threshold
+        mask &= self._cell_range >= self.min_range
+        clearance = np.full(sectors, np.inf)
+        np.minimum.at(clearance, self._sector_table(sectors)[mask], self._cell_range[mask])
+        return clearance
+
+    def free_space_sector(self, sectors):
+        """Returns (heading_deg, clearance_m) of the most open sector, preferring headings closest to ahead."""
+        clearance = self.sector_clearance(sectors)
+        headings = np.arange(sectors) * (360.0 / sectors)
+        headings = np.where(headings > 180.0, headings - 360.0, headings)
+        best = np.lexsort((np.abs(headings), -clearance))[0]
+        return float(headings[best]), float(clearance[best])
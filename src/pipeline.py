@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import deque
+from rover_log import get_logger
+
+log = get_logger("pipeline")
+
+def max_frames_in_flight(queue_size):
+    """Most captured frames a RoverPipeline can hold at once.
+
+    One in each of the three stages, queue_size in each of the three queues, and the
+    one the act step (alerts, display) is using.
+    """
+    return 3 + 3 * queue_size + 1
+
+class DropOldestQueue:
+    """Bounded FIFO that discards its oldest item when full, so consumers always get fresh frames."""
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        """Adds an item, evicting the oldest one if the queue is full."""
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Removes and returns the oldest item, or None if nothing arrives within timeout."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def get_nowait(self):
+        """Returns the oldest item without waiting, or None if the queue is empty."""
+        with self._cond:
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class FramePacket:
+    """A frame travelling through the pipeline together with its per-stage results."""
+    def __init__(self, frame_id, frame, capture_time=None):
+        self.frame_id = frame_id
+        self.frame = frame
+        self.hires = None  # Optional high-res frame of the same instant, used for face crops
+        self.hires_skipped = False  # The camera left hires out; faces are verified on a later frame
+        self.capture_time = capture_time if capture_time is not None else time.monotonic()
+        self.action = None
+        self.person_boxes = []
+        self.unknown_detected = False
+        self.alerts = []  # (Sighting, crop or None) to send, see main.recognize_faces
+
+
+class FrameStats:
+    """Tracks end-to-end frame latency and sustained throughput."""
+    def __init__(self, window=300):
+        self.latencies = deque(maxlen=window)
+        self.frames = 0
+        self.start_time = None
+        self.last_time = None
+
+    def record(self, capture_time, now=None):
+        """Records one completed frame that was captured at capture_time."""
+        now = now if now is not None else time.monotonic()
+        if self.start_time is None:
+            self.start_time = capture_time
+        self.last_time = now
+        self.frames += 1
+        self.latencies.append(now - capture_time)
+
+    def summary(self):
+        """Returns sustained FPS and latency percentiles (in milliseconds)."""
+        if not self.frames or self.last_time is None or self.last_time <= self.start_time:
+            return {"frames": self.frames, "fps": 0.0, "latency_p50_ms": 0.0, "latency_p95_ms": 0.0, "latency_max_ms": 0.0}
+        ordered = sorted(self.latencies)
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000.0
+        return {
+            "frames": self.frames,
+            "fps": self.frames / (self.last_time - self.start_time),
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+            "latency_max_ms": ordered[-1] * 1000.0,
+        }
+
+
+class PipelineStage(threading.Thread):
+    """Worker thread that applies func to packets from input_queue and forwards them to output_queue.
+
+    A stage without an input queue is a source: func is called with no arguments and
+    must return a new FramePacket (or None to skip).
+    """
+    def __init__(self, name, func, input_queue, output_queue, stop_event):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stop_event = stop_event
+        self.processed = 0
+        self.busy_time = 0.0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            if self.input_queue is not None:
+                packet = self.input_queue.get(timeout=0.1)
+                if packet is None:
+                    continue
+            start = time.monotonic()
+            try:
+                if self.input_queue is None:
+                    packet = self.func()
+                else:
+                    packet = self.func(packet)
+            except Exception as e:
+                log.error("Error in pipeline stage %s: %s", self.name, e)
+                packet = None
+                if self.input_queue is None:
+                    time.sleep(0.5)
+            self.busy_time += time.monotonic() - start
+            if packet is None:
+                continue
+            self.processed += 1
+            if self.output_queue is not None:
+                self.output_queue.put(packet)
+
+
+class RoverPipeline:
+    """Capture -> detect -> recognize stages running concurrently on their own threads.
+
+    Stages are linked by bounded drop-oldest queues, so under load stale frames are
+    discarded rather than queued up. Finished packets are collected with get_result()
+    by the act step (alerts and display), which stays on the caller's thread.
+    """
+    def __init__(self, capture_func, detect_func, recognize_func, queue_size=1):
+        self.stop_event = threading.Event()
+        self.detect_queue = DropOldestQueue(queue_size)
+        self.recognize_queue = DropOldestQueue(queue_size)
+        self.result_queue = DropOldestQueue(queue_size)
+        self.stages = [
+            PipelineStage("capture", capture_func, None, self.detect_queue, self.stop_event),
+            PipelineStage("detect", detect_func, self.detect_queue, self.recognize_queue, self.stop_event),
+            PipelineStage("recognize", recognize_func, self.recognize_queue, self.result_queue, self.stop_event),
+        ]
+        self.stats = FrameStats()
+
+    def start(self):
+        """Starts all stage threads."""
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self, timeout=2.0):
+        """Signals all stages to stop and waits for them to exit."""
+        self.stop_event.set()
+        for stage in self.stages:
+            if stage.is_alive():
+                stage.join(timeout)
+
+    def get_result(self, timeout=None):
+        """Returns the next fully processed packet (or None) and records its latency."""
+        packet = self.result_queue.get(timeout) if timeout else self.result_queue.get_nowait()
+        if packet is not None:
+            self.stats.record(packet.capture_time)
+        return packet
+
+    def dropped_frames(self):
+        """Returns the number of stale frames discarded at each queue."""
+        return {
+            "detect": self.detect_queue.dropped,
+            "recognize": self.recognize_queue.dropped,
+            "result": self.result_queue.dropped,
+        }
@@ -0,0 +1,169 @@
+import math
+import threading
+import time
+from collections import deque, namedtuple
+try:
+    import RPi.GPIO as GPIO
+    gpio_available = True
+except (ImportError, RuntimeError):
+    gpio_available = False
+
+from config import (
+    ULTRASONIC_TRIG, ULTRASONIC_ECHO, ULTRASONIC_SAMPLE_RATE_HZ, ULTRASONIC_FILTER_WINDOW,
+    ULTRASONIC_ECHO_TIMEOUT_S, ULTRASONIC_MAX_RANGE_CM, ULTRASONIC_STALE_S
+)
+from metrics import get_metrics
+from rover_log import get_logger
+
+log = get_logger("ranging")
+
+SPEED_OF_SOUND_CM_S = 34300
+
+Reading = namedtuple("Reading", ["distance_cm", "timestamp"])
+
+def simulated_distance(sample_index):
+    """Deterministic fake echo: an obstacle drifting between 20 and 100 cm every 100 samples."""
+    return 60.0 + 40.0 * math.sin(2 * math.pi * sample_index / 100.0)
+
+class UltrasonicRanger:
+    """Samples the ultrasonic sensor on a background thread and publishes a filtered reading.
+
+    On the Pi the echo pulse is timed with GPIO edge interrupts and every wait has a
+    timeout, so a missing echo costs one sample instead of hanging the rover. Readings
+    are median-filtered over the last few samples; latest() and distance_cm() are O(1).
+    Without RPi.GPIO the same interface is driven by simulated_distance().
+    """
+    def __init__(self, sample_rate_hz=ULTRASONIC_SAMPLE_RATE_HZ, window=ULTRASONIC_FILTER_WINDOW,
+                 echo_timeout_s=ULTRASONIC_ECHO_TIMEOUT_S, simulated=None, signal=simulated_distance):
+        self.period = 1.0 / sample_rate_hz
+        self.echo_timeout_s = echo_timeout_s
+        self.simulated = (not gpio_available) if simulated is None else simulated
+        self.signal = signal
+        self.samples = 0
+        self.timeouts = 0
+        self._window = deque(maxlen=window)
+        self._latest = Reading(float('inf'), 0.0)
+        self._echo_start = None
+        self._echo_end = None
+        self._echo_done = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        metrics = get_metrics()
+        self._read_seconds = metrics.histogram("rover_ultrasonic_read_seconds", "Time to take one ultrasonic measurement")
+        self._timeout_count = metrics.counter("rover_ultrasonic_timeouts_total", "Ultrasonic pings with no usable echo")
+
+    def start(self):
+        """Starts background sampling."""
+        if self._thread is not None:
+            return
+        if not self.simulated:
+            GPIO.add_event_detect(ULTRASONIC_ECHO, GPIO.BOTH, callback=self._on_echo_edge)
+        self._stop_event.clear()
+        # Take the first sample synchronously so a reading exists as soon as start() returns
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="ultrasonic-ranger", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stops background sampling."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if not self.simulated:
+            GPIO.remove_event_detect(ULTRASONIC_ECHO)
+
+    def is_running(self):
+        return self._thread is not None
+
+    def latest(self):
+        """Returns the latest filtered Reading(distance_cm, timestamp)."""
+        return self._latest
+
+    def distance_cm(self, max_age_s=ULTRASONIC_STALE_S):
+        """Returns the latest filtered distance, or inf if no fresh reading exists."""
+        reading = self._latest
+        if time.monotonic() - reading.timestamp > max_age_s:
+            return float('inf')
+        return reading.distance_cm
+
+    def stats(self):
+        """Returns sample and timeout counts and the latest filtered distance."""
+        return {
+            "samples": self.samples,
+            "timeouts": self.timeouts,
+            "timeout_rate": self.timeouts / self.samples if self.samples else 0.0,
+            "distance_cm": self._latest.distance_cm,
+        }
+
+    def _on_echo_edge(self, channel):
+        now = time.perf_counter()
+        if GPIO.input(ULTRASONIC_ECHO):
+            self._echo_start = now
+        elif self._echo_start is not None:
+            self._echo_end = now
+            self._echo_done.set()
+
+    def measure_once(self):
+        """Takes one raw measurement in cm, or None if the echo timed out or is out of range."""
+        if self.simulated:
+            distance = self.signal(self.samples)
+        else:
+            self._echo_start = None
+            self._echo_end = None
+            self._echo_done.clear()
+            GPIO.output(ULTRASONIC_TRIG, True)
+            time.sleep(0.00001)
+            GPIO.output(ULTRASONIC_TRIG, False)
+            if not self._echo_done.wait(self.echo_timeout_s):
+                return None
+            distance = (self._echo_end - self._echo_start) * SPEED_OF_SOUND_CM_S / 2
+        if not 0 < distance <= ULTRASONIC_MAX_RANGE_CM:
+            return None
+        return distance
+
+    def _sample(self):
+        start = time.perf_counter()
+        distance = self.measure_once()
+        self._read_seconds.observe(time.perf_counter() - start)
+        self.samples += 1
+        if distance is None:
+            self.timeouts += 1
+            self._timeout_count.inc()
+            return
+        self._window.append(distance)
+        ordered = sorted(self._window)
+        self._latest = Reading(ordered[len(ordered) // 2], time.monotonic())
+
+    def _run(self):
+        next_sample = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self._sample()
+            except Exception as e:
+                log.error("Error measuring distance: %s", e)
+            next_sample += self.period
+            delay = next_sample - time.monotonic()
+            if delay < 0:
+                next_sample = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+_ranger = None
+_ranger_lock = threading.Lock()
+
+def get_ranger():
+    """Returns the process-wide ultrasonic ranger, starting it on first use."""
+    global _ranger
+    with _ranger_lock:
+        if _ranger is None:
+            _ranger = UltrasonicRanger()
+        if not _ranger.is_running():
+            _ranger.start()
+        return _ranger
+
+def stop_ranger():
+    """Stops the process-wide ranger if it is running."""
+    with _ranger_lock:
+        if _ranger is not None and _ranger.is_running():
+            _ranger.stop()
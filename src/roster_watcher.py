@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+import time
+import numpy as np
+from face_index import FACE_ENCODING_SIZE
+from config import DATABASE_PATH, ROSTER_POLL_INTERVAL_S
+from rover_log import get_logger
+
+log = get_logger("roster_watcher")
+
+class RosterWatcher:
+    """Watches registered_personnel in the background and publishes an updated KnownFaceIndex.
+
+    A cheap PRAGMA data_version poll detects commits from other connections (such as
+    an enrollment run). On a change only the row ids are listed; encodings are read
+    for added rows alone, and removed rows are dropped. The new index is handed to
+    on_swap, which replaces the reference the vision loop reads at the start of a frame.
+    """
+    def __init__(self, index, on_swap, db_path=DATABASE_PATH, poll_interval_s=ROSTER_POLL_INTERVAL_S):
+        self.index = index
+        self.on_swap = on_swap
+        self.db_path = db_path
+        self.poll_interval_s = poll_interval_s
+        self.reloads = 0
+        self.added = 0
+        self.removed = 0
+        self.last_reload_ms = 0.0
+        self._data_version = None
+        self._conn = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts polling on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="roster-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stops polling."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        try:
+            while not self._stop_event.wait(self.poll_interval_s):
+                try:
+                    self.check_once()
+                except sqlite3.Error as e:
+                    log.error("Roster watcher database error: %s", e)
+        finally:
+            self._close()
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def check_once(self):
+        """Applies any roster changes since the last check; returns True if a new index was published."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        # The first check always diffs, since the index was loaded through another connection
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        start = time.perf_counter()
+        db_ids = {row[0] for row in self._conn.execute("SELECT id FROM registered_personnel")}
+        current_ids = set(self.index.ids.tolist())
+        added_ids = sorted(db_ids - current_ids)
+        removed_ids = current_ids - db_ids
+        if not added_ids and not removed_ids:
+            return False
+        ids, names, blobs = [], [], []
+        for chunk_start in range(0, len(added_ids), 500):
+            chunk = added_ids[chunk_start:chunk_start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT id, name, face_encoding FROM registered_personnel WHERE id IN ({placeholders}) ORDER BY id", chunk
+            ).fetchall()
+            for row_id, name, encoding_blob in rows:
+                if len(encoding_blob) != FACE_ENCODING_SIZE * 8:
+                    log.warning("Invalid encoding for %s", name)
+                    continue
+                ids.append(row_id)
+                names.append(name)
+                blobs.append(encoding_blob)
+        encodings = np.frombuffer(b"".join(blobs), dtype=np.float64).reshape(-1, FACE_ENCODING_SIZE)
+        self.index = self.index.with_changes(encodings, names, ids, removed_ids)
+        self.on_swap(self.index)
+        self.reloads += 1
+        self.added += len(ids)
+        self.removed += len(removed_ids)
+        self.last_reload_ms = (time.perf_counter() - start) * 1000.0
+        log.info("Roster updated: +%d -%d (%d known, %.1f ms)", len(ids), len(removed_ids), len(self.index), self.last_reload_ms)
+        return True
+
+    def stats(self):
+        """Returns how many reloads ran and how many rows they added and removed."""
+        return {"reloads": self.reloads, "added": self.added, "removed": self.removed, "last_reload_ms": self.last_reload_ms}
@@ -0,0 +1,140 @@
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from config import (
+    LOG_DIR, LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_QUEUE_SIZE,
+    LOG_REPEAT_WINDOW_S, LOG_CONSOLE_LEVEL, LOG_FILE_LEVEL
+)
+
+ROOT_LOGGER = "rover"
+LOG_FORMAT = "[%(asctime)s] %(levelname)s: %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def get_logger(name):
+    """Returns the logger for a rover module; until setup_logging() only warnings and errors reach stderr."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+class RepeatFilter(logging.Filter):
+    """Collapses repeats of the same message template within window_s seconds.
+
+    The first occurrence passes; later ones inside the window are counted and dropped.
+    The next occurrence after the window passes with the count appended. Messages are
+    keyed by their unformatted template, so "Obstacle DETECTED at %.1f cm" collapses
+    whatever the distance.
+    """
+    def __init__(self, window_s=LOG_REPEAT_WINDOW_S):
+        super().__init__()
+        self.window_s = window_s
+        self.suppressed_total = 0
+        self._seen = {}  # (logger, level, template) -> [window start, suppressed count, args of the last one]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.window_s <= 0:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        with self._lock:
+            state = self._seen.get(key)
+            if state is not None and record.created - state[0] < self.window_s:
+                state[1] += 1
+                state[2] = record.args
+                self.suppressed_total += 1
+                return False
+            if state is not None and state[1]:
+                record.msg = f"{record.msg} (repeated {state[1]} more times)"
+            self._seen[key] = [record.created, 0, None]
+        return True
+
+    def pending(self):
+        """Returns (logger, level, template, args, count) for repeats not yet reported."""
+        with self._lock:
+            return [(name, level, msg, state[2], state[1]) for (name, level, msg), state in self._seen.items() if state[1]]
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records without formatting them; a full queue drops the record instead of blocking."""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread; exc_info is rendered here because tracebacks cannot be queued
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _BlockingStopListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room rather than failing when the queue is full at shutdown
+        self.queue.put(self._sentinel)
+
+class RoverLogging:
+    """The running log pipeline: queue handler on the rover logger, listener thread with console and file handlers."""
+    def __init__(self, log_dir=LOG_DIR, filename=LOG_FILE, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+                 queue_size=LOG_QUEUE_SIZE, repeat_window_s=LOG_REPEAT_WINDOW_S,
+                 console_level=LOG_CONSOLE_LEVEL, file_level=LOG_FILE_LEVEL, stream=None):
+        formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+        handlers = []
+        console = logging.StreamHandler(stream if stream is not None else sys.stdout)
+        console.setLevel(console_level)
+        console.setFormatter(formatter)
+        handlers.append(console)
+        self.path = None
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            self.path = os.path.join(log_dir, filename)
+            file_handler = logging.handlers.RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backup_count)
+            file_handler.setLevel(file_level)
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        self.repeat_filter = RepeatFilter(repeat_window_s)
+        self.handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.handler.addFilter(self.repeat_filter)
+        self.listener = _BlockingStopListener(self.handler.queue, *handlers, respect_handler_level=True)
+        self.logger = logging.getLogger(ROOT_LOGGER)
+        self.logger.setLevel(min(logging.getLevelName(console_level), logging.getLevelName(file_level)))
+        self.logger.propagate = False
+
+    def start(self):
+        self.logger.addHandler(self.handler)
+        self.listener.start()
+
+    def stop(self):
+        """Reports repeats still being collapsed, then writes out the queue and closes the files."""
+        for name, level, msg, args, count in self.repeat_filter.pending():
+            record = logging.LogRecord(name, level, "", 0, f"{msg} (repeated {count} more times)", args, None)
+            self.handler.enqueue(record)
+        self.logger.removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def stats(self):
+        """Returns records collapsed as repeats and dropped because the queue was full."""
+        return {"suppressed": self.repeat_filter.suppressed_total, "dropped": self.handler.dropped}
+
+_logging = None
+
+def setup_logging(**kwargs):
+    """Starts asynchronous logging for every rover logger; calling it again returns the running instance."""
+    global _logging
+    if _logging is None:
+        _logging = RoverLogging(**kwargs)
+        _logging.start()
+    return _logging
+
+def stop_logging():
+    """Flushes and stops the log listener; rover loggers fall silent until setup_logging() runs again."""
+    global _logging
+    if _logging is not None:
+        _logging.stop()
+        _logging = None
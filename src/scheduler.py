@@ -0,0 +1,96 @@
+import threading
+from config import (
+    FRAME_BUDGET_S, SCHEDULER_EWMA_ALPHA, SCHEDULER_MAX_DETECT_EVERY, SCHEDULER_MAX_VERIFY_EVERY
+)
+
+DETECT = "detect"  # Run the person DNN, then face verification for tracks that need it
+VERIFY = "verify"  # Reuse the last person boxes, but allow face re-verification
+TRACK = "track"  # Reuse the last person boxes and cached identities only
+
+class CadenceScheduler:
+    """Decides per frame how much vision work fits in the loop's frame budget.
+
+    Stage latencies are tracked as exponential moving averages. Before each frame the
+    scheduler picks the smallest detection and verification intervals whose amortised
+    cost fits in frame_budget_s, so the loop rate holds and detection quality degrades
+    gradually under load. In pipelined mode stages run in parallel, so only the
+    slowest stage has to fit in the budget.
+    """
+    def __init__(self, frame_budget_s=FRAME_BUDGET_S, pipelined=False, alpha=SCHEDULER_EWMA_ALPHA,
+                 max_detect_every=SCHEDULER_MAX_DETECT_EVERY, max_verify_every=SCHEDULER_MAX_VERIFY_EVERY):
+        self.frame_budget_s = frame_budget_s
+        self.pipelined = pipelined
+        self.alpha = alpha
+        self.max_detect_every = max_detect_every
+        self.max_verify_every = max_verify_every
+        self.latency = {"capture": 0.0, "detect": 0.0, "verify": 0.0, "other": 0.0}
+        self.detect_every = 1
+        self.verify_every = 1
+        self.frame_index = 0
+        self.counts = {DETECT: 0, VERIFY: 0, TRACK: 0}
+        self._last_detect = None
+        self._last_verify = None
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """Feeds one measured stage latency into its moving average."""
+        with self._lock:
+            previous = self.latency.get(stage, 0.0)
+            self.latency[stage] = seconds if previous == 0.0 else previous + self.alpha * (seconds - previous)
+
+    def estimated_frame_cost(self, detect_every, verify_every):
+        """Amortised per-frame cost in seconds for the given intervals."""
+        detect = self.latency["detect"] / detect_every
+        verify = self.latency["verify"] / verify_every
+        if self.pipelined:
+            return max(self.latency["capture"], detect, verify + self.latency["other"])
+        return self.latency["capture"] + detect + verify + self.latency["other"]
+
+    def _adapt(self):
+        detect_every, verify_every = 1, 1
+        while self.estimated_frame_cost(detect_every, verify_every) > self.frame_budget_s:
+            # Back off whichever stage currently costs more per frame
+            detect_share = self.latency["detect"] / detect_every
+            verify_share = self.latency["verify"] / verify_every
+            if detect_share >= verify_share and detect_every < self.max_detect_every:
+                detect_every += 1
+            elif verify_every < self.max_verify_every:
+                verify_every += 1
+            elif detect_every < self.max_detect_every:
+                detect_every += 1
+            else:
+                break
+        self.detect_every, self.verify_every = detect_every, verify_every
+
+    def next_action(self):
+        """Returns DETECT, VERIFY or TRACK for the next frame."""
+        with self._lock:
+            self._adapt()
+            self.frame_index += 1
+            if self._last_detect is None or self.frame_index - self._last_detect >= self.detect_every:
+                action = DETECT
+                self._last_detect = self.frame_index
+                self._last_verify = self.frame_index
+            elif self.frame_index - self._last_verify >= self.verify_every:
+                action = VERIFY
+                self._last_verify = self.frame_index
+            else:
+                action = TRACK
+            self.counts[action] += 1
+            return action
+
+    def remaining(self, elapsed):
+        """Seconds left in the frame budget after elapsed seconds of work."""
+        return max(0.0, self.frame_budget_s - elapsed)
+
+    def stats(self):
+        """Returns the current cadence, stage latencies (ms) and how often each action ran."""
+        with self._lock:
+            return {
+                "detect_every": self.detect_every,
+                "verify_every": self.verify_every,
+                "frame_budget_ms": self.frame_budget_s * 1000.0,
+                "estimated_frame_ms": self.estimated_frame_cost(self.detect_every, self.verify_every) * 1000.0,
+                "latency_ms": {stage: value * 1000.0 for stage, value in self.latency.items()},
+                "actions": dict(self.counts),
+            }
@@ -1,32 +1,46 @@
-import numpy as np
-from motor_control import get_distance_cm
+import time
+from motor_control import get_distance_reading
+from occupancy_grid import OccupancyGrid
+from config import OBSTACLE_DISTANCE_THRESHOLD_CM, ROVER_WIDTH_M, NAVIGATION_SECTORS, ULTRASONIC_STALE_S
+from rover_log import get_logger
+
+log = get_logger("sensor_fusion")
 
 class SensorFusion:
     """Combines data from LIDAR and ultrasonic sensors for navigation."""
     def __init__(self):
-        self.lidar_data = None  # Placeholder for LIDAR point cloud
+        self.lidar_data = None  # Latest LIDAR scan
+        self.grid = OccupancyGrid()
         self.ultrasonic_distance = float('inf')
+        self.ultrasonic_timestamp = None
 
     def update_lidar_data(self, point_cloud):
         """Updates LIDAR point cloud data."""
-        self.lidar_data = point_cloud  # Expected to be a numpy array of 3D points
-        print("SIMULATION: Updated LIDAR point cloud.")
+        self.lidar_data = point_cloud  # Expected to be a numpy array of (x, y[, z]) points in metres
+        self.grid.integrate(point_cloud)
 
     def update_ultrasonic_data(self):
-        """Updates ultrasonic sensor data."""
-        self.ultrasonic_distance = get_distance_cm()
-        print(f"Ultrasonic distance updated: {self.ultrasonic_distance:.1f} cm")
+        """Updates ultrasonic sensor data from one ranger sample; a stale sample reads as inf."""
+        reading = get_distance_reading()  # Read once, so distance and timestamp describe the same sample
+        stale = time.monotonic() - reading.timestamp > ULTRASONIC_STALE_S
+        self.ultrasonic_distance = float('inf') if stale else reading.distance_cm
+        self.ultrasonic_timestamp = reading.timestamp
+        log.debug("Ultrasonic distance updated: %.1f cm", self.ultrasonic_distance)
 
     def fuse_sensors(self):
         """Combines LIDAR and ultrasonic data for obstacle detection."""
         if self.lidar_data is None:
-            print("WARNING: No LIDAR data available. Using ultrasonic data only.")
-            return self.ultrasonic_distance < 30  # Threshold from config
-        # Simplified fusion: Check if either sensor detects an obstacle
-        lidar_obstacle = np.any(self.lidar_data[:, 2] < 0.3) if self.lidar_data is not None else False
-        ultrasonic_obstacle = self.ultrasonic_distance < 30
+            log.warning("No LIDAR data available. Using ultrasonic data only.")
+            return self.ultrasonic_distance < OBSTACLE_DISTANCE_THRESHOLD_CM
+        # Obstacle if either the corridor ahead is blocked in the grid or the ultrasonic sensor sees one
+        lidar_obstacle = not self.grid.corridor_clear(OBSTACLE_DISTANCE_THRESHOLD_CM / 100.0, ROVER_WIDTH_M)
+        ultrasonic_obstacle = self.ultrasonic_distance < OBSTACLE_DISTANCE_THRESHOLD_CM
         return lidar_obstacle or ultrasonic_obstacle
 
+    def free_space_heading(self):
+        """Returns (heading_deg, clearance_m) of the most open sector around the rover."""
+        return self.grid.free_space_sector(NAVIGATION_SECTORS)
+
     def get_navigation_decision(self):
         """Returns navigation decision based on fused sensor data."""
         if self.fuse_sensors():
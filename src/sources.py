@@ -0,0 +1,278 @@
+import queue
+import struct
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+import cv2
+import numpy as np
+from ranging import Reading
+from config import RECORD_JPEG_QUALITY, RECORD_QUEUE_SIZE, FRAME_BUFFER_POOL_SIZE
+
+try:
+    from picamera2 import MappedArray
+except ImportError:
+    MappedArray = None
+
+RECORDING_MAGIC = b"TRREC1\n"
+RECORD_FRAME = 1
+RECORD_ULTRASONIC = 2
+RECORD_LIDAR = 3
+_CHUNK_HEADER = struct.Struct("!BdI")  # kind, timestamp (monotonic seconds), payload length
+
+# frame is the BGR frame the loop detects on; hires is a high-res BGR frame of the same instant, or None.
+# hires_skipped is True when a dual-stream camera left hires out because nobody was in view
+Capture = namedtuple("Capture", ["frame", "timestamp", "hires", "hires_skipped"], defaults=(False,))
+
+class FrameBufferPool:
+    """A ring of preallocated frame buffers, handed out in turn and allocated on first use.
+
+    A buffer is reused count frames later, so count must exceed the number of frames
+    that can be alive at once (pipeline.max_frames_in_flight(): 3 * PIPELINE_QUEUE_SIZE + 4,
+    counting the one being displayed). Consumers that keep a frame longer must copy it,
+    as the Recorder does.
+    """
+    def __init__(self, count=FRAME_BUFFER_POOL_SIZE):
+        self.count = count
+        self._buffers = []
+        self._next = 0
+
+    def next(self, shape):
+        """Returns the next buffer of the given uint8 shape."""
+        if len(self._buffers) < self.count:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers.append(buffer)
+            return buffer
+        index = self._next
+        self._next = (index + 1) % self.count
+        if self._buffers[index].shape != tuple(shape):
+            self._buffers[index] = np.empty(shape, dtype=np.uint8)
+        return self._buffers[index]
+
+@contextmanager
+def _stream_array(request, stream):
+    """Yields a stream of a capture request, mapped in place when picamera2 is available."""
+    if MappedArray is None:
+        yield request.make_array(stream)
+        return
+    with MappedArray(request, stream, write=False) as mapped:
+        yield mapped.array
+
+class CameraSource:
+    """Frame source backed by a started Picamera2 instance.
+
+    The camera must be configured with an RGB888 main stream, which is already BGR in
+    memory, so the single-stream path does no colour conversion at all. With
+    dual_stream=True it also needs a YUV420 lores stream; both come from one request,
+    the lores image is converted for detection and the main buffer is copied unconverted.
+    Streams are read through memory-mapped views straight into pooled buffers, so a
+    frame costs one copy (or one conversion) and no allocation. While want_hires(False)
+    is in effect (the last detection found nobody), the main buffer is not copied at all.
+    """
+    def __init__(self, camera, stream="main", dual_stream=False, pool_size=FRAME_BUFFER_POOL_SIZE):
+        self.camera = camera
+        self.stream = stream
+        self.dual_stream = dual_stream
+        self._frames = FrameBufferPool(pool_size)
+        self._hires = FrameBufferPool(pool_size)
+        self.hires_wanted = True
+
+    def want_hires(self, wanted):
+        """Sets whether the next reads copy the high-res stream; it is only needed while persons are in view."""
+        self.hires_wanted = wanted
+
+    def read(self):
+        """Returns a Capture whose frames stay valid for the next pool_size - 1 reads."""
+        request = self.camera.capture_request()
+        try:
+            timestamp = time.monotonic()
+            if not self.dual_stream:
+                with _stream_array(request, self.stream) as main:
+                    frame = self._frames.next(main.shape)
+                    np.copyto(frame, main)
+                return Capture(frame, timestamp, None)
+            with _stream_array(request, "lores") as lores:
+                frame = self._frames.next((lores.shape[0] * 2 // 3, lores.shape[1], 3))
+                cv2.cvtColor(lores, cv2.COLOR_YUV420p2BGR, dst=frame)
+            if not self.hires_wanted:
+                return Capture(frame, timestamp, None, True)
+            with _stream_array(request, "main") as main:
+                hires = self._hires.next(main.shape)
+                np.copyto(hires, main)
+        finally:
+            request.release()
+        return Capture(frame, timestamp, hires)
+
+    def finished(self):
+        return False
+
+    def stop(self):
+        self.camera.stop()
+
+def _encode_chunk(kind, timestamp, payload):
+    return _CHUNK_HEADER.pack(kind, timestamp, len(payload)) + payload
+
+def read_recording(path):
+    """Opens a recording and returns an iterator of its (kind, timestamp, payload) chunks.
+
+    Raises OSError or ValueError straight away if the file cannot be used. A truncated
+    final chunk (e.g. after a crash) is ignored.
+    """
+    f = open(path, "rb")
+    if f.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+        f.close()
+        raise ValueError(f"{path} is not a rover recording")
+    return _iter_chunks(f)
+
+def _iter_chunks(f):
+    with f:
+        while True:
+            header = f.read(_CHUNK_HEADER.size)
+            if len(header) < _CHUNK_HEADER.size:
+                return
+            kind, timestamp, length = _CHUNK_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield kind, timestamp, payload
+
+def decode_lidar(payload):
+    rows, cols = struct.unpack("!II", payload[:8])
+    return np.frombuffer(payload[8:], dtype=np.float32).reshape(rows, cols)
+
+class Recorder:
+    """Writes camera frames, ultrasonic readings and LIDAR scans to a chunked recording file.
+
+    Each chunk is a small header (kind, timestamp, length) followed by its payload:
+    frames as JPEG, readings as one float64, scans as a float32 matrix. Encoding and
+    writing happen on a background thread; when it falls behind, chunks are dropped
+    rather than stalling the rover loop.
+    """
+    def __init__(self, path, jpeg_quality=RECORD_JPEG_QUALITY, queue_size=RECORD_QUEUE_SIZE):
+        self.path = path
+        self.jpeg_quality = jpeg_quality
+        self.written = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+    def start(self):
+        """Opens the file and starts the writer thread."""
+        self._file = open(self.path, "wb")
+        self._file.write(RECORDING_MAGIC)
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Writes everything still queued and closes the file."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def record_frame(self, frame, timestamp):
+        # Copied, since camera sources reuse their frame buffers
+        self._put((RECORD_FRAME, timestamp, frame.copy()))
+
+    def record_distance(self, distance_cm, timestamp):
+        self._put((RECORD_ULTRASONIC, timestamp, distance_cm))
+
+    def record_lidar(self, points, timestamp):
+        self._put((RECORD_LIDAR, timestamp, np.array(points, dtype=np.float32)))
+
+    def _payload(self, kind, data):
+        if kind == RECORD_FRAME:
+            ok, jpeg = cv2.imencode(".jpg", data, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            return jpeg.tobytes() if ok else None
+        if kind == RECORD_ULTRASONIC:
+            return struct.pack("!d", data)
+        points = data.reshape(len(data), -1)
+        return struct.pack("!II", *points.shape) + np.ascontiguousarray(points).tobytes()
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                kind, timestamp, data = item
+                payload = self._payload(kind, data)
+                if payload is None:
+                    continue
+                chunk = _encode_chunk(kind, timestamp, payload)
+                self._file.write(chunk)
+                self.written += 1
+                self.bytes_written += len(chunk)
+                if kind == RECORD_FRAME:
+                    # Keep the file readable up to the last frame if the rover loses power
+                    self._file.flush()
+        finally:
+            self._file.close()
+
+    def stats(self):
+        """Returns chunks written and dropped, and the file size so far."""
+        return {"written": self.written, "dropped": self.dropped, "bytes": self.bytes_written}
+
+class ReplaySource:
+    """Plays a recording back as the rover's frame and ultrasonic source.
+
+    read() returns the next frame, first applying any sensor chunks recorded before
+    it. With realtime=True frames are paced to their recorded timing; otherwise they
+    are returned as fast as the consumer asks. latest()/distance_cm() mirror
+    UltrasonicRanger, and the most recent LIDAR scan is kept in lidar_scan.
+    """
+    def __init__(self, path, realtime=True):
+        self.path = path
+        self.realtime = realtime
+        self.frames = 0
+        self.lidar_scan = None
+        self._reading = Reading(float('inf'), 0.0)
+        self._chunks = read_recording(path)
+        self._first_timestamp = None
+        self._start_time = None
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def read(self):
+        """Returns a Capture of the next frame at its recorded timestamp, or None once the recording is exhausted."""
+        with self._lock:
+            for kind, timestamp, payload in self._chunks:
+                if self._first_timestamp is None:
+                    self._first_timestamp, self._start_time = timestamp, time.monotonic()
+                if kind == RECORD_ULTRASONIC:
+                    self._reading = Reading(struct.unpack("!d", payload)[0], timestamp)
+                elif kind == RECORD_LIDAR:
+                    self.lidar_scan = decode_lidar(payload)
+                elif kind == RECORD_FRAME:
+                    if self.realtime:
+                        delay = (timestamp - self._first_timestamp) - (time.monotonic() - self._start_time)
+                        if delay > 0:
+                            time.sleep(delay)
+                    frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    self.frames += 1
+                    return Capture(frame, timestamp, None)
+            self._finished = True
+            return None
+
+    def want_hires(self, wanted):
+        """Recordings hold no high-res stream; ignored."""
+
+    def finished(self):
+        return self._finished
+
+    def latest(self):
+        return self._reading
+
+    def distance_cm(self):
+        return self._reading.distance_cm
+
+    def stop(self):
+        self._chunks.close()
@@ -0,0 +1,99 @@
+import importlib
+import threading
+import time
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Importing is thread-safe, so a background thread can warm a module up with load()
+    while other threads already hold the proxy.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """Imports the module if needed and returns it."""
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return module
+
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r} ({'loaded' if self._module is not None else 'not loaded'})>"
+
+def lazy_import(name):
+    """Returns a proxy that imports module name the first time one of its attributes is used."""
+    return LazyModule(name)
+
+class StartupClock:
+    """Records how long after startup each milestone (e.g. first motion) was first reached."""
+    def __init__(self, start=None):
+        self.start = time.monotonic() if start is None else start
+        self.milestones = {}
+        self._lock = threading.Lock()
+
+    def mark(self, milestone):
+        """Returns seconds since start the first time a milestone is reached, None afterwards."""
+        with self._lock:
+            if milestone in self.milestones:
+                return None
+            elapsed = self.milestones[milestone] = time.monotonic() - self.start
+        return elapsed
+
+    def elapsed(self, milestone):
+        """Seconds from start to the milestone, or None if it has not been reached."""
+        return self.milestones.get(milestone)
+
+class BackgroundLoader:
+    """Runs named startup tasks concurrently on daemon threads.
+
+    Each task's return value ends up in results and any exception in errors, so a
+    failed load never takes down the thread that polls ready().
+    """
+    def __init__(self, tasks):
+        self.tasks = dict(tasks)
+        self.results = {}
+        self.errors = {}
+        self.seconds = {}
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        for name, task in self.tasks.items():
+            thread = threading.Thread(target=self._run, args=(name, task), name=f"load-{name}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        return self
+
+    def _run(self, name, task):
+        start = time.monotonic()
+        try:
+            result = task()
+        except Exception as e:
+            with self._lock:
+                self.errors[name] = e
+        else:
+            with self._lock:
+                self.results[name] = result
+        finally:
+            with self._lock:
+                self.seconds[name] = time.monotonic() - start
+
+    def ready(self):
+        """True once every task has finished, successfully or not."""
+        with self._lock:
+            return len(self.seconds) == len(self.tasks)
+
+    def wait(self, timeout=None):
+        """Blocks until every task has finished or timeout expires; returns ready()."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.ready()
@@ -0,0 +1,105 @@
+import numpy as np
+from config import TRACK_IOU_THRESHOLD, TRACK_MAX_MISSES, TRACK_REVERIFY_EVERY, TRACK_REVERIFY_DISTANCE, TRACK_REVERIFY_IOU
+
+def iou_matrix(boxes_a, boxes_b):
+    """Returns the pairwise intersection-over-union of two lists of (startX, startY, endX, endY) boxes."""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+class Track:
+    """A person followed across frames, together with the faces last resolved inside its box."""
+    def __init__(self, track_id, box, frame_index):
+        self.track_id = track_id
+        self.box = box
+        self.misses = 0
+        self.last_iou = 1.0
+        self.faces = []  # (top, right, bottom, left) relative to the box origin, name, distance
+        self.last_verified = None
+        self.created = frame_index
+
+    def needs_verification(self, frame_index, reverify_every=TRACK_REVERIFY_EVERY, reverify_distance=TRACK_REVERIFY_DISTANCE, reverify_iou=TRACK_REVERIFY_IOU):
+        """True when the cached identity is missing, stale, or no longer trustworthy."""
+        if self.last_verified is None or not self.faces:
+            return True
+        if frame_index - self.last_verified >= reverify_every:
+            return True
+        # A weak match or a jump in box position means the identity may have changed
+        if any(name != "Unknown" and distance > reverify_distance for _, name, distance in self.faces):
+            return True
+        return self.last_iou < reverify_iou
+
+    def set_faces(self, faces, frame_index):
+        """Caches the faces resolved for this track on frame_index."""
+        self.faces = faces
+        self.last_verified = frame_index
+
+    def absolute_faces(self):
+        """Returns cached faces shifted to the track's current box position."""
+        startX, startY = self.box[0], self.box[1]
+        return [((top + startY, right + startX, bottom + startY, left + startX), name, distance)
+                for (top, right, bottom, left), name, distance in self.faces]
+
+class PersonTracker:
+    """Associates person boxes across frames by IoU so identities can be reused between frames."""
+    def __init__(self, iou_threshold=TRACK_IOU_THRESHOLD, max_misses=TRACK_MAX_MISSES):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.tracks = []
+        self.frame_index = 0
+        self.verifications = 0
+        self.cache_hits = 0
+        self._next_id = 0
+
+    def update(self, boxes):
+        """Matches this frame's person boxes to existing tracks.
+
+        Returns the tracks seen in this frame, in the same order as boxes.
+        """
+        self.frame_index += 1
+        boxes = [tuple(int(v) for v in box) for box in boxes]
+        matched = [None] * len(boxes)
+        unmatched_tracks = set(range(len(self.tracks)))
+        if self.tracks and boxes:
+            ious = iou_matrix([t.box for t in self.tracks], boxes)
+            # Greedy assignment, best overlaps first
+            for flat in np.argsort(-ious, axis=None):
+                t_idx, b_idx = np.unravel_index(flat, ious.shape)
+                if ious[t_idx, b_idx] < self.iou_threshold:
+                    break
+                if t_idx not in unmatched_tracks or matched[b_idx] is not None:
+                    continue
+                track = self.tracks[t_idx]
+                track.box = boxes[b_idx]
+                track.misses = 0
+                track.last_iou = float(ious[t_idx, b_idx])
+                matched[b_idx] = track
+                unmatched_tracks.discard(t_idx)
+        for t_idx in unmatched_tracks:
+            self.tracks[t_idx].misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        for b_idx, box in enumerate(boxes):
+            if matched[b_idx] is None:
+                track = Track(self._next_id, box, self.frame_index)
+                self._next_id += 1
+                self.tracks.append(track)
+                matched[b_idx] = track
+        return matched
+
+    def stats(self):
+        """Returns how often face verification ran versus reused a cached identity."""
+        total = self.verifications + self.cache_hits
+        return {
+            "active_tracks": len(self.tracks),
+            "verifications": self.verifications,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": self.cache_hits / total if total else 0.0,
+        }
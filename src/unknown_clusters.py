@@ -0,0 +1,99 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+import numpy as np
+from config import (
+    UNKNOWN_CLUSTER_DISTANCE, UNKNOWN_CLUSTER_MAX, UNKNOWN_CLUSTER_TTL_S, UNKNOWN_CLUSTER_MAX_WEIGHT,
+    UNKNOWN_SIGHTING_REPORT_S
+)
+from face_index import FACE_ENCODING_SIZE
+
+# cluster_id: the unknown individual; new: first sighting, so alert with an image; count: sightings so far;
+# report: whether this sighting should be sent (always for new ones, otherwise at most every UNKNOWN_SIGHTING_REPORT_S)
+Sighting = namedtuple("Sighting", ["cluster_id", "new", "count", "report"])
+
+class _Cluster:
+    __slots__ = ("centroid", "count", "first_seen", "last_seen", "last_reported")
+
+    def __init__(self, encoding, now):
+        self.centroid = encoding
+        self.count = 1
+        self.first_seen = now
+        self.last_seen = now
+        self.last_reported = now
+
+class UnknownClusterStore:
+    """Groups unknown face encodings online into one cluster per unknown individual.
+
+    An encoding joins the nearest cluster within max_distance, nudging its centroid
+    (a running mean over at most max_weight sightings, so it follows a face as pose and
+    light change); otherwise it starts a new cluster. Clusters are kept in LRU order:
+    ones not seen for ttl_s expire, and beyond max_clusters the least recently seen is
+    evicted, so an individual seen again after that alerts again.
+    """
+    def __init__(self, max_distance=UNKNOWN_CLUSTER_DISTANCE, max_clusters=UNKNOWN_CLUSTER_MAX, ttl_s=UNKNOWN_CLUSTER_TTL_S,
+                 max_weight=UNKNOWN_CLUSTER_MAX_WEIGHT, report_interval_s=UNKNOWN_SIGHTING_REPORT_S):
+        self.max_distance = max_distance
+        self.max_clusters = max_clusters
+        self.ttl_s = ttl_s
+        self.max_weight = max_weight
+        self.report_interval_s = report_interval_s
+        self.created = 0
+        self.sightings = 0
+        self.expired = 0
+        self.evicted = 0
+        self._clusters = OrderedDict()  # cluster_id -> _Cluster, least recently seen first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clusters)
+
+    def _expire(self, now):
+        while self._clusters:
+            cluster_id, cluster = next(iter(self._clusters.items()))
+            if now - cluster.last_seen < self.ttl_s:
+                return
+            del self._clusters[cluster_id]
+            self.expired += 1
+
+    def _nearest(self, encoding):
+        if not self._clusters:
+            return None, float("inf")
+        ids = list(self._clusters)
+        centroids = np.stack([cluster.centroid for cluster in self._clusters.values()])
+        distances = np.linalg.norm(centroids - encoding, axis=1)
+        best = int(np.argmin(distances))
+        return ids[best], float(distances[best])
+
+    def observe(self, encoding, now=None):
+        """Assigns one unknown face encoding to a cluster and returns a Sighting."""
+        now = time.monotonic() if now is None else now
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(FACE_ENCODING_SIZE)
+        with self._lock:
+            self._expire(now)
+            self.sightings += 1
+            cluster_id, distance = self._nearest(encoding)
+            if cluster_id is not None and distance <= self.max_distance:
+                cluster = self._clusters[cluster_id]
+                self._clusters.move_to_end(cluster_id)
+                cluster.count += 1
+                cluster.last_seen = now
+                cluster.centroid = cluster.centroid + (encoding - cluster.centroid) / min(cluster.count, self.max_weight)
+                report = now - cluster.last_reported >= self.report_interval_s
+                if report:
+                    cluster.last_reported = now
+                return Sighting(cluster_id, False, cluster.count, report)
+            cluster_id = uuid.uuid4().hex[:12]
+            self._clusters[cluster_id] = _Cluster(encoding, now)
+            self.created += 1
+            while len(self._clusters) > self.max_clusters:
+                self._clusters.popitem(last=False)
+                self.evicted += 1
+            return Sighting(cluster_id, True, 1, True)
+
+    def stats(self):
+        """Returns live clusters, clusters created, sightings, and clusters expired or evicted."""
+        with self._lock:
+            return {"clusters": len(self._clusters), "created": self.created, "sightings": self.sightings,
+                    "expired": self.expired, "evicted": self.evicted}
@@ -1,79 +1,167 @@
 import cv2
 import numpy as np
-import face_recognition
-from PIL import Image
-import io
 import base64
-from config import DNN_MODEL_PROTOTXT, DNN_MODEL_CAFFEMODEL, FACE_DETECTION_MODEL, CAMERA_RESOLUTION
+from config import FACE_DETECTION_MODEL, CAMERA_RESOLUTION
+from face_index import KnownFaceIndex
+from detector import get_detector
+from face_cascade import get_face_cascade
+from rover_log import get_logger
+from startup import lazy_import
+
+face_recognition = lazy_import("face_recognition")  # Loads dlib's models; deferred so importing this module stays cheap
+
+log = get_logger("vision_processing")
+
+def clip_box(box, width, height):
+    """Clips a (startX, startY, endX, endY) box to the frame bounds."""
+    startX, startY, endX, endY = box
+    return (max(0, int(startX)), max(0, int(startY)), min(width, int(endX)), min(height, int(endY)))
+
+def scale_box(box, sx, sy):
+    """Maps a (startX, startY, endX, endY) box to a stream whose resolution is (sx, sy) times larger."""
+    startX, startY, endX, endY = box
+    return (int(startX * sx), int(startY * sy), int(round(endX * sx)), int(round(endY * sy)))
+
+def scale_location(location, sx, sy):
+    """Maps a (top, right, bottom, left) face location to a stream (sx, sy) times larger."""
+    top, right, bottom, left = location
+    return (int(round(top * sy)), int(round(right * sx)), int(round(bottom * sy)), int(round(left * sx)))
+
+def merge_overlapping_boxes(boxes):
+    """Merges overlapping boxes into a minimal set of disjoint regions covering all of them."""
+    regions = [tuple(box) for box in boxes if box[2] > box[0] and box[3] > box[1]]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(regions)):
+            for j in range(i + 1, len(regions)):
+                a, b = regions[i], regions[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    regions[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del regions[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return regions
+
+def boxes_in_region(boxes, region):
+    """Returns the boxes lying inside a merged region, shifted to region-relative coordinates."""
+    rx, ry, rX, rY = region
+    return [(startX - rx, startY - ry, endX - rx, endY - ry) for startX, startY, endX, endY in boxes
+            if startX >= rx and startY >= ry and endX <= rX and endY <= rY and endX > startX and endY > startY]
+
+def locate_faces(rgb_image, model=FACE_DETECTION_MODEL, boxes=None):
+    """Returns face locations using "hog", "cnn", or the "cascade" (cheap detector first, CNN on misses).
+
+    boxes are the person boxes inside rgb_image; the cascade escalates each one it missed separately.
+    """
+    if model == "cascade":
+        return get_face_cascade().locate(rgb_image, boxes)
+    return face_recognition.face_locations(rgb_image, model=model)
+
+def locate_faces_in_regions(rgb_frame, boxes, model=FACE_DETECTION_MODEL):
+    """Runs face location once per merged region and returns locations in frame coordinates."""
+    h, w = rgb_frame.shape[:2]
+    boxes = [clip_box(box, w, h) for box in boxes]
+    locations = []
+    for startX, startY, endX, endY in merge_overlapping_boxes(boxes):
+        # dlib needs a contiguous buffer; this copies only the region, not the frame
+        region = np.ascontiguousarray(rgb_frame[startY:endY, startX:endX])
+        members = boxes_in_region(boxes, (startX, startY, endX, endY))
+        for top, right, bottom, left in locate_faces(region, model, members):
+            locations.append((top + startY, right + startX, bottom + startY, left + startX))
+    return locations
+
+def assign_faces_to_boxes(face_locations, boxes):
+    """Returns, per box, the indices of faces whose centre lies in it; the smallest containing box wins."""
+    assignment = [[] for _ in boxes]
+    for face_idx, (top, right, bottom, left) in enumerate(face_locations):
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        containing = [i for i, (startX, startY, endX, endY) in enumerate(boxes)
+                      if startX <= cx < endX and startY <= cy < endY]
+        if containing:
+            smallest = min(containing, key=lambda i: (boxes[i][2] - boxes[i][0]) * (boxes[i][3] - boxes[i][1]))
+            assignment[smallest].append(face_idx)
+    return assignment
+
+def encode_faces_in_regions(bgr_image, boxes, model=FACE_DETECTION_MODEL):
+    """Frame-level face pass: locates and encodes the faces in each merged person region of a BGR image.
+
+    Only the merged regions are converted to RGB, so it suits the high-resolution camera
+    stream: pixels outside person boxes are never converted or searched. Returns the face
+    locations in bgr_image coordinates, their encodings, and the per-box face indices.
+    """
+    h, w = bgr_image.shape[:2]
+    boxes = [clip_box(box, w, h) for box in boxes]
+    locations, encodings = [], []
+    for startX, startY, endX, endY in merge_overlapping_boxes(boxes):
+        region = cv2.cvtColor(bgr_image[startY:endY, startX:endX], cv2.COLOR_BGR2RGB)
+        members = boxes_in_region(boxes, (startX, startY, endX, endY))
+        region_locations, region_encodings = encode_region(region, model, members)
+        encodings.extend(region_encodings)
+        locations.extend((top + startY, right + startX, bottom + startY, left + startX)
+                         for top, right, bottom, left in region_locations)
+    return locations, encodings, assign_faces_to_boxes(locations, boxes)
+
+def encode_region(rgb_region, model=FACE_DETECTION_MODEL, boxes=None):
+    """Locates and encodes the faces in one contiguous RGB region; locations are region-relative.
+
+    boxes are the region-relative person boxes the region was merged from, if more than one.
+    """
+    locations = locate_faces(rgb_region, model, boxes)
+    if not locations:
+        return [], []
+    return locations, face_recognition.face_encodings(rgb_region, locations)
 
 class VisionProcessor:
     """Handles person and face detection using OpenCV and face_recognition."""
     def __init__(self):
+        self.person_detector = None
         self.person_net = None
         self.load_dnn_model()
 
     def load_dnn_model(self):
-        """Loads the DNN model for person detection."""
-        try:
-            if os.path.exists(DNN_MODEL_PROTOTXT) and os.path.exists(DNN_MODEL_CAFFEMODEL):
-                self.person_net = cv2.dnn.readNetFromCaffe(DNN_MODEL_PROTOTXT, DNN_MODEL_CAFFEMODEL)
-            else:
-                print("ERROR: Model files not found")
-                print(f"Expected: {DNN_MODEL_PROTOTXT}")
-                print(f"Expected: {DNN_MODEL_CAFFEMODEL}")
-                self.person_net = None
-        except cv2.error as e:
-            print(f"ERROR loading person detection model: {e}")
-            self.person_net = None
-
-    def process_frame(self, frame, known_face_encodings, known_face_names):
-        """Processes a frame for person and face detection."""
+        """Loads the DNN model for person detection (shared with every other user of the detector)."""
+        self.person_detector = get_detector()
+        self.person_net = self.person_detector.net if self.person_detector is not None else None
+
+    def process_frame(self, frame, known_faces, known_face_names=None, annotate=True):
+        """Processes a frame for person and face detection.
+
+        known_faces is a KnownFaceIndex; plain lists of encodings and names are
+        still accepted and converted into an index. Faces are drawn into the frame
+        only with annotate=True.
+        """
+        if not isinstance(known_faces, KnownFaceIndex):
+            known_faces = KnownFaceIndex(known_faces, known_face_names)
         h, w = frame.shape[:2]
         if h == 0 or w == 0:
-            print("Warning: Received empty frame")
+            log.warning("Received empty frame")
             return frame, False, None
         try:
-            blob = cv2.dnn.blobFromImage(cv2.resize(frame, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
-            self.person_net.setInput(blob)
-            detections = self.person_net.forward()
             unknown_detected_in_frame = False
             alert_image = None
-            for i in range(detections.shape[2]):
-                confidence = detections[0, 0, i, 2]
-                if confidence > 0.5:
-                    box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-                    startX, startY, endX, endY = box.astype("int")
-                    person_roi = frame[startY:endY, startX:endX]
-                    if person_roi.size == 0:
-                        continue
-                    rgb_roi = cv2.cvtColor(person_roi, cv2.COLOR_BGR2RGB)
-                    face_locations = face_recognition.face_locations(rgb_roi, model=FACE_DETECTION_MODEL)
-                    if face_locations:
-                        face_encodings = face_recognition.face_encodings(rgb_roi, face_locations)
-                        face_names_in_roi = []
-                        roi_contains_unknown = False
-                        for face_encoding in face_encodings:
-                            matches = face_recognition.compare_faces(known_face_encodings, face_encoding)
-                            name = "Unknown"
-                            if True in matches:
-                                first_match_index = matches.index(True)
-                                name = known_face_names[first_match_index]
-                            else:
-                                roi_contains_unknown = True
-                                unknown_detected_in_frame = True
-                            face_names_in_roi.append(name)
-                        for (top, right, bottom, left), name in zip(face_locations, face_names_in_roi):
-                            top_abs, right_abs, bottom_abs, left_abs = top + startY, right + startX, bottom + startY, left + startX
-                            color = (0, 0, 255) if name == "Unknown" else (255, 0, 0)
-                            cv2.rectangle(frame, (left_abs, top_abs), (right_abs, bottom_abs), color, 2)
-                            cv2.rectangle(frame, (left_abs, bottom_abs - 20), (right_abs, bottom_abs), color, cv2.FILLED)
-                            cv2.putText(frame, name, (left_abs, bottom_abs - 5), cv2.FONT_HERSHEY_DUPLEX, 0.5, (255, 255, 255), 1)
-                        if roi_contains_unknown and alert_image is None:
-                            pil_img = Image.fromarray(rgb_roi)
-                            buf = io.BytesIO()
-                            pil_img.save(buf, format="JPEG", quality=85)
-                            alert_image = base64.b64encode(buf.getvalue()).decode()
+            person_boxes = [clip_box(box, w, h) for box in self.person_detector.detect(frame)]
+            person_boxes = [box for box in person_boxes if box[2] > box[0] and box[3] > box[1]]
+            if not person_boxes:
+                return frame, False, None
+            face_locations, face_encodings, assignment = encode_faces_in_regions(frame, person_boxes)
+            matches = known_faces.match(face_encodings)
+            # Encode the alert before annotations are drawn into the frame
+            for (startX, startY, endX, endY), face_indices in zip(person_boxes, assignment):
+                if any(matches[i][0] == "Unknown" for i in face_indices):
+                    unknown_detected_in_frame = True
+                    if alert_image is None:
+                        ok, jpeg = cv2.imencode(".jpg", frame[startY:endY, startX:endX], [cv2.IMWRITE_JPEG_QUALITY, 85])
+                        alert_image = base64.b64encode(jpeg.tobytes()).decode() if ok else None
+            if annotate:
+                for (top, right, bottom, left), (name, _) in zip(face_locations, matches):
+                    color = (0, 0, 255) if name == "Unknown" else (255, 0, 0)
+                    cv2.rectangle(frame, (left, top), (right, bottom), color, 2)
+                    cv2.rectangle(frame, (left, bottom - 20), (right, bottom), color, cv2.FILLED)
+                    cv2.putText(frame, name, (left, bottom - 5), cv2.FONT_HERSHEY_DUPLEX, 0.5, (255, 255, 255), 1)
             return frame, unknown_detected_in_frame, alert_image
         except Exception as e:
-            print(f"Error processing frame: {e}")
+            log.error("Error processing frame: %s", e)
             return frame, False, None
\ No newline at end of file
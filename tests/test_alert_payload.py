@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from alert_payload import (
+    AlertPayloadEncoder, crop_around_face, encode_jpeg_within_budget, pack_alert, unpack_alert
+)
+from config import ALERT_BYTE_BUDGET, ALERT_THUMBNAIL_BYTE_BUDGET
+
+def noisy_image(h, w, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+
+class TestAlertPayload(unittest.TestCase):
+    def test_pack_roundtrip(self):
+        data = pack_alert({"id": "abc", "kind": "full"}, b"\xff\xd8jpeg")
+        header, image = unpack_alert(data)
+        self.assertEqual(header, {"id": "abc", "kind": "full"})
+        self.assertEqual(image, b"\xff\xd8jpeg")
+
+    def test_unpack_rejects_garbage(self):
+        with self.assertRaises(ValueError):
+            unpack_alert(b"nope")
+        with self.assertRaises(ValueError):
+            unpack_alert(pack_alert({}, b"12345")[:-2])
+
+    def test_jpeg_fits_budget(self):
+        image = noisy_image(240, 200)
+        for budget in (20000, 6000, 2000):
+            jpeg, quality, scale = encode_jpeg_within_budget(image, budget)
+            self.assertLessEqual(len(jpeg), budget)
+            self.assertTrue(jpeg.startswith(b"\xff\xd8"))
+        # Noise at a tiny budget forces downscaling
+        _, _, scale = encode_jpeg_within_budget(image, 2000)
+        self.assertLess(scale, 1.0)
+
+    def test_crop_around_face(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        crop = crop_around_face(frame, (100, 300, 200, 200), margin=0.5)
+        self.assertEqual(crop.shape[:2], (200, 200))
+        edge = crop_around_face(frame, (0, 100, 50, 0), margin=0.5)
+        self.assertEqual(edge.shape[:2], (75, 150))
+
+    def test_thumbnail_first(self):
+        encoder = AlertPayloadEncoder(byte_budget=12000, thumbnail_budget=2500, send_thumbnail_first=True)
+        alert_id, first, full = encoder.encode(noisy_image(160, 160), "msg", 1.0)
+        self.assertLessEqual(len(first), 2500)
+        header, _ = unpack_alert(first)
+        self.assertEqual((header["id"], header["kind"]), (alert_id, "thumbnail"))
+        self.assertEqual(unpack_alert(full)[0]["kind"], "full")
+        _, only, deferred = AlertPayloadEncoder(send_thumbnail_first=False).encode(noisy_image(160, 160), "msg", 1.0)
+        self.assertIsNone(deferred)
+        self.assertEqual(unpack_alert(only)[0]["kind"], "full")
+
+    def test_payload_including_header_fits_budget(self):
+        encoder = AlertPayloadEncoder(send_thumbnail_first=True)
+        _, thumbnail, full = encoder.encode(noisy_image(240, 200), 'ALERT: Unknown person detected by rover unit', 1760000000.123456, cluster_id="0123456789ab")
+        self.assertLessEqual(len(full), ALERT_BYTE_BUDGET)
+        self.assertLessEqual(len(thumbnail), ALERT_THUMBNAIL_BYTE_BUDGET)
+        self.assertEqual(unpack_alert(full)[0]["cluster"], "0123456789ab")
+
+    def test_cluster_and_sighting(self):
+        encoder = AlertPayloadEncoder(send_thumbnail_first=False)
+        _, payload, _ = encoder.encode(noisy_image(80, 80), "msg", 1.0, cluster_id="c1")
+        self.assertEqual(unpack_alert(payload)[0]["cluster"], "c1")
+        header, image = unpack_alert(encoder.encode_sighting("c1", 4, "seen", 2.0))
+        self.assertEqual((header["kind"], header["cluster"], header["count"]), ("sighting", "c1", 4))
+        self.assertEqual(image, b"")
+
+if __name__ == '__main__':
+    unittest.main()
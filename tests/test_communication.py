@@ -1,7 +1,50 @@
 import unittest
-from communication import send_alert
+import tempfile
+import time
+import numpy as np
+import requests
+from communication import send_alert, AlertDispatcher
+from alert_payload import unpack_alert
 from config import ALERT_APP_URL
 
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+class FakeSession:
+    """Records posted payloads; fails while link_up is False."""
+    def __init__(self, response_body=None):
+        self.link_up = True
+        self.posted = []
+        self.response_body = response_body
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        if timeout is None:
+            raise AssertionError("alerts must be sent with a timeout")
+        if not self.link_up:
+            raise requests.ConnectionError("link down")
+        self.posted.append(unpack_alert(data))
+        return FakeResponse(200, self.response_body)
+
+def make_image(value):
+    return np.full((120, 100, 3), value, dtype=np.uint8)
+
+def wait_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
 class TestCommunication(unittest.TestCase):
     def test_send_alert(self):
         # Use a dummy base64 string
@@ -18,5 +61,112 @@ class TestCommunication(unittest.TestCase):
                 print(f"Alert test failed: {e}")
                 self.assertTrue(False)
 
+class TestAlertDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.spool = tempfile.TemporaryDirectory()
+        self.session = FakeSession()
+        self.images = {name: make_image(i * 40) for i, name in enumerate(["first", "second", "third"])}
+
+    def tearDown(self):
+        self.spool.cleanup()
+
+    def make_dispatcher(self):
+        return AlertDispatcher(url="http://alerts.invalid/alert", spool_dir=self.spool.name, session=self.session,
+                               backoff_initial=0.01, backoff_max=0.05)
+
+    def sent_timestamps(self):
+        return [header["timestamp"] for header, _ in self.session.posted]
+
+    def test_submit_does_not_block_and_delivers(self):
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        try:
+            start = time.monotonic()
+            dispatcher.submit(self.images["first"], timestamp=1.0)
+            self.assertLess(time.monotonic() - start, 0.05)
+            self.assertTrue(wait_until(lambda: len(self.session.posted) == 1))
+        finally:
+            dispatcher.stop()
+        header, jpeg = self.session.posted[0]
+        self.assertEqual(header["timestamp"], 1.0)
+        self.assertTrue(jpeg.startswith(b"\xff\xd8"))
+        self.assertEqual(dispatcher.pending(), 0)
+
+    def test_outage_spools_and_flushes_in_order(self):
+        self.session.link_up = False
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        try:
+            for i, image in enumerate(self.images.values()):
+                dispatcher.submit(image, timestamp=float(i))
+            self.assertTrue(wait_until(lambda: dispatcher.pending() == 3 and dispatcher.failed_attempts > 0))
+            self.session.link_up = True
+            self.assertTrue(wait_until(lambda: len(self.session.posted) == 3))
+        finally:
+            dispatcher.stop()
+        self.assertEqual(self.sent_timestamps(), [0.0, 1.0, 2.0])
+
+    def test_new_alerts_do_not_bypass_backoff(self):
+        self.session.link_up = False
+        dispatcher = AlertDispatcher(url="http://alerts.invalid/alert", spool_dir=self.spool.name, session=self.session,
+                                     backoff_initial=0.5, backoff_max=0.5)
+        dispatcher.start()
+        try:
+            dispatcher.submit(self.images["first"], timestamp=0.0)
+            self.assertTrue(wait_until(lambda: dispatcher.failed_attempts == 1))
+            for i in range(5):
+                dispatcher.submit(self.images["second"], timestamp=float(i + 1))
+                time.sleep(0.04)
+            self.assertTrue(wait_until(lambda: dispatcher.pending() == 6))
+            self.assertEqual(dispatcher.failed_attempts, 1)
+            self.assertTrue(wait_until(lambda: dispatcher.failed_attempts == 2))
+        finally:
+            dispatcher.stop()
+
+    def test_spool_survives_restart(self):
+        self.session.link_up = False
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        dispatcher.submit(self.images["first"], timestamp=1.0)
+        self.assertTrue(wait_until(lambda: dispatcher.pending() == 1))
+        dispatcher.stop()
+        self.session.link_up = True
+        restarted = self.make_dispatcher()
+        restarted.start()
+        try:
+            restarted.submit(self.images["second"], timestamp=2.0)
+            self.assertTrue(wait_until(lambda: len(self.session.posted) == 2))
+        finally:
+            restarted.stop()
+        self.assertEqual(self.sent_timestamps(), [1.0, 2.0])
+
+    def test_full_image_sent_when_server_requests_it(self):
+        self.session.response_body = {"request_full": True}
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        try:
+            dispatcher.submit(self.images["first"])
+            self.assertTrue(wait_until(lambda: len(self.session.posted) == 2))
+        finally:
+            dispatcher.stop()
+        (thumb_header, _), (full_header, _) = self.session.posted
+        self.assertEqual(thumb_header["kind"], "thumbnail")
+        self.assertEqual(full_header["kind"], "full")
+        self.assertEqual(thumb_header["id"], full_header["id"])
+
+    def test_sighting_sent_without_image(self):
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        try:
+            dispatcher.submit(self.images["first"], timestamp=1.0, cluster_id="c1")
+            dispatcher.submit_sighting("c1", 2, timestamp=2.0)
+            self.assertTrue(wait_until(lambda: len(self.session.posted) >= 2))
+        finally:
+            dispatcher.stop()
+        (alert_header, _), (sighting_header, image) = self.session.posted[0], self.session.posted[-1]
+        self.assertEqual(alert_header["cluster"], "c1")
+        self.assertEqual((sighting_header["kind"], sighting_header["cluster"], sighting_header["count"]), ("sighting", "c1", 2))
+        self.assertEqual(image, b"")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
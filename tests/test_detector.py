@@ -0,0 +1,90 @@
+import unittest
+import numpy as np
+import detector
+from detector import PersonDetector, register_detector, get_detector, missing_model_files, available_detectors
+
+class FakeNet:
+    """Stands in for cv2.dnn.Net: returns one person detection in the SSD output layout."""
+    def __init__(self):
+        self.inputs = []
+        self.backend = None
+        self.target = None
+
+    def setPreferableBackend(self, backend):
+        self.backend = backend
+
+    def setPreferableTarget(self, target):
+        self.target = target
+
+    def setInput(self, blob):
+        self.inputs.append(blob.shape)
+
+    def forward(self):
+        detections = np.zeros((1, 1, 2, 7), dtype=np.float32)
+        detections[0, 0, 0] = [0, 15, 0.9, 0.25, 0.25, 0.5, 0.75]
+        detections[0, 0, 1] = [0, 15, 0.2, 0.0, 0.0, 1.0, 1.0]
+        return detections
+
+class TestPersonDetector(unittest.TestCase):
+    def test_detect_returns_pixel_boxes_above_threshold(self):
+        person_detector = PersonDetector("fake", FakeNet(), (300, 300), 1.0, (104.0, 177.0, 123.0))
+        boxes = person_detector.detect(np.zeros((480, 640, 3), dtype=np.uint8), confidence_threshold=0.5)
+        self.assertEqual(boxes, [(160, 120, 320, 360)])
+        self.assertEqual(person_detector.net.inputs[-1], (1, 3, 300, 300))
+
+    def test_warmup_measures_inference_time(self):
+        person_detector = PersonDetector("fake", FakeNet(), (300, 300), 1.0, (0, 0, 0))
+        timings = person_detector.warmup(runs=3)
+        self.assertEqual(len(timings), 3)
+        self.assertIsNotNone(person_detector.inference_ms)
+
+class TestDetectorRegistry(unittest.TestCase):
+    def setUp(self):
+        self.loads = 0
+
+        @register_detector("test-fake", [])
+        def load_fake():
+            self.loads += 1
+            return FakeNet()
+
+    def tearDown(self):
+        detector._registry.pop("test-fake", None)
+        detector._detectors.pop("test-fake", None)
+
+    def test_singleton_loaded_once_and_configured(self):
+        first = get_detector("test-fake")
+        second = get_detector("test-fake")
+        self.assertIs(first, second)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(first.net.backend, detector.DNN_BACKENDS["opencv"])
+        self.assertEqual(first.net.target, detector.DNN_TARGETS["cpu"])
+        self.assertIsNotNone(first.inference_ms)
+
+    def test_builtin_backends_registered(self):
+        self.assertIn("caffe", available_detectors())
+        self.assertIn("onnx", available_detectors())
+        self.assertEqual(missing_model_files("test-fake"), [])
+        with self.assertRaises(KeyError):
+            missing_model_files("no-such-backend")
+
+    def test_input_spec_and_decode_without_loading(self):
+        input_size, scalefactor, mean = detector.input_spec("onnx")
+        self.assertEqual(input_size, (300, 300))
+        self.assertAlmostEqual(scalefactor, 1 / 127.5)
+        blob = detector.make_input_blob(np.zeros((480, 640, 3), dtype=np.uint8), input_size, scalefactor, mean)
+        self.assertEqual(blob.shape, (1, 3, 300, 300))
+        boxes = detector.decode_detections(FakeNet().forward(), 640, 480, 0.5)
+        self.assertEqual(boxes, [(160, 120, 320, 360)])
+
+    def test_input_blob_with_buffers_matches_allocating_path(self):
+        input_size, scalefactor, mean = detector.input_spec("caffe")
+        frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+        buffers = detector.InputBuffers(input_size, scalefactor, mean)
+        expected = detector.make_input_blob(frame, input_size, scalefactor, mean)
+        blob = detector.make_input_blob(frame, input_size, scalefactor, mean, buffers)
+        np.testing.assert_allclose(blob, expected, atol=1e-5)
+        if buffers.params is not None:
+            self.assertIs(blob, buffers.blob)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+import numpy as np
+from encoding_cache import CACHE_META_FILE, load_encoding_cache, roster_watermark
+from face_index import KnownFaceIndex
+
+class TestEncodingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "db.sqlite")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.rng = np.random.default_rng(0)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE registered_personnel (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                face_encoding BLOB NOT NULL UNIQUE,
+                image_filename TEXT
+            )
+        """)
+        conn.commit()
+        conn.close()
+        self.insert("Alice", "Bob", "Carol")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def insert(self, *names):
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany(
+                "INSERT INTO registered_personnel (name, face_encoding) VALUES (?, ?)",
+                [(name, self.rng.normal(0, 0.1, 128).tobytes()) for name in names]
+            )
+        conn.close()
+
+    def watermark(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return roster_watermark(conn)
+        finally:
+            conn.close()
+
+    def test_first_load_builds_cache(self):
+        self.assertIsNone(load_encoding_cache(self.watermark(), self.cache_dir))
+        index = KnownFaceIndex.from_cache(self.db_path, self.cache_dir)
+        self.assertEqual(index.names, ["Alice", "Bob", "Carol"])
+        encodings, names, ids = load_encoding_cache(self.watermark(), self.cache_dir)
+        self.assertIsInstance(encodings, np.memmap)
+        self.assertEqual(list(ids), [1, 2, 3])
+
+    def test_cached_index_matches_database(self):
+        KnownFaceIndex.from_cache(self.db_path, self.cache_dir)
+        cached = KnownFaceIndex.from_cache(self.db_path, self.cache_dir)
+        fresh = KnownFaceIndex.from_db(self.db_path)
+        np.testing.assert_array_equal(cached.encodings, fresh.encodings)
+        self.assertEqual(cached.names, fresh.names)
+        self.assertEqual(cached.match(fresh.encodings[1:2])[0][0], "Bob")
+
+    def test_stale_cache_is_rebuilt(self):
+        KnownFaceIndex.from_cache(self.db_path, self.cache_dir)
+        self.insert("Dave")
+        index = KnownFaceIndex.from_cache(self.db_path, self.cache_dir)
+        self.assertEqual(index.names[-1], "Dave")
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute("DELETE FROM registered_personnel WHERE name = 'Alice'")
+        conn.close()
+        index = KnownFaceIndex.from_cache(self.db_path, self.cache_dir)
+        self.assertEqual(index.names, ["Bob", "Carol", "Dave"])
+
+    def test_corrupt_cache_falls_back_to_database(self):
+        KnownFaceIndex.from_cache(self.db_path, self.cache_dir)
+        with open(os.path.join(self.cache_dir, CACHE_META_FILE), "w") as f:
+            f.write("{not json")
+        index = KnownFaceIndex.from_cache(self.db_path, self.cache_dir)
+        self.assertEqual(len(index), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import hashlib
+import os
+import sqlite3
+import tempfile
+import numpy as np
+from enrollment import ensure_enrollment_schema, name_from_filename, run_enrollment
+from face_index import KnownFaceIndex
+
+def fake_encoder(image_path):
+    """Stands in for face encoding: a deterministic encoding derived from the file contents."""
+    with open(image_path, "rb") as f:
+        data = f.read()
+    if data.startswith(b"noface"):
+        return None, "No face found", {"decode": 0.0, "encode": 0.0}
+    if data.startswith(b"copy of "):
+        data = data[len(b"copy of "):]
+    seed = int.from_bytes(hashlib.sha256(data).digest()[:4], "little")
+    encoding = np.random.default_rng(seed).normal(0, 0.1, 128)
+    return encoding.tobytes(), None, {"decode": 0.001, "encode": 0.002}
+
+class TestEnrollment(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, "faces")
+        os.makedirs(self.folder)
+        self.db_path = os.path.join(self.tmp.name, "db.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_image(self, filename, content):
+        with open(os.path.join(self.folder, filename), "wb") as f:
+            f.write(content)
+
+    def rows(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT name, image_filename FROM registered_personnel ORDER BY id").fetchall()
+        finally:
+            conn.close()
+
+    def test_name_from_filename(self):
+        self.assertEqual(name_from_filename("john_doe_2.jpg"), "john")
+        self.assertEqual(name_from_filename("123.png"), "")
+
+    def test_adds_hash_column_to_legacy_table(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE registered_personnel (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                face_encoding BLOB NOT NULL UNIQUE,
+                image_filename TEXT
+            )
+        """)
+        ensure_enrollment_schema(conn)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(registered_personnel)")}
+        conn.close()
+        self.assertIn("image_hash", columns)
+
+    def test_enrolls_once_and_skips_unchanged(self):
+        self.write_image("alice_1.jpg", b"alice one")
+        self.write_image("bob_1.png", b"bob one")
+        self.write_image("carol_1.jpg", b"noface")
+        self.write_image("notes.txt", b"ignored")
+        summary = run_enrollment(self.folder, self.db_path, workers=1, encoder=fake_encoder)
+        self.assertEqual((summary["enrolled"], summary["failed"], summary["skipped"]), (2, 1, 0))
+        self.assertEqual(self.rows(), [("alice", "alice_1.jpg"), ("bob", "bob_1.png")])
+        summary = run_enrollment(self.folder, self.db_path, workers=1, encoder=fake_encoder)
+        self.assertEqual((summary["pending"], summary["enrolled"], summary["skipped"]), (1, 0, 2))
+
+    def test_changed_photo_replaces_row(self):
+        self.write_image("alice_1.jpg", b"alice one")
+        run_enrollment(self.folder, self.db_path, workers=1, encoder=fake_encoder)
+        self.write_image("alice_1.jpg", b"alice new photo")
+        summary = run_enrollment(self.folder, self.db_path, workers=1, encoder=fake_encoder)
+        self.assertEqual(summary["enrolled"], 1)
+        self.assertEqual(self.rows(), [("alice", "alice_1.jpg")])
+
+    def test_duplicate_encoding_is_skipped_when_unchanged(self):
+        self.write_image("alice_1.jpg", b"alice one")
+        self.write_image("alice_2.jpg", b"copy of alice one")
+        summary = run_enrollment(self.folder, self.db_path, workers=1, encoder=fake_encoder)
+        self.assertEqual((summary["pending"], summary["enrolled"]), (2, 1))
+        summary = run_enrollment(self.folder, self.db_path, workers=1, encoder=fake_encoder)
+        self.assertEqual((summary["pending"], summary["skipped"]), (0, 2))
+        self.write_image("alice_1.jpg", b"alice new photo")
+        run_enrollment(self.folder, self.db_path, workers=1, encoder=fake_encoder)
+        summary = run_enrollment(self.folder, self.db_path, workers=1, encoder=fake_encoder)
+        self.assertEqual((summary["pending"], summary["enrolled"]), (1, 1))
+        self.assertEqual(self.rows(), [("alice", "alice_1.jpg"), ("alice", "alice_2.jpg")])
+
+    def test_process_pool_matches_inline(self):
+        for i in range(4):
+            self.write_image(f"person{chr(97 + i)}_1.jpg", f"photo {i}".encode())
+        summary = run_enrollment(self.folder, self.db_path, workers=2, encoder=fake_encoder)
+        self.assertEqual(summary["enrolled"], 4)
+        self.assertEqual([name for name, _ in self.rows()], ["persona", "personb", "personc", "persond"])
+        self.assertEqual(len(KnownFaceIndex.from_db(self.db_path)), 4)
+
+if __name__ == '__main__':
+    unittest.main()
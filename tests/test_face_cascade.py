@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+import numpy as np
+import face_cascade
+from face_cascade import CascadeFaceLocator
+
+class TestCascadeFaceLocator(unittest.TestCase):
+    def setUp(self):
+        self.cascade = CascadeFaceLocator(first_tier="hog", min_cnn_height=160)
+
+    def test_small_region_does_not_escalate(self):
+        locations = self.cascade.locate(np.zeros((100, 60, 3), dtype=np.uint8))
+        self.assertEqual(locations, [])
+        stats = self.cascade.stats()
+        self.assertEqual(stats["hog"]["calls"], 1)
+        self.assertEqual(stats["cnn"]["calls"], 0)
+        self.assertEqual(stats["too_small_for_cnn"], 1)
+
+    def test_large_region_escalates_to_cnn_on_miss(self):
+        locations = self.cascade.locate(np.zeros((200, 100, 3), dtype=np.uint8))
+        self.assertEqual(locations, [])
+        stats = self.cascade.stats()
+        self.assertEqual(stats["hog"]["calls"], 1)
+        self.assertEqual(stats["cnn"]["calls"], 1)
+        self.assertEqual(stats["cnn"]["hit_rate"], 0.0)
+
+    def test_escalates_each_missed_person_in_a_merged_region(self):
+        cnn_shapes = []
+        def face_locations(image, number_of_times_to_upsample=1, model="hog"):
+            if model == "hog":
+                return [(20, 80, 60, 40)]  # Only the left person's face
+            cnn_shapes.append(image.shape[:2])
+            return [(10, 40, 40, 10)]
+        boxes = [(0, 0, 120, 200), (100, 0, 240, 240)]
+        with mock.patch.object(face_cascade, "face_recognition", mock.Mock(face_locations=face_locations)):
+            locations = self.cascade.locate(np.zeros((240, 240, 3), dtype=np.uint8), boxes)
+        self.assertEqual(cnn_shapes, [(240, 140)])  # The right person's crop, not the whole region
+        self.assertEqual(locations, [(20, 80, 60, 40), (10, 140, 40, 110)])
+        stats = self.cascade.stats()
+        self.assertEqual((stats["hog"]["calls"], stats["cnn"]["calls"], stats["cnn"]["hits"]), (1, 1, 1))
+
+    def test_short_person_box_is_not_escalated(self):
+        with mock.patch.object(face_cascade, "face_recognition", mock.Mock(face_locations=mock.Mock(return_value=[]))):
+            self.cascade.locate(np.zeros((240, 240, 3), dtype=np.uint8), [(0, 0, 100, 100), (100, 0, 240, 240)])
+        stats = self.cascade.stats()
+        self.assertEqual((stats["cnn"]["calls"], stats["too_small_for_cnn"]), (1, 1))
+
+    def test_missing_dnn_model_falls_back_to_hog(self):
+        cascade = CascadeFaceLocator(first_tier="opencv_dnn")
+        self.assertEqual(cascade.first_tier, "hog")
+        self.assertIsNone(cascade.face_net)
+
+if __name__ == '__main__':
+    unittest.main()
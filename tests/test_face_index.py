@@ -0,0 +1,59 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+import numpy as np
+from face_index import KnownFaceIndex
+
+class TestKnownFaceIndex(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.encodings = rng.normal(0, 0.1, size=(5, 128))
+        self.names = ["Alice", "Bob", "Carol", "Dave", "Eve"]
+        self.index = KnownFaceIndex(self.encodings, self.names)
+
+    def test_matrix_is_contiguous_float32(self):
+        self.assertEqual(self.index.encodings.dtype, np.float32)
+        self.assertTrue(self.index.encodings.flags["C_CONTIGUOUS"])
+        self.assertEqual(self.index.encodings.shape, (5, 128))
+
+    def test_distances_match_numpy(self):
+        queries = self.encodings[:2] + 0.01
+        expected = np.linalg.norm(queries[:, None, :] - self.encodings[None, :, :], axis=2)
+        np.testing.assert_allclose(self.index.distances(queries), expected, atol=1e-4)
+
+    def test_returns_closest_not_first_match(self):
+        # Both rows are within tolerance of the query; the second one is closer
+        base = np.zeros(128)
+        index = KnownFaceIndex([base + 0.03, base + 0.01], ["Far", "Near"])
+        (name, distance), = index.match([base])
+        self.assertEqual(name, "Near")
+        self.assertAlmostEqual(distance, 0.01 * np.sqrt(128), places=4)
+
+    def test_unknown_beyond_tolerance(self):
+        results = self.index.match([self.encodings[1], self.encodings[1] + 1.0])
+        self.assertEqual(results[0][0], "Bob")
+        self.assertEqual(results[1][0], "Unknown")
+
+    def test_empty_roster(self):
+        results = KnownFaceIndex().match([np.zeros(128)])
+        self.assertEqual(results, [("Unknown", float("inf"))])
+        self.assertEqual(self.index.match([]), [])
+
+    def test_from_db(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "faces.sqlite")
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE registered_personnel (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, face_encoding BLOB NOT NULL UNIQUE, image_filename TEXT)")
+            for name, encoding in zip(self.names, self.encodings):
+                conn.execute("INSERT INTO registered_personnel (name, face_encoding) VALUES (?, ?)", (name, encoding.tobytes()))
+            conn.execute("INSERT INTO registered_personnel (name, face_encoding) VALUES (?, ?)", ("Broken", b"\x00" * 16))
+            conn.commit()
+            conn.close()
+            index = KnownFaceIndex.from_db(db_path)
+        self.assertEqual(index.names, self.names)
+        self.assertEqual(list(index.ids), [1, 2, 3, 4, 5])
+        self.assertEqual(index.match([self.encodings[3]])[0][0], "Dave")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+import os
+import signal
+import numpy as np
+import vision_processing
+from face_workers import FaceWorkerPool, default_face_workers
+from config import DNN_NUM_THREADS
+
+def gradient_image(h=240, w=320):
+    row = np.linspace(0, 255, w, dtype=np.uint8)
+    image = np.repeat(row[None, :, None], h, axis=0).repeat(3, axis=2)
+    image[:, :, 0] = 255 - image[:, :, 0]
+    return np.ascontiguousarray(image)
+
+class TestFaceWorkerPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = FaceWorkerPool(workers=2, model="hog", slot_shape=(240, 320, 3), slots_per_worker=1).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.stop()
+
+    def test_every_worker_is_up_after_start(self):
+        processes = self.pool._pool._processes
+        self.assertEqual(len(processes), 2)
+        self.assertTrue(all(process.is_alive() for process in processes.values()))
+
+    def test_matches_in_process_encoding(self):
+        image = gradient_image()
+        boxes = [(0, 0, 120, 200), (100, 20, 220, 240), (260, 0, 320, 240)]
+        expected = vision_processing.encode_faces_in_regions(image, boxes, model="hog")
+        locations, encodings, assignment = self.pool.encode_faces_in_regions(image, boxes)
+        self.assertEqual(locations, expected[0])
+        self.assertEqual(len(encodings), len(expected[1]))
+        self.assertEqual(assignment, expected[2])
+
+    def test_slots_are_returned_and_reused(self):
+        image = gradient_image()
+        regions = [(0, 0, 64, 64), (64, 0, 128, 64), (128, 0, 192, 64), (192, 0, 256, 64), (256, 0, 320, 64)]
+        results = self.pool.encode_regions(image, regions)  # More regions than the pool's 2 slots
+        self.assertEqual(len(results), len(regions))
+        self.assertEqual(self.pool._free.qsize(), self.pool.slots)
+
+    def test_oversized_and_empty_regions(self):
+        image = gradient_image(480, 640)
+        inline = self.pool.inline
+        results = self.pool.encode_regions(image, [(0, 0, 640, 480), (10, 10, 10, 50)])
+        self.assertEqual(results, [([], []), ([], [])])
+        self.assertEqual(self.pool.inline, inline + 1)
+
+class TestDefaultFaceWorkers(unittest.TestCase):
+    def test_leaves_cores_to_the_person_detector(self):
+        with mock.patch("os.cpu_count", return_value=4):
+            self.assertEqual(default_face_workers(), max(1, 4 - DNN_NUM_THREADS))
+        with mock.patch("os.cpu_count", return_value=1):
+            self.assertEqual(default_face_workers(), 1)
+
+class TestBrokenFaceWorkerPool(unittest.TestCase):
+    def test_falls_back_in_process_when_a_worker_dies(self):
+        pool = FaceWorkerPool(workers=2, model="hog", slot_shape=(240, 320, 3)).start()
+        try:
+            os.kill(next(iter(pool._pool._processes)), signal.SIGKILL)
+            results = pool.encode_regions(gradient_image(), [(0, 0, 160, 240), (160, 0, 320, 240)])
+            self.assertEqual(len(results), 2)
+            self.assertTrue(pool.broken)
+            self.assertGreaterEqual(pool.inline, 1)
+        finally:
+            pool.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+import main
+from scheduler import CadenceScheduler, DETECT
+from motion_controller import MotionController, SimulatedMotorBackend
+
+class FakeGate:
+    def __init__(self, detect):
+        self.detect = detect
+
+    def set_ego_motion(self, moving):
+        pass
+
+    def should_detect(self, frame):
+        return self.detect
+
+class FakeDetector:
+    def detect(self, frame):
+        return [(0, 0, 10, 10)]
+
+class TestSelectPersonBoxes(unittest.TestCase):
+    def setUp(self):
+        self.saved = main.SCHEDULER, main.MOTION_GATE, main.person_detector, main.MOTION_GATE_ENABLED
+        main.SCHEDULER = CadenceScheduler()
+        main.person_detector = FakeDetector()
+        main.MOTION_GATE_ENABLED = True
+        self.frame = np.zeros((24, 32, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        main.SCHEDULER, main.MOTION_GATE, main.person_detector, main.MOTION_GATE_ENABLED = self.saved
+
+    def test_gated_skips_do_not_feed_detect_latency(self):
+        main.MOTION_GATE = FakeGate(detect=True)
+        main.SCHEDULER.latency["detect"] = 0.05
+        main.select_person_boxes(self.frame, DETECT)
+        detect_latency = main.SCHEDULER.latency["detect"]
+        gated = main.GATED_DETECTIONS.value
+        main.MOTION_GATE = FakeGate(detect=False)
+        for _ in range(5):
+            self.assertEqual(main.select_person_boxes(self.frame, DETECT), [(0, 0, 10, 10)])
+        self.assertEqual(main.SCHEDULER.latency["detect"], detect_latency)
+        self.assertEqual(main.GATED_DETECTIONS.value, gated + 5)
+
+class TestRecognizeFaces(unittest.TestCase):
+    def setUp(self):
+        self.saved = main.SCHEDULER, main.PERSON_TRACKER, main.MOTION_GATE, main.UNKNOWN_CLUSTERS
+        main.SCHEDULER = CadenceScheduler()
+        main.create_vision_state()
+
+    def tearDown(self):
+        main.SCHEDULER, main.PERSON_TRACKER, main.MOTION_GATE, main.UNKNOWN_CLUSTERS = self.saved
+
+    def test_frames_without_pending_tracks_do_not_feed_verify_latency(self):
+        main.SCHEDULER.latency["verify"] = 0.2
+        for _ in range(5):
+            main.recognize_faces(np.zeros((24, 32, 3), dtype=np.uint8), [], allow_verification=True)
+        self.assertEqual(main.SCHEDULER.latency["verify"], 0.2)
+
+class TestCleanup(unittest.TestCase):
+    def test_cleanup_stops_motion_thread_in_simulation(self):
+        saved = main.MOTION
+        main.MOTION = MotionController(backend=SimulatedMotorBackend())
+        try:
+            main.MOTION.drive(0.5, 0.5)
+            thread = main.MOTION._thread
+            main.cleanup_gpio()
+            self.assertFalse(thread.is_alive())
+            self.assertFalse(main.MOTION.moving)
+        finally:
+            main.MOTION = saved
+
+if __name__ == '__main__':
+    unittest.main()
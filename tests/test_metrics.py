@@ -0,0 +1,68 @@
+import unittest
+import json
+import os
+import tempfile
+import urllib.request
+from metrics import Histogram, MetricsRegistry, MetricsServer, MetricsSummaryWriter
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_and_quantiles(self):
+        histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+        for value in [0.005] * 50 + [0.05] * 45 + [0.5] * 5:
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [50, 45, 5, 0])
+        self.assertEqual(histogram.count, 100)
+        self.assertLessEqual(histogram.quantile(0.5), 0.01)
+        self.assertTrue(0.01 < histogram.quantile(0.95) <= 0.1)
+        self.assertEqual(histogram.quantile(1.0), 0.5)
+        self.assertEqual(Histogram().quantile(0.5), 0.0)
+
+    def test_series_are_shared_by_name_and_labels(self):
+        registry = MetricsRegistry()
+        capture = registry.histogram("rover_stage_seconds", "Stage latency", stage="capture")
+        self.assertIs(registry.histogram("rover_stage_seconds", stage="capture"), capture)
+        self.assertIsNot(registry.histogram("rover_stage_seconds", stage="detect"), capture)
+        registry.inc("rover_alerts_total", result="sent")
+        registry.inc("rover_alerts_total", 2, result="sent")
+        self.assertEqual(registry.counter("rover_alerts_total", result="sent").value, 3)
+
+    def test_prometheus_text_format(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("rover_stage_seconds", "Stage latency", buckets=(0.01, 0.1), stage="capture")
+        histogram.observe(0.005)
+        histogram.observe(0.05)
+        histogram.observe(5.0)
+        registry.inc("rover_alerts_total", result="failed")
+        text = registry.render_prometheus()
+        self.assertIn("# TYPE rover_stage_seconds histogram", text)
+        self.assertIn('rover_stage_seconds_bucket{stage="capture",le="0.01"} 1', text)
+        self.assertIn('rover_stage_seconds_bucket{stage="capture",le="0.1"} 2', text)
+        self.assertIn('rover_stage_seconds_bucket{stage="capture",le="+Inf"} 3', text)
+        self.assertIn('rover_stage_seconds_count{stage="capture"} 3', text)
+        self.assertIn('rover_alerts_total{result="failed"} 1', text)
+
+    def test_endpoint_serves_metrics(self):
+        registry = MetricsRegistry()
+        registry.inc("rover_frames_total")
+        server = MetricsServer(registry, port=0)
+        server.start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=2) as response:
+                body = response.read().decode()
+        finally:
+            server.stop()
+        self.assertIn("rover_frames_total 1", body)
+
+    def test_summary_is_appended_to_log(self):
+        registry = MetricsRegistry()
+        registry.observe("rover_loop_seconds", 0.02)
+        with tempfile.TemporaryDirectory() as log_dir:
+            writer = MetricsSummaryWriter(registry, log_dir=log_dir, interval_s=60)
+            writer.start()
+            writer.stop()
+            with open(os.path.join(log_dir, "metrics.jsonl")) as f:
+                summary = json.loads(f.readlines()[-1])
+        self.assertEqual(summary["histograms"]["rover_loop_seconds"]["count"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
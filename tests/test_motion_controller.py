@@ -0,0 +1,95 @@
+import asyncio
+import time
+import unittest
+from motion_controller import MotionController, SimulatedMotorBackend
+
+def run(coro):
+    return asyncio.run(coro)
+
+class TestMotionController(unittest.TestCase):
+    def setUp(self):
+        self.backend = SimulatedMotorBackend()
+        self.motion = MotionController(backend=self.backend, ramp_step_s=0.01)
+
+    def tearDown(self):
+        self.motion.close()
+
+    def speeds(self):
+        return [(left, right) for _, left, right in self.backend.timeline]
+
+    def test_timed_command_stops_after_duration(self):
+        async def scenario():
+            handle = self.motion.drive(0.5, -0.5, 0.05)
+            self.assertTrue(self.motion.busy())
+            return await handle
+        self.assertTrue(run(scenario()))
+        self.assertEqual(self.speeds(), [(0.5, -0.5), (0.0, 0.0)])
+        start, end = self.backend.timeline[0][0], self.backend.timeline[-1][0]
+        self.assertGreaterEqual(end - start, 0.04)
+        self.assertFalse(self.motion.moving)
+
+    def test_command_does_not_block_event_loop(self):
+        ticks = []
+        async def ticker():
+            for _ in range(5):
+                ticks.append(self.motion.busy())
+                await asyncio.sleep(0.01)
+        async def scenario():
+            handle = self.motion.drive(0.5, 0.5, 0.1)
+            await ticker()
+            await handle
+        run(scenario())
+        self.assertEqual(ticks, [True] * 5)
+
+    def test_turn_ends_on_time_while_event_loop_is_blocked(self):
+        async def scenario():
+            handle = self.motion.drive(0.5, -0.5, 0.1)
+            time.sleep(0.4)  # A slow frame processed synchronously on the loop
+            return await handle
+        self.assertTrue(run(scenario()))
+        start, end = self.backend.timeline[0][0], self.backend.timeline[-1][0]
+        self.assertEqual(self.speeds(), [(0.5, -0.5), (0.0, 0.0)])
+        self.assertLess(end - start, 0.2)
+
+    def test_commands_work_without_an_event_loop(self):
+        self.assertTrue(self.motion.drive(0.5, 0.5, 0.02).result(1.0))
+        self.assertFalse(self.motion.moving)
+
+    def test_ramp_reaches_target_gradually(self):
+        async def scenario():
+            await self.motion.drive(1.0, 1.0, ramp_s=0.05)
+        run(scenario())
+        lefts = [left for left, _ in self.speeds()]
+        self.assertGreater(len(lefts), 2)
+        self.assertEqual(lefts, sorted(lefts))
+        self.assertEqual(lefts[-1], 1.0)
+        self.assertEqual(self.motion.target, (1.0, 1.0))
+
+    def test_sequence_runs_steps_in_order(self):
+        async def scenario():
+            return await self.motion.sequence([(-0.5, -0.5, 0.02), (0.0, 0.0, 0.0), (0.5, -0.5, 0.02)])
+        self.assertTrue(run(scenario()))
+        self.assertEqual(self.speeds(), [(-0.5, -0.5), (0.0, 0.0), (0.5, -0.5), (0.0, 0.0)])
+
+    def test_stop_preempts_running_command(self):
+        async def scenario():
+            handle = self.motion.drive(0.5, 0.5, 10.0)
+            await asyncio.sleep(0.01)
+            self.motion.stop()
+            return await handle
+        self.assertFalse(run(scenario()))
+        self.assertEqual(self.speeds(), [(0.5, 0.5), (0.0, 0.0)])
+        self.assertEqual(self.motion.stats()["preemptions"], 1)
+
+    def test_repeated_hold_reuses_command(self):
+        async def scenario():
+            first = self.motion.drive(0.5, 0.5)
+            second = self.motion.drive(0.5, 0.5)
+            await first
+            return first is second
+        self.assertTrue(run(scenario()))
+        self.assertEqual(self.motion.stats()["commands"], 1)
+        self.assertFalse(self.motion.busy())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from motion_gate import MotionGate
+
+def scene(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(60, 200, size=(480, 640, 3), dtype=np.uint8)
+
+class TestMotionGate(unittest.TestCase):
+    def setUp(self):
+        self.gate = MotionGate(max_skip_frames=10)
+        self.background = scene()
+
+    def test_static_scene_skips_detection(self):
+        self.assertTrue(self.gate.should_detect(self.background))
+        for _ in range(5):
+            self.assertFalse(self.gate.should_detect(self.background.copy()))
+        self.assertEqual(self.gate.stats()["skipped"], 5)
+
+    def test_person_entering_triggers_detection(self):
+        self.gate.should_detect(self.background)
+        self.gate.should_detect(self.background)
+        frame = self.background.copy()
+        frame[150:450, 300:400] = 20
+        self.assertTrue(self.gate.should_detect(frame))
+
+    def test_forced_refresh(self):
+        self.gate.should_detect(self.background)
+        results = [self.gate.should_detect(self.background) for _ in range(11)]
+        self.assertFalse(any(results[:10]))
+        self.assertTrue(results[10])
+
+    def test_ego_motion_always_detects_and_reseeds(self):
+        self.gate.should_detect(self.background)
+        self.gate.set_ego_motion(True)
+        moved = scene(seed=1)
+        self.assertTrue(self.gate.should_detect(moved))
+        self.assertTrue(self.gate.should_detect(moved))
+        self.gate.set_ego_motion(False)
+        # First stationary frame seeds the new background, then the gate closes again
+        self.assertTrue(self.gate.should_detect(moved))
+        self.assertFalse(self.gate.should_detect(moved))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from occupancy_grid import OccupancyGrid
+
+def ring_scan(radius, points=720, obstacle_range=None, obstacle_width_rad=0.1):
+    """Synthetic 2D scan of a circular room, optionally with an obstacle straight ahead."""
+    angles = np.linspace(-np.pi, np.pi, points, endpoint=False)
+    ranges = np.full_like(angles, radius)
+    if obstacle_range is not None:
+        ranges[np.abs(angles) < obstacle_width_rad] = obstacle_range
+    return np.column_stack((ranges * np.cos(angles), ranges * np.sin(angles)))
+
+class TestOccupancyGrid(unittest.TestCase):
+    def test_empty_grid_is_clear(self):
+        grid = OccupancyGrid()
+        self.assertTrue(grid.corridor_clear(2.0, 0.3))
+        self.assertTrue(np.all(np.isinf(grid.sector_clearance(12))))
+
+    def test_obstacle_ahead_blocks_corridor(self):
+        grid = OccupancyGrid()
+        grid.integrate(ring_scan(3.0, obstacle_range=1.0))
+        self.assertTrue(grid.corridor_clear(0.8, 0.3))
+        self.assertFalse(grid.corridor_clear(1.2, 0.3))
+
+    def test_free_space_sector_avoids_obstacle(self):
+        grid = OccupancyGrid()
+        grid.integrate(ring_scan(3.0, obstacle_range=0.5, obstacle_width_rad=0.3))
+        clearance = grid.sector_clearance(12)
+        self.assertLess(clearance[0], 0.6)
+        heading, distance = grid.free_space_sector(12)
+        self.assertNotEqual(heading, 0.0)
+        self.assertGreater(distance, 2.5)
+
+    def test_obstacle_fades_once_free(self):
+        grid = OccupancyGrid()
+        grid.integrate(ring_scan(3.0, obstacle_range=1.0))
+        for _ in range(10):
+            grid.integrate(ring_scan(3.0))
+        self.assertTrue(grid.corridor_clear(2.0, 0.3))
+
+    def test_ignores_invalid_points(self):
+        grid = OccupancyGrid()
+        grid.integrate(np.array([[np.nan, 0.0, 0.0], [0.01, 0.0, 0.0], [50.0, 0.0, 0.0]]))
+        grid.integrate([])
+        self.assertEqual(grid.scans, 2)
+        self.assertFalse(grid.occupied().any())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import time
+from pipeline import DropOldestQueue, FramePacket, FrameStats, RoverPipeline, max_frames_in_flight
+from config import FRAME_BUFFER_POOL_SIZE, PIPELINE_QUEUE_SIZE
+
+class TestDropOldestQueue(unittest.TestCase):
+    def test_drops_oldest_when_full(self):
+        q = DropOldestQueue(maxsize=2)
+        for i in range(5):
+            q.put(i)
+        self.assertEqual(q.dropped, 3)
+        self.assertEqual(q.get_nowait(), 3)
+        self.assertEqual(q.get_nowait(), 4)
+        self.assertIsNone(q.get_nowait())
+
+    def test_get_times_out(self):
+        q = DropOldestQueue()
+        self.assertIsNone(q.get(timeout=0.01))
+
+class TestFrameStats(unittest.TestCase):
+    def test_summary(self):
+        stats = FrameStats()
+        for i in range(10):
+            stats.record(capture_time=i * 0.1, now=i * 0.1 + 0.05)
+        summary = stats.summary()
+        self.assertEqual(summary["frames"], 10)
+        self.assertAlmostEqual(summary["latency_p50_ms"], 50.0, places=3)
+        self.assertGreater(summary["fps"], 0)
+
+class TestRoverPipeline(unittest.TestCase):
+    def test_frames_flow_through_all_stages(self):
+        counter = iter(range(1000000))
+
+        def capture():
+            time.sleep(0.001)
+            return FramePacket(next(counter), None)
+
+        def detect(packet):
+            packet.person_boxes = [(0, 0, 1, 1)]
+            return packet
+
+        def recognize(packet):
+            time.sleep(0.01)
+            packet.unknown_detected = True
+            return packet
+
+        pipeline = RoverPipeline(capture, detect, recognize)
+        pipeline.start()
+        try:
+            packet = pipeline.get_result(timeout=2.0)
+        finally:
+            pipeline.stop()
+        self.assertIsNotNone(packet)
+        self.assertTrue(packet.unknown_detected)
+        self.assertEqual(packet.person_boxes, [(0, 0, 1, 1)])
+        # Capture is faster than recognition, so stale frames must have been dropped
+        self.assertGreater(sum(pipeline.dropped_frames().values()), 0)
+        self.assertEqual(pipeline.stats.frames, 1)
+
+class TestFrameBufferSizing(unittest.TestCase):
+    def test_frame_pool_exceeds_frames_in_flight(self):
+        self.assertEqual(max_frames_in_flight(1), 7)
+        self.assertEqual(max_frames_in_flight(2), 10)
+        self.assertGreater(FRAME_BUFFER_POOL_SIZE, max_frames_in_flight(PIPELINE_QUEUE_SIZE))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import time
+import unittest
+from ranging import UltrasonicRanger, simulated_distance
+
+class TestUltrasonicRanger(unittest.TestCase):
+    def test_simulated_signal_is_deterministic(self):
+        self.assertEqual(simulated_distance(25), simulated_distance(125))
+        self.assertAlmostEqual(simulated_distance(25), 100.0)
+
+    def test_reading_available_after_start(self):
+        ranger = UltrasonicRanger(simulated=True, signal=lambda i: 42.0)
+        ranger.start()
+        try:
+            reading = ranger.latest()
+            self.assertEqual(reading.distance_cm, 42.0)
+            self.assertGreater(reading.timestamp, 0)
+        finally:
+            ranger.stop()
+        self.assertFalse(ranger.is_running())
+
+    def test_median_filter_rejects_spikes(self):
+        values = [50.0, 50.0, 5.0, 50.0, 50.0, 5.0, 50.0]
+        ranger = UltrasonicRanger(simulated=True, window=5, signal=lambda i: values[i])
+        for _ in values:
+            ranger._sample()
+        self.assertEqual(ranger.latest().distance_cm, 50.0)
+
+    def test_out_of_range_counts_as_timeout(self):
+        values = [40.0, 1000.0, -1.0]
+        ranger = UltrasonicRanger(simulated=True, signal=lambda i: values[i])
+        for _ in values:
+            ranger._sample()
+        self.assertEqual(ranger.timeouts, 2)
+        self.assertEqual(ranger.latest().distance_cm, 40.0)
+
+    def test_stale_reading_is_infinite(self):
+        ranger = UltrasonicRanger(simulated=True)
+        ranger._sample()
+        self.assertLess(ranger.distance_cm(), float('inf'))
+        time.sleep(0.02)
+        self.assertEqual(ranger.distance_cm(max_age_s=0.01), float('inf'))
+
+    def test_background_sampling(self):
+        ranger = UltrasonicRanger(sample_rate_hz=200, simulated=True)
+        ranger.start()
+        time.sleep(0.1)
+        ranger.stop()
+        self.assertGreater(ranger.stats()["samples"], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from face_index import KnownFaceIndex
+from roster_watcher import RosterWatcher
+
+class TestRosterWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "db.sqlite")
+        self.rng = np.random.default_rng(0)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE registered_personnel (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                face_encoding BLOB NOT NULL UNIQUE,
+                image_filename TEXT
+            )
+        """)
+        conn.commit()
+        conn.close()
+        self.encodings = {}
+        self.insert("Alice", "Bob")
+        self.swapped = []
+        self.watcher = RosterWatcher(KnownFaceIndex.from_db(self.db_path), self.swapped.append, self.db_path, poll_interval_s=0.01)
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.watcher._close()
+        self.tmp.cleanup()
+
+    def insert(self, *names):
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            for name in names:
+                self.encodings[name] = self.rng.normal(0, 0.1, 128)
+                conn.execute("INSERT INTO registered_personnel (name, face_encoding) VALUES (?, ?)",
+                             (name, self.encodings[name].tobytes()))
+        conn.close()
+
+    def delete(self, name):
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute("DELETE FROM registered_personnel WHERE name = ?", (name,))
+        conn.close()
+
+    def test_no_change_keeps_index(self):
+        self.assertFalse(self.watcher.check_once())
+        self.assertFalse(self.watcher.check_once())
+        self.assertEqual(self.swapped, [])
+
+    def test_applies_additions_and_removals(self):
+        self.watcher.check_once()
+        old_index = self.watcher.index
+        self.insert("Carol")
+        self.delete("Alice")
+        self.assertTrue(self.watcher.check_once())
+        index = self.swapped[-1]
+        self.assertEqual(index.names, ["Bob", "Carol"])
+        self.assertEqual(index.match([self.encodings["Carol"]])[0][0], "Carol")
+        self.assertEqual(index.match([self.encodings["Alice"]])[0][0], "Unknown")
+        # The previous index is left intact for frames still using it
+        self.assertEqual(old_index.names, ["Alice", "Bob"])
+        self.assertEqual(self.watcher.stats()["added"], 1)
+        self.assertEqual(self.watcher.stats()["removed"], 1)
+
+    def test_matches_full_reload(self):
+        self.insert("Carol", "Dave")
+        self.delete("Bob")
+        self.watcher.check_once()
+        fresh = KnownFaceIndex.from_db(self.db_path)
+        np.testing.assert_allclose(self.watcher.index.distances(fresh.encodings), fresh.distances(fresh.encodings), atol=1e-5)
+        self.assertEqual(list(self.watcher.index.ids), list(fresh.ids))
+
+    def test_background_thread_picks_up_changes(self):
+        self.watcher.start()
+        self.insert("Erin")
+        deadline = time.monotonic() + 2.0
+        while not self.swapped and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.swapped)
+        self.assertIn("Erin", self.swapped[-1].names)
+
+if __name__ == '__main__':
+    unittest.main()
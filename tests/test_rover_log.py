@@ -0,0 +1,61 @@
+import unittest
+import io
+import logging
+import os
+import tempfile
+from rover_log import RoverLogging, RepeatFilter, NonBlockingQueueHandler, get_logger
+
+def make_record(msg, created, args=()):
+    record = logging.LogRecord("rover.test", logging.INFO, "", 0, msg, args, None)
+    record.created = created
+    return record
+
+class TestRoverLog(unittest.TestCase):
+    def test_repeats_are_collapsed_within_window(self):
+        repeat_filter = RepeatFilter(window_s=5.0)
+        self.assertTrue(repeat_filter.filter(make_record("Moving forward", 100.0)))
+        self.assertFalse(repeat_filter.filter(make_record("Moving forward", 101.0)))
+        self.assertFalse(repeat_filter.filter(make_record("Moving forward", 102.0)))
+        self.assertTrue(repeat_filter.filter(make_record("Stopping motors", 102.5)))
+        record = make_record("Moving forward", 106.0)
+        self.assertTrue(repeat_filter.filter(record))
+        self.assertEqual(record.getMessage(), "Moving forward (repeated 2 more times)")
+        self.assertEqual(repeat_filter.suppressed_total, 2)
+
+    def test_template_key_ignores_arguments(self):
+        repeat_filter = RepeatFilter(window_s=5.0)
+        self.assertTrue(repeat_filter.filter(make_record("Obstacle DETECTED at %.1f cm", 0.0, (25.0,))))
+        self.assertFalse(repeat_filter.filter(make_record("Obstacle DETECTED at %.1f cm", 1.0, (20.0,))))
+        self.assertEqual(repeat_filter.pending(), [("rover.test", logging.INFO, "Obstacle DETECTED at %.1f cm", (20.0,), 1)])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        import queue
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(make_record("first", 0.0))
+        handler.handle(make_record("second", 0.0))
+        self.assertEqual(handler.dropped, 1)
+
+    def test_records_reach_console_and_rotating_file(self):
+        stream = io.StringIO()
+        with tempfile.TemporaryDirectory() as log_dir:
+            rover_logging = RoverLogging(log_dir=log_dir, max_bytes=400, backup_count=2, stream=stream,
+                                         console_level="WARNING", file_level="DEBUG")
+            rover_logging.start()
+            log = get_logger("test")
+            log.debug("Setting motor speeds: left=%s", 0.5)
+            log.warning("Obstacle DETECTED at %.1f cm", 25.0)
+            for i in range(20):
+                log.info("Enrolled person" + str(i))
+                log.info("Moving forward")
+            rover_logging.stop()
+            files = sorted(os.listdir(log_dir))
+            with open(os.path.join(log_dir, "rover.log")) as f:
+                current = f.read()
+        self.assertEqual(files, ["rover.log", "rover.log.1", "rover.log.2"])
+        self.assertIn("WARNING: Obstacle DETECTED at 25.0 cm", stream.getvalue())
+        self.assertNotIn("Setting motor speeds", stream.getvalue())
+        self.assertIn("Moving forward (repeated 19 more times)", current)
+        self.assertEqual(rover_logging.stats()["suppressed"], 19)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from scheduler import CadenceScheduler, DETECT, VERIFY, TRACK
+
+def run_frames(scheduler, n):
+    return [scheduler.next_action() for _ in range(n)]
+
+class TestCadenceScheduler(unittest.TestCase):
+    def test_full_work_when_within_budget(self):
+        scheduler = CadenceScheduler(frame_budget_s=0.1)
+        scheduler.record("capture", 0.005)
+        scheduler.record("detect", 0.03)
+        scheduler.record("verify", 0.03)
+        self.assertEqual(run_frames(scheduler, 5), [DETECT] * 5)
+        self.assertEqual(scheduler.stats()["detect_every"], 1)
+
+    def test_backs_off_when_over_budget(self):
+        scheduler = CadenceScheduler(frame_budget_s=0.1)
+        scheduler.record("capture", 0.01)
+        scheduler.record("detect", 0.2)
+        scheduler.record("verify", 0.05)
+        actions = run_frames(scheduler, 12)
+        stats = scheduler.stats()
+        self.assertGreater(stats["detect_every"], 1)
+        self.assertLessEqual(stats["estimated_frame_ms"], 100.0)
+        self.assertEqual(actions[0], DETECT)
+        self.assertEqual(actions.count(DETECT), len(range(0, 12, stats["detect_every"])))
+
+    def test_track_only_when_verification_too_expensive(self):
+        scheduler = CadenceScheduler(frame_budget_s=0.1, max_detect_every=10)
+        scheduler.record("detect", 0.3)
+        scheduler.record("verify", 0.3)
+        actions = run_frames(scheduler, 10)
+        self.assertIn(TRACK, actions)
+        self.assertLessEqual(scheduler.stats()["estimated_frame_ms"], 100.0)
+
+    def test_verify_between_detections(self):
+        scheduler = CadenceScheduler(frame_budget_s=0.1, max_detect_every=4)
+        scheduler.record("detect", 0.35)
+        scheduler.record("verify", 0.01)
+        actions = run_frames(scheduler, 4)
+        self.assertEqual(actions, [DETECT, VERIFY, VERIFY, VERIFY])
+
+    def test_pipelined_only_slowest_stage_counts(self):
+        serial = CadenceScheduler(frame_budget_s=0.1)
+        pipelined = CadenceScheduler(frame_budget_s=0.1, pipelined=True)
+        for scheduler in (serial, pipelined):
+            scheduler.record("capture", 0.03)
+            scheduler.record("detect", 0.08)
+            scheduler.record("verify", 0.05)
+            scheduler.next_action()
+        self.assertGreater(serial.stats()["detect_every"], 1)
+        self.assertEqual(pipelined.stats()["detect_every"], 1)
+
+    def test_recovers_when_load_drops(self):
+        scheduler = CadenceScheduler(frame_budget_s=0.1, alpha=1.0)
+        scheduler.record("detect", 0.5)
+        scheduler.next_action()
+        self.assertGreater(scheduler.stats()["detect_every"], 1)
+        scheduler.record("detect", 0.02)
+        scheduler.next_action()
+        self.assertEqual(scheduler.stats()["detect_every"], 1)
+
+    def test_remaining_budget(self):
+        scheduler = CadenceScheduler(frame_budget_s=0.1)
+        self.assertAlmostEqual(scheduler.remaining(0.04), 0.06)
+        self.assertEqual(scheduler.remaining(0.2), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import time
+import unittest
+from unittest import mock
+import sensor_fusion
+from ranging import Reading
+
+class TestSensorFusion(unittest.TestCase):
+    def test_ultrasonic_distance_and_timestamp_come_from_one_sample(self):
+        fusion = sensor_fusion.SensorFusion()
+        fresh = Reading(42.0, time.monotonic())
+        with mock.patch.object(sensor_fusion, "get_distance_reading", return_value=fresh) as read:
+            fusion.update_ultrasonic_data()
+        read.assert_called_once()
+        self.assertEqual((fusion.ultrasonic_distance, fusion.ultrasonic_timestamp), (42.0, fresh.timestamp))
+
+    def test_stale_sample_reads_as_inf_with_its_own_timestamp(self):
+        fusion = sensor_fusion.SensorFusion()
+        stale = Reading(42.0, time.monotonic() - 10.0)
+        with mock.patch.object(sensor_fusion, "get_distance_reading", return_value=stale):
+            fusion.update_ultrasonic_data()
+        self.assertEqual(fusion.ultrasonic_distance, float('inf'))
+        self.assertEqual(fusion.ultrasonic_timestamp, stale.timestamp)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+import os
+import struct
+import tempfile
+import time
+import numpy as np
+from sources import CameraSource, FrameBufferPool, Recorder, ReplaySource, read_recording, RECORD_FRAME, RECORD_ULTRASONIC, RECORD_LIDAR
+
+class FakeRequest:
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.released = False
+
+    def make_array(self, stream):
+        return self.arrays[stream].copy()
+
+    def release(self):
+        self.released = True
+
+class FakeDualStreamCamera:
+    def __init__(self):
+        self.requests = []
+
+    def capture_request(self):
+        yuv = np.zeros((240 * 3 // 2, 320), dtype=np.uint8)
+        yuv[:240] = 200  # Bright luma, neutral chroma below
+        yuv[240:] = 128
+        request = FakeRequest({"lores": yuv, "main": np.full((960, 1280, 3), 7, dtype=np.uint8)})
+        self.requests.append(request)
+        return request
+
+class TestSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.rec")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def record(self, frames=3, period_s=0.05):
+        recorder = Recorder(self.path)
+        recorder.start()
+        for i in range(frames):
+            recorder.record_distance(100.0 - i * 10, i * period_s)
+            if i == 1:
+                recorder.record_lidar([[0.5, 0.0], [0.0, 1.0]], i * period_s)
+            frame = np.full((48, 64, 3), 40 * i, dtype=np.uint8)
+            recorder.record_frame(frame, i * period_s + 0.001)
+        recorder.stop()
+        return recorder
+
+    def test_recording_round_trip(self):
+        recorder = self.record()
+        self.assertEqual(recorder.stats()["written"], 7)
+        self.assertEqual(recorder.stats()["bytes"], os.path.getsize(self.path) - 7)
+        kinds = [kind for kind, _, _ in read_recording(self.path)]
+        self.assertEqual(kinds.count(RECORD_FRAME), 3)
+        self.assertEqual(kinds.count(RECORD_ULTRASONIC), 3)
+        self.assertEqual(kinds.count(RECORD_LIDAR), 1)
+
+    def test_replay_applies_sensor_readings_before_each_frame(self):
+        self.record()
+        source = ReplaySource(self.path, realtime=False)
+        distances = []
+        while True:
+            result = source.read()
+            if result is None:
+                break
+            self.assertEqual(result.frame.shape, (48, 64, 3))
+            self.assertIsNone(result.hires)
+            distances.append(source.distance_cm())
+        self.assertEqual(distances, [100.0, 90.0, 80.0])
+        self.assertTrue(source.finished())
+        np.testing.assert_array_equal(source.lidar_scan, [[0.5, 0.0], [0.0, 1.0]])
+
+    def test_realtime_replay_keeps_recorded_pacing(self):
+        self.record(frames=3, period_s=0.1)
+        source = ReplaySource(self.path, realtime=True)
+        start = time.monotonic()
+        while source.read() is not None:
+            pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_truncated_recording_is_read_up_to_last_complete_chunk(self):
+        self.record()
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        source = ReplaySource(self.path, realtime=False)
+        frames = 0
+        while source.read() is not None:
+            frames += 1
+        self.assertEqual(frames, 2)
+
+    def test_dual_stream_camera_returns_both_streams(self):
+        camera = FakeDualStreamCamera()
+        capture = CameraSource(camera, dual_stream=True).read()
+        self.assertEqual(capture.frame.shape, (240, 320, 3))
+        self.assertLess(int(np.ptp(capture.frame)), 3)  # Neutral chroma converts to uniform grey
+        self.assertGreater(int(capture.frame.min()), 150)
+        self.assertEqual(capture.hires.shape, (960, 1280, 3))
+        self.assertTrue(camera.requests[0].released)
+
+    def test_high_res_stream_skipped_while_nobody_is_in_view(self):
+        camera = FakeDualStreamCamera()
+        source = CameraSource(camera, dual_stream=True)
+        source.want_hires(False)
+        capture = source.read()
+        self.assertEqual(capture.frame.shape, (240, 320, 3))
+        self.assertIsNone(capture.hires)
+        self.assertTrue(capture.hires_skipped)
+        self.assertTrue(camera.requests[0].released)
+        source.want_hires(True)
+        self.assertEqual(source.read().hires.shape, (960, 1280, 3))
+
+    def test_camera_frames_reuse_pooled_buffers(self):
+        camera = FakeDualStreamCamera()
+        source = CameraSource(camera, dual_stream=True, pool_size=2)
+        captures = [source.read() for _ in range(3)]
+        self.assertIsNot(captures[0].frame, captures[1].frame)
+        self.assertIs(captures[2].frame, captures[0].frame)
+        self.assertIs(captures[2].hires, captures[0].hires)
+
+    def test_buffer_pool_reallocates_on_shape_change(self):
+        pool = FrameBufferPool(1)
+        first = pool.next((4, 4, 3))
+        self.assertIs(pool.next((4, 4, 3)), first)
+        self.assertEqual(pool.next((8, 8, 3)).shape, (8, 8, 3))
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(struct.pack("!d", 1.0))
+        with self.assertRaises(ValueError):
+            list(read_recording(self.path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from startup import BackgroundLoader, StartupClock, lazy_import
+
+class TestLazyImport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, "lazy_probe.py"), "w") as f:
+            f.write("VALUE = 42\n")
+        sys.path.insert(0, self.tmp.name)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        sys.modules.pop("lazy_probe", None)
+        self.tmp.cleanup()
+
+    def test_module_is_imported_on_first_attribute_access(self):
+        probe = lazy_import("lazy_probe")
+        self.assertNotIn("lazy_probe", sys.modules)
+        self.assertFalse(probe.loaded())
+        self.assertEqual(probe.VALUE, 42)
+        self.assertIn("lazy_probe", sys.modules)
+        self.assertIs(probe.load(), sys.modules["lazy_probe"])
+
+    def test_missing_module_fails_on_use(self):
+        missing = lazy_import("no_such_rover_module")
+        with self.assertRaises(ImportError):
+            missing.anything
+
+    def test_main_defers_heavy_imports(self):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        code = "import sys, main; print(sorted(m for m in ('cv2', 'numpy', 'face_recognition', 'requests') if m in sys.modules))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "[]")
+
+class TestStartupClock(unittest.TestCase):
+    def test_milestone_recorded_once(self):
+        clock = StartupClock(start=time.monotonic() - 1.0)
+        first = clock.mark("first_motion")
+        self.assertGreaterEqual(first, 1.0)
+        self.assertIsNone(clock.mark("first_motion"))
+        self.assertEqual(clock.elapsed("first_motion"), first)
+        self.assertIsNone(clock.elapsed("first_detection"))
+
+class TestBackgroundLoader(unittest.TestCase):
+    def test_tasks_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=2.0)
+        loader = BackgroundLoader({"a": lambda: barrier.wait() or "A", "b": lambda: barrier.wait() or "B"})
+        self.assertTrue(loader.start().wait(5.0))
+        self.assertEqual(set(loader.results), {"a", "b"})
+        self.assertEqual(loader.errors, {})
+        self.assertEqual(set(loader.seconds), {"a", "b"})
+
+    def test_errors_are_kept_and_do_not_block_ready(self):
+        def fail():
+            raise RuntimeError("model missing")
+        loader = BackgroundLoader({"ok": lambda: 1, "bad": fail}).start()
+        self.assertTrue(loader.wait(5.0))
+        self.assertEqual(loader.results, {"ok": 1})
+        self.assertIsInstance(loader.errors["bad"], RuntimeError)
+
+if __name__ == '__main__':
+    unittest.main()
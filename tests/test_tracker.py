@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from tracker import PersonTracker, iou_matrix
+
+class TestIoU(unittest.TestCase):
+    def test_iou_matrix(self):
+        ious = iou_matrix([(0, 0, 10, 10)], [(0, 0, 10, 10), (5, 0, 15, 10), (20, 20, 30, 30)])
+        np.testing.assert_allclose(ious[0], [1.0, 1 / 3, 0.0], atol=1e-6)
+
+class TestPersonTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = PersonTracker(iou_threshold=0.3, max_misses=2)
+
+    def test_track_persists_across_frames(self):
+        first, = self.tracker.update([(100, 100, 200, 300)])
+        second, = self.tracker.update([(104, 102, 204, 302)])
+        self.assertIs(first, second)
+        self.assertEqual(second.box, (104, 102, 204, 302))
+
+    def test_distinct_people_get_distinct_tracks(self):
+        a, b = self.tracker.update([(0, 0, 100, 200), (300, 0, 400, 200)])
+        b2, a2 = self.tracker.update([(302, 0, 402, 200), (2, 0, 102, 200)])
+        self.assertIs(a, a2)
+        self.assertIs(b, b2)
+        self.assertNotEqual(a.track_id, b.track_id)
+
+    def test_cached_identity_reused_until_reverify(self):
+        track, = self.tracker.update([(100, 100, 200, 300)])
+        self.assertTrue(track.needs_verification(self.tracker.frame_index))
+        track.set_faces([((10, 60, 60, 10), "Alice", 0.3)], self.tracker.frame_index)
+        for _ in range(3):
+            track, = self.tracker.update([(101, 100, 201, 300)])
+            self.assertFalse(track.needs_verification(self.tracker.frame_index, reverify_every=5))
+        # Cached face locations follow the box
+        (location, name, _), = track.absolute_faces()
+        self.assertEqual(location, (110, 161, 160, 111))
+        self.assertEqual(name, "Alice")
+        for _ in range(2):
+            track, = self.tracker.update([(101, 100, 201, 300)])
+        self.assertTrue(track.needs_verification(self.tracker.frame_index, reverify_every=5))
+
+    def test_weak_match_triggers_reverification(self):
+        track, = self.tracker.update([(100, 100, 200, 300)])
+        track.set_faces([((10, 60, 60, 10), "Alice", 0.58)], self.tracker.frame_index)
+        track, = self.tracker.update([(100, 100, 200, 300)])
+        self.assertTrue(track.needs_verification(self.tracker.frame_index, reverify_distance=0.5))
+
+    def test_lost_tracks_expire(self):
+        self.tracker.update([(0, 0, 100, 100)])
+        for _ in range(3):
+            self.tracker.update([])
+        self.assertEqual(self.tracker.tracks, [])
+
+if __name__ == '__main__':
+    unittest.main()
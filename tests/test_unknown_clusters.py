@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from unknown_clusters import UnknownClusterStore
+
+def encoding(seed, noise=0.0, noise_seed=None):
+    base = np.random.default_rng(seed).normal(0, 0.1, 128)
+    if noise:
+        base = base + np.random.default_rng(noise_seed).normal(0, noise, 128)
+    return base
+
+class TestUnknownClusterStore(unittest.TestCase):
+    def test_same_person_joins_one_cluster(self):
+        store = UnknownClusterStore(max_distance=0.5, report_interval_s=30.0)
+        first = store.observe(encoding(1), now=0.0)
+        self.assertTrue(first.new and first.report)
+        for i in range(5):
+            again = store.observe(encoding(1, noise=0.01, noise_seed=i), now=1.0 + i)
+            self.assertEqual(again.cluster_id, first.cluster_id)
+            self.assertFalse(again.new)
+            self.assertFalse(again.report)
+        self.assertEqual(again.count, 6)
+        self.assertEqual(len(store), 1)
+
+    def test_different_people_get_their_own_cluster(self):
+        store = UnknownClusterStore(max_distance=0.5)
+        a = store.observe(encoding(1), now=0.0)
+        b = store.observe(encoding(2), now=0.0)
+        self.assertTrue(b.new)
+        self.assertNotEqual(a.cluster_id, b.cluster_id)
+        self.assertEqual(store.observe(encoding(2), now=1.0).cluster_id, b.cluster_id)
+
+    def test_repeat_sightings_reported_at_most_every_interval(self):
+        store = UnknownClusterStore(report_interval_s=30.0)
+        store.observe(encoding(1), now=0.0)
+        reports = [store.observe(encoding(1), now=float(t)).report for t in range(10, 70, 10)]
+        self.assertEqual(reports, [False, False, True, False, False, True])
+
+    def test_expired_cluster_alerts_again(self):
+        store = UnknownClusterStore(ttl_s=60.0)
+        first = store.observe(encoding(1), now=0.0)
+        self.assertFalse(store.observe(encoding(1), now=50.0).new)  # Seen again, so the TTL restarts
+        self.assertFalse(store.observe(encoding(1), now=100.0).new)
+        again = store.observe(encoding(1), now=200.0)
+        self.assertTrue(again.new)
+        self.assertNotEqual(again.cluster_id, first.cluster_id)
+        self.assertEqual(store.stats()["expired"], 1)
+
+    def test_least_recently_seen_evicted_beyond_max(self):
+        store = UnknownClusterStore(max_clusters=2)
+        a = store.observe(encoding(1), now=0.0)
+        store.observe(encoding(2), now=1.0)
+        store.observe(encoding(1), now=2.0)  # a is now the most recently seen
+        store.observe(encoding(3), now=3.0)  # Evicts 2
+        self.assertEqual(store.observe(encoding(1), now=4.0).cluster_id, a.cluster_id)
+        self.assertTrue(store.observe(encoding(2), now=5.0).new)
+        stats = store.stats()
+        self.assertEqual((stats["clusters"], stats["created"], stats["evicted"]), (2, 4, 2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 import numpy as np
 import cv2
-from vision_processing import VisionProcessor
+from vision_processing import (
+    VisionProcessor, merge_overlapping_boxes, assign_faces_to_boxes, clip_box,
+    scale_box, scale_location, encode_faces_in_regions
+)
 
 class TestVisionProcessing(unittest.TestCase):
     def setUp(self):
@@ -24,5 +27,31 @@ class TestVisionProcessing(unittest.TestCase):
         self.assertIsInstance(unknown_detected, bool)
         self.assertTrue(alert_image is None or isinstance(alert_image, str))
 
+class TestFaceRegions(unittest.TestCase):
+    def test_merge_overlapping_boxes(self):
+        regions = merge_overlapping_boxes([(0, 0, 100, 100), (50, 50, 150, 150), (140, 0, 160, 20), (300, 300, 400, 400)])
+        self.assertEqual(sorted(regions), [(0, 0, 160, 150), (300, 300, 400, 400)])
+
+    def test_disjoint_boxes_untouched(self):
+        boxes = [(0, 0, 10, 10), (10, 0, 20, 10)]
+        self.assertEqual(merge_overlapping_boxes(boxes), boxes)
+
+    def test_assign_faces_to_smallest_box(self):
+        boxes = [(0, 0, 200, 200), (100, 0, 200, 200)]
+        faces = [(10, 60, 60, 10), (10, 160, 60, 110), (300, 60, 350, 10)]
+        self.assertEqual(assign_faces_to_boxes(faces, boxes), [[0], [1]])
+
+    def test_clip_box(self):
+        self.assertEqual(clip_box((-5, -5, 700, 500), 640, 480), (0, 0, 640, 480))
+
+    def test_scale_between_streams(self):
+        self.assertEqual(scale_box((10, 20, 110, 220), 4.0, 4.0), (40, 80, 440, 880))
+        self.assertEqual(scale_location((80, 440, 880, 40), 0.25, 0.25), (20, 110, 220, 10))
+
+    def test_encode_faces_in_regions_without_faces(self):
+        image = np.zeros((960, 1280, 3), dtype=np.uint8)
+        locations, encodings, assignment = encode_faces_in_regions(image, [(0, 0, 400, 900), (1200, 0, 1400, 100)])
+        self.assertEqual((locations, encodings, assignment), ([], [], [[], []]))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file